@@ -7,6 +7,27 @@ It reads .claude/hookify.*.local.md files and evaluates rules.
 
 import os
 import sys
+
+
+def _has_rule_files():
+    """Cheap check for any .claude/hookify.*.local.md before importing anything."""
+    try:
+        return any(name.startswith('hookify.') and name.endswith('.local.md')
+                   for name in os.listdir('.claude'))
+    except OSError:
+        return False
+
+
+# Fast path: with no rule files there is nothing to evaluate, so answer
+# before paying for json, the rule loader and the engine.
+if not _has_rule_files():
+    try:
+        sys.stdin.buffer.read()
+    except (OSError, ValueError):
+        pass
+    sys.stdout.write('{}\n')
+    sys.exit(0)
+
 import json
 
 # CRITICAL: Add plugin root to Python path for imports
@@ -21,6 +42,7 @@ if PLUGIN_ROOT:
 try:
     from hookify.core.config_loader import load_rules
     from hookify.core.rule_engine import RuleEngine
+    from hookify.utils import tracing
 except ImportError as e:
     error_msg = {"systemMessage": f"Hookify import error: {e}"}
     print(json.dumps(error_msg), file=sys.stdout)
@@ -30,8 +52,12 @@ except ImportError as e:
 def main():
     """Main entry point for PostToolUse hook."""
     try:
+        tracing.configure(plugin='hookify', event='PostToolUse')
+
         # Read input from stdin
-        input_data = json.load(sys.stdin)
+        with tracing.span('stdin_decode'):
+            input_data = json.load(sys.stdin)
+        tracing.configure(tool=input_data.get('tool_name'), session=input_data.get('session_id'))
 
         # Determine event type based on tool
         tool_name = input_data.get('tool_name', '')
@@ -42,14 +68,18 @@ def main():
             event = 'file'
 
         # Load rules
-        rules = load_rules(event=event)
+        with tracing.span('rule_load') as span:
+            rules = load_rules(event=event)
+            span.tag(rules=len(rules))
 
         # Evaluate rules
-        engine = RuleEngine()
-        result = engine.evaluate_rules(rules, input_data)
+        with tracing.span('evaluate'):
+            engine = RuleEngine()
+            result = engine.evaluate_rules(rules, input_data)
 
         # Always output JSON (even if empty)
-        print(json.dumps(result), file=sys.stdout)
+        with tracing.span('output_encode'):
+            print(json.dumps(result), file=sys.stdout)
 
     except Exception as e:
         error_output = {
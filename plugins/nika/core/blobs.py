@@ -0,0 +1,122 @@
+"""
+Nika content-addressed blob store.
+
+Large memory values are kept out of the main store so that loading it
+(and every recall that does) never parses them:
+
+  .claude/nika-blobs/<aa>/<sha256>   one file per distinct value
+
+A blob is named by the SHA-256 of the value's JSON text, so storing the
+same value twice writes it once. The file holds either that text or,
+when it is smaller, its zlib stream; JSON text never starts with the
+zlib header byte (0x78, "x"), so readers tell the two apart without a
+flag. Blobs are written atomically before the entry that references
+them is committed, and gc() deletes those no entry references any more,
+sparing recent ones so a writer that has stored a blob but not yet its
+entry never loses it.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+try:
+    from core.fsutil import match_mode
+except ImportError:
+    # Run as a script from core/
+    from fsutil import match_mode
+
+
+ZLIB_HEADER = 0x78
+
+
+class BlobStore:
+    """Content-addressed files under one directory (see module docstring)."""
+
+    def __init__(self, root: Path, compress: bool = True):
+        self.root = root
+        self.compress = compress
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """Store data (JSON text) and return its digest; a no-op if already stored."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            # Already stored: refresh its mtime so a concurrent gc() treats
+            # it as new until our entry is committed
+            os.utime(path)
+            return digest
+        except FileNotFoundError:
+            pass
+        payload = data
+        if self.compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                payload = packed
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{digest[:8]}.", suffix=".tmp")
+        try:
+            match_mode(fd, path)
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """The stored JSON text, or None if the blob is missing or damaged."""
+        try:
+            payload = self.path(digest).read_bytes()
+        except OSError:
+            return None
+        try:
+            data = zlib.decompress(payload) if payload[:1] == bytes([ZLIB_HEADER]) else payload
+        except zlib.error:
+            data = None
+        if data is None or hashlib.sha256(data).hexdigest() != digest:
+            print(f"nika: blob {digest} is damaged", file=sys.stderr)
+            return None
+        return data
+
+    def gc(self, referenced: set, grace: float = 300.0) -> dict:
+        """Delete blobs not in `referenced` (and stale temp files) older than `grace` seconds."""
+        cutoff = time.time() - grace
+        removed = freed = 0
+        if not self.root.is_dir():
+            return {"removed": 0, "bytes_freed": 0}
+        for shard in self.root.iterdir():
+            if not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                if path.name in referenced:
+                    continue
+                try:
+                    stat = path.stat()
+                    if stat.st_mtime >= cutoff:
+                        continue
+                    path.unlink()
+                except OSError:
+                    continue
+                if not path.name.startswith("."):
+                    removed += 1
+                    freed += stat.st_size
+            try:
+                shard.rmdir()  # only succeeds once empty
+            except OSError:
+                pass
+        return {"removed": removed, "bytes_freed": freed}
@@ -0,0 +1,230 @@
+"""
+Nika memory change feed.
+
+Every committed mutation appends one JSON line per changed entry to a
+log next to the store:
+
+  .claude/nika-memory.changes.log
+  {"seq": 42, "op": "put", "id": "...", "namespace": "agents", "key": "pod-1",
+   "tags": ["task-result"], "at": 1790000000.0}
+
+op is "put" (remember, import), "delete" (forget), "expire" (TTL) or
+"evict" (budgets). Records carry no value: a reader recalls the entry
+for its current state. Sequence numbers are assigned under the log's
+lock, so they are unique and increasing; they order publication, which
+follows the commit. The log keeps its newest half once it passes
+max_bytes; a reader whose position predates what is left is told to
+rescan (reset).
+
+Readers find their place by binary search on seq and wait for the file
+to change with inotify (Linux, through ctypes, watching the directory
+so the rename of a rotation is seen too); elsewhere they poll its size
+and inode.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    from core.fsutil import atomic_write_text, file_lock, file_signature
+except ImportError:
+    # Run as a script from core/
+    from fsutil import atomic_write_text, file_lock, file_signature
+
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+# Polling interval when inotify is unavailable
+POLL_INTERVAL = 0.1
+
+# Bytes read from the end of the log to find the last record
+TAIL_CHUNK = 4096
+
+_IN_MODIFY = 0x002
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+_libc = None
+
+
+def _inotify_libc():
+    """libc with inotify_init1/inotify_add_watch, or None (not Linux)."""
+    global _libc
+    if _libc is None:
+        _libc = False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            _libc = libc
+        except (OSError, AttributeError):
+            pass
+    return _libc or None
+
+
+def _last_line(f, size: int) -> Tuple[int, Optional[bytes]]:
+    """(offset just past the last complete line, that line) of an open log."""
+    start = max(0, size - TAIL_CHUNK)
+    while True:
+        f.seek(start)
+        chunk = f.read(size - start)
+        end = chunk.rfind(b"\n")
+        if end < 0 and start > 0:
+            start = max(0, start - TAIL_CHUNK)  # a record longer than the chunk
+            continue
+        if end < 0:
+            return 0, None
+        begin = chunk.rfind(b"\n", 0, end) + 1
+        if begin == 0 and start > 0:
+            start = max(0, start - TAIL_CHUNK)
+            continue
+        return start + end + 1, chunk[begin:end]
+
+
+class ChangeLog:
+    """Sequence-numbered JSON-lines log of memory changes (see module docstring)."""
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    # ── writing ──
+
+    def append(self, changes: List[dict]) -> int:
+        """Number and append change records; returns the last seq written."""
+        if not changes:
+            return self.head()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path):
+            fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o666)  # Less the umask
+            try:
+                with os.fdopen(fd, "r+b", closefd=False) as f:
+                    size = os.fstat(fd).st_size
+                    end, line = _last_line(f, size)
+                    if end < size:
+                        # Drop a partial record left by a crash mid-append
+                        os.ftruncate(fd, end)
+                    seq = json.loads(line)["seq"] if line else 0
+                    payload = []
+                    for change in changes:
+                        seq += 1
+                        payload.append(json.dumps({"seq": seq, **change}, ensure_ascii=False))
+                    os.lseek(fd, end, os.SEEK_SET)
+                    os.write(fd, ("\n".join(payload) + "\n").encode("utf-8"))
+                    size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size > self.max_bytes:
+                self._rotate()
+        return seq
+
+    def _rotate(self) -> None:
+        # Keep the newest half, cut at a record boundary (caller holds the lock)
+        data = self.path.read_bytes()
+        cut = data.find(b"\n", len(data) // 2) + 1
+        atomic_write_text(self.path, data[cut:].decode("utf-8"))
+
+    # ── reading ──
+
+    def head(self) -> int:
+        """Seq of the newest record (0 for an empty or missing log)."""
+        try:
+            with open(self.path, "rb") as f:
+                _, line = _last_line(f, os.fstat(f.fileno()).st_size)
+        except FileNotFoundError:
+            return 0
+        return json.loads(line)["seq"] if line else 0
+
+    def read(self, since: int) -> Tuple[List[dict], bool]:
+        """
+        Records with seq > since, oldest first, and whether records after
+        `since` were already rotated away (or the log was recreated), in
+        which case the caller should rescan the store.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return [], since > 0
+        with f:
+            data_end, last = _last_line(f, os.fstat(f.fileno()).st_size)
+            if last is None:
+                return [], since > 0
+            head = json.loads(last)["seq"]
+            if head == since:
+                return [], False
+            f.seek(0)
+            first = json.loads(f.readline())["seq"]
+            # A head behind `since` means the log was deleted and restarted
+            start = 0 if since < first or head < since else self._locate(f, data_end, since)
+            f.seek(start)
+            records = [json.loads(line) for line in f.read(data_end - start).splitlines()]
+        return records, since < first - 1 or head < since
+
+    @staticmethod
+    def _locate(f, end: int, since: int) -> int:
+        """Offset of the first record with seq > since (binary search on line starts)."""
+        def line_at(pos):
+            # First complete line starting at or after pos: (offset, seq)
+            if pos > 0:
+                f.seek(pos - 1)
+                f.readline()
+            else:
+                f.seek(0)
+            offset = f.tell()
+            if offset >= end:
+                return end, None
+            return offset, json.loads(f.readline())["seq"]
+
+        lo, hi = 0, end
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, seq = line_at(mid)
+            if seq is None or seq > since:
+                hi = mid
+            else:
+                lo = mid + 1
+        return line_at(lo)[0]
+
+    def signature(self):
+        return file_signature(self.path)
+
+    def wait(self, signature, timeout: float) -> bool:
+        """Block until the log's signature differs from `signature` (it was
+        appended to or rotated) or `timeout` seconds pass; True if it changed."""
+        deadline = time.monotonic() + timeout
+        libc = _inotify_libc()
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC) if libc else -1
+        try:
+            if fd >= 0:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if libc.inotify_add_watch(fd, str(self.path.parent).encode(),
+                                          _IN_MODIFY | _IN_MOVED_TO | _IN_CREATE) < 0:
+                    os.close(fd)
+                    fd = -1
+            while True:
+                # Checked after the watch is in place, so no append is missed
+                if self.signature() != signature:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if fd >= 0:
+                    # Any event in the directory wakes us; the signature decides
+                    if select.select([fd], [], [], remaining)[0]:
+                        try:
+                            os.read(fd, 65536)
+                        except BlockingIOError:
+                            pass
+                else:
+                    time.sleep(min(POLL_INTERVAL, remaining))
+        finally:
+            if fd >= 0:
+                os.close(fd)
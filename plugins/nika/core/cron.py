@@ -9,37 +9,141 @@ Cron entry format:
 {
   "id": "cron-abc123",
   "name": "human-readable name",
-  "schedule": "*/5 * * * *" or "@hourly" or "@daily" or {"every_minutes": 30},
+  "schedule": "0 9 * * mon-fri" or "@hourly" or {"every_minutes": 30}
+              or {"cron": "0 9 * * 1-5", "timezone": "Europe/Paris"},
   "instruction": "what the agent should do when triggered",
   "enabled": true,
   "last_run": null,
   "next_run": 1234567890.0,
   "created_by": "super-instance|user",
   "run_count": 0,
-  "tags": ["memory", "cleanup"]
+  "tags": ["memory", "cleanup"],
+  "misfire": "fire_once_now",        # or "skip_to_next", "fire_all_up_to_N"
+  "jitter": 0,                       # seconds; spreads next_run deterministically
+  "namespace": "cron",               # memory namespace for run-daemon results
+  "timeout": null,                   # run-daemon deadline in seconds (null: --timeout)
+  "on_file_change": ["package.json", "docs/**"],   # fire only when these changed
+  "on_memory_change": [{"namespace": "project"}, {"tag": "docs"}],
+  "lease": {"holder": "<session id>", "claimed_at": 1234567890.0,
+            "expires": 1234568790.0,   # while a claimed run is in progress
+            "due": 1234567885.0, "injected": 512}
 }
+
+Five-field cron expressions (see core/cronexpr.py) fire on wall-clock
+times; next_run is computed directly from the compiled expression when
+the job is added and each time it is claimed. Interval schedules fire
+that long after the previous claim.
+
+Claiming is atomic: check_due_jobs() re-reads the file under its lock
+and gives each due job a lease naming the claimer (the session id in
+the hooks) that lasts NIKA_CRON_LEASE seconds (default 900, or the
+job's lease_seconds). A job is not claimed again while its lease is
+live, so runs never overlap; complete_job() or release_leases() (the
+Stop hook, at the end of the turn that ran the job) ends it, and an
+expired lease, e.g. of a crashed session, is simply claimed over. The
+file's "tag_limits" ({"tag": N}, set_tag_limit()) caps how many jobs
+with a tag may hold a lease at once; the rest stay due until a slot
+frees up.
+
+A job that missed more than one scheduled run (the project was not
+opened for a while) is handled by its misfire policy: fire_once_now
+(default) fires once and reschedules, skip_to_next drops the missed runs
+and waits for the next one, fire_all_up_to_N fires up to the N most
+recent missed runs in one claim. A job's jitter (seconds) shifts each
+of its next_run times by a fixed offset derived from its id, so jobs on
+the same schedule don't all come due at once. At most NIKA_CRON_MAX_INJECT
+jobs (default 3) are claimed per check, oldest first; the rest stay due
+and are picked up by the next prompts.
+
+Every save also writes .claude/nika-cron.summary.json (job counts and
+the earliest next_run of an enabled job), stamped with the signature of
+the cron file it describes, so session start can tell whether anything
+is due without parsing the jobs. The earliest next_run alone also goes
+to the one-line .claude/nika-cron.next, which the per-prompt check
+reads without importing this module (see paths.cron_next_due()).
+
+`cron.py run-daemon` runs due jobs without a session, through a command
+template (see core/crondaemon.py).
+
+A job with on_file_change globs (relative to the project root) or
+on_memory_change triggers ({"namespace"} and/or {"tag"}) fires only if
+its inputs changed since its last run; its schedule is how often that is
+checked, so the next-due sidecar stays valid. The inputs' state at the
+last run lives in .claude/nika-cron.triggers.json: st_mtime_ns and size
+of every matching file, and the memory change log's seq (see
+core/changes.py). A due job diffs that against a fresh stat of its globs
+and reads the log past its seq; if nothing changed it is rescheduled
+without firing. Memory changes tagged with the job's own id (its
+run-daemon results) don't count. The state is taken when the job is
+added and each time it fires; a failed run drops it, so the retry fires.
+
+Each run is recorded when its lease ends (completed, released, or
+expired and claimed over) in .claude/nika-cron.runs.json, kept out of
+the job file so checks never read it: per job, a ring buffer of the last
+NIKA_CRON_HISTORY runs (default 50) as compact rows of HISTORY_FIELDS.
+trigger is when the job was due, latency how long it waited to be
+claimed, duration how long the claim lasted, injected the bytes of
+context it added to a prompt (0 for run-daemon). `cron.py stats` reports
+percentiles per job and flags jobs that keep running longer than the
+time to their next scheduled run.
 """
 
 import json
 import os
+import re
+import stat
 import sys
 import time
 import uuid
-import re
+import zlib
 from pathlib import Path
 from typing import Optional
 
+try:
+    from core.paths import CRON_NEXT_FILE, MEMORY_CHANGES_FILE, cron_next_due, find_project_root
+    from core.cronexpr import CronExpr, compile_expr
+    from core.fsutil import (atomic_write_json, atomic_write_text, file_lock, file_signature,
+                             read_json, read_json_cached)
+except ImportError:
+    # Run as a script from core/
+    from paths import CRON_NEXT_FILE, MEMORY_CHANGES_FILE, cron_next_due, find_project_root
+    from cronexpr import CronExpr, compile_expr
+    from fsutil import (atomic_write_json, atomic_write_text, file_lock, file_signature,
+                        read_json, read_json_cached)
+
 
 CRON_FILE = ".claude/nika-cron.json"
+CRON_SUMMARY_FILE = ".claude/nika-cron.summary.json"
+CRON_HISTORY_FILE = ".claude/nika-cron.runs.json"
+CRON_TRIGGERS_FILE = ".claude/nika-cron.triggers.json"
+
+# Seconds a claimed run holds its job before the lease can be claimed over
+CRON_LEASE_SECONDS = int(os.environ.get("NIKA_CRON_LEASE", "900"))
+
+# Jobs claimed (and injected) per check; 0 for no limit
+CRON_MAX_INJECT = int(os.environ.get("NIKA_CRON_MAX_INJECT", "3"))
+
+MISFIRE_POLICIES = ("fire_once_now", "skip_to_next", "fire_all_up_to_N")
+_FIRE_ALL = re.compile(r"^fire_all_up_to_(\d+)$")
+
+# Missed runs counted per job before the count is reported as a floor
+MISFIRE_COUNT_MAX = 1000
+
+# Runs kept per job in the history; 0 disables it
+CRON_HISTORY_RUNS = int(os.environ.get("NIKA_CRON_HISTORY", "50"))
+HISTORY_FIELDS = ("trigger", "latency", "duration", "outcome", "injected")
+
+# A job is flagged as overrunning when at least OVERRUN_SHARE of its
+# (at least OVERRUN_MIN_RUNS) recorded runs outlasted their interval
+OVERRUN_MIN_RUNS = 3
+OVERRUN_SHARE = 0.5
+
+# Changed inputs listed in a triggered job's context
+TRIGGER_CHANGES_SHOWN = 10
 
 
 def _find_project_root() -> Path:
-    current = Path.cwd()
-    while current != current.parent:
-        if (current / ".claude").is_dir():
-            return current
-        current = current.parent
-    return Path.cwd()
+    return Path(find_project_root())
 
 
 def _cron_path() -> Path:
@@ -47,19 +151,228 @@ def _cron_path() -> Path:
 
 
 def _load_cron() -> dict:
-    path = _cron_path()
-    if path.exists():
-        try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            return {"jobs": []}
-    return {"jobs": []}
+    return read_json(_cron_path(), {"jobs": []})
+
+
+def _peek_cron() -> dict:
+    """Lock-free read, shared for the process while the file is unchanged
+    (do not mutate; writers use _load_cron() under _cron_lock())."""
+    return read_json_cached(_cron_path(), {"jobs": []})
 
 
 def _save_cron(data: dict) -> None:
+    """Atomically replace the cron file and its summary (callers hold _cron_lock())."""
     path = _cron_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    atomic_write_json(path, data)
+    _save_summary(_summarize_jobs(data), file_signature(path))
+
+
+def _history_path() -> Path:
+    return _find_project_root() / CRON_HISTORY_FILE
+
+
+def _run_row(lease: dict, ended: float, outcome: str) -> list:
+    """History row (HISTORY_FIELDS) for a run whose lease ended at `ended`."""
+    claimed = lease.get("claimed_at", ended)
+    trigger = lease.get("due", claimed)
+    return [round(trigger, 3), round(max(claimed - trigger, 0.0), 3),
+            round(max(ended - claimed, 0.0), 3), outcome, lease.get("injected", 0)]
+
+
+def _record_runs(rows: list) -> None:
+    """Append (job_id, row) pairs to the jobs' ring buffers, dropping the
+    history of jobs that no longer exist. Best effort: a run is never
+    failed because its history could not be written."""
+    if not rows or CRON_HISTORY_RUNS <= 0:
+        return
+    path = _history_path()
+    try:
+        with file_lock(path):
+            history = read_json(path, {})
+            runs = history.setdefault("runs", {})
+            known = {job["id"] for job in _peek_cron()["jobs"]}
+            for job_id in [j for j in runs if j not in known]:
+                del runs[job_id]
+            for job_id, row in rows:
+                ring = runs.setdefault(job_id, [])
+                ring.append(row)
+                del ring[:-CRON_HISTORY_RUNS]
+            atomic_write_json(path, history, indent=None)
+    except (OSError, TimeoutError):
+        pass
+
+
+# ── Change triggers ────────────────────────────────────────────
+
+def _triggers_path() -> Path:
+    return _find_project_root() / CRON_TRIGGERS_FILE
+
+
+def _load_snapshots() -> dict:
+    return read_json(_triggers_path(), {"jobs": {}})
+
+
+def _save_snapshots(snapshots: dict, data: dict) -> None:
+    """Write the input snapshots, dropping those of removed jobs (callers hold _cron_lock())."""
+    known = {job["id"] for job in data["jobs"]}
+    snapshots["jobs"] = {k: v for k, v in snapshots["jobs"].items() if k in known}
+    atomic_write_json(_triggers_path(), snapshots, indent=None)
+
+
+def _has_triggers(job: dict) -> bool:
+    return bool(job.get("on_file_change") or job.get("on_memory_change"))
+
+
+def _memory_log():
+    # Imported here: only jobs with memory triggers read the log
+    try:
+        from core.changes import ChangeLog
+    except ImportError:
+        from changes import ChangeLog
+    return ChangeLog(_find_project_root() / MEMORY_CHANGES_FILE)
+
+
+def _file_snapshot(patterns: list) -> dict:
+    """{relative path: [st_mtime_ns, size]} of the regular files matching the globs."""
+    root = _find_project_root()
+    files = {}
+    for pattern in patterns:
+        if pattern.endswith("**"):
+            pattern += "/*"  # Path.glob("docs/**") yields only directories
+        for path in root.glob(pattern):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                files[path.relative_to(root).as_posix()] = [st.st_mtime_ns, st.st_size]
+    return files
+
+
+def _memory_trigger_matches(trigger: dict, change: dict) -> bool:
+    return ((trigger.get("namespace") is None or change["namespace"] == trigger["namespace"])
+            and (trigger.get("tag") is None or trigger["tag"] in change.get("tags", [])))
+
+
+def _trigger_changes(job: dict, previous: Optional[dict]) -> tuple:
+    """
+    (inputs changed since the `previous` snapshot, the current snapshot).
+    Without a previous snapshot everything counts as changed.
+    """
+    current, changed = {}, []
+    if job.get("on_file_change"):
+        current["files"] = _file_snapshot(job["on_file_change"])
+        if previous is None or "files" not in previous:
+            changed.append("files (no previous snapshot)")
+        else:
+            before, after = previous["files"], current["files"]
+            changed.extend(sorted(p for p in before.keys() | after.keys() if before.get(p) != after.get(p)))
+    if job.get("on_memory_change"):
+        log = _memory_log()
+        current["memory_seq"] = head = log.head()
+        since = (previous or {}).get("memory_seq")
+        if since is None:
+            changed.append("memory (no previous position)")
+        elif head != since:
+            records, reset = log.read(since)
+            if records:
+                current["memory_seq"] = max(head, records[-1]["seq"])
+            if reset:
+                changed.append("memory (change log rotated)")
+            for change in records:
+                if job["id"] in change.get("tags", []):
+                    continue  # The job's own results
+                if any(_memory_trigger_matches(t, change) for t in job["on_memory_change"]):
+                    name = f"memory {change['namespace']}/{change['key']}"
+                    if name not in changed:
+                        changed.append(name)
+    return changed, current
+
+
+def _memory_trigger(text: str) -> dict:
+    """"project", "tag:docs" or "project,tag:docs" as an on_memory_change trigger."""
+    trigger = {}
+    for part in (p.strip() for p in text.split(",")):
+        if part.startswith("tag:"):
+            trigger["tag"] = part[4:]
+        elif part:
+            trigger["namespace"] = part
+    return trigger
+
+
+def _lease_active(job: dict, now: float) -> bool:
+    lease = job.get("lease")
+    return bool(lease) and lease.get("expires", 0) > now
+
+
+def _claimable_at(job: dict, now: float) -> float:
+    """When the job can next be claimed: its next_run, or the end of a live lease."""
+    next_run = job.get("next_run", 0)
+    if _lease_active(job, now):
+        return max(next_run, job["lease"]["expires"])
+    return next_run
+
+
+def _summarize_jobs(data: dict) -> dict:
+    now = time.time()
+    jobs = data["jobs"]
+    enabled = [job for job in jobs if job.get("enabled", True)]
+
+    # A tag at its limit frees a slot when its first lease ends
+    limits = data.get("tag_limits", {})
+    leases = {}
+    for job in jobs:
+        if _lease_active(job, now):
+            for tag in job.get("tags", []):
+                leases.setdefault(tag, []).append(job["lease"]["expires"])
+    blocked = {tag: min(expiries) for tag, expiries in leases.items()
+               if tag in limits and len(expiries) >= limits[tag]}
+
+    def claimable_at(job):
+        return max([_claimable_at(job, now)] + [blocked[t] for t in job.get("tags", []) if t in blocked])
+
+    return {
+        "jobs": len(jobs),
+        "enabled_jobs": len(enabled),
+        "next_due": min((claimable_at(job) for job in enabled), default=None),
+        "leased": sum(1 for job in jobs if _lease_active(job, now)),
+    }
+
+
+def _save_summary(summary: dict, signature) -> None:
+    """Write the summary and the next-due sidecar, both stamped with the
+    cron file's signature."""
+    if signature is not None:
+        summary["revision"] = list(signature)
+        root = _find_project_root()
+        atomic_write_json(root / CRON_SUMMARY_FILE, summary, indent=None)
+        next_due = summary["next_due"]
+        atomic_write_text(root / CRON_NEXT_FILE, " ".join(
+            [repr(float("inf" if next_due is None else next_due))] + [str(f) for f in signature]) + "\n")
+
+
+def cron_summary() -> dict:
+    """
+    {"jobs", "enabled_jobs", "next_due", "leased"} without parsing the
+    cron file (next_due is when the first enabled job can be claimed, or
+    None; leased counts jobs whose run was in progress at the last save).
+    Written with every change; rebuilt here only when missing or stale.
+    """
+    signature = file_signature(_cron_path())
+    summary = read_json(_find_project_root() / CRON_SUMMARY_FILE, None)
+    if (isinstance(summary, dict) and signature is not None
+            and summary.get("revision") == list(signature)):
+        if cron_next_due() is None:
+            _save_summary(summary, signature)  # Sidecar lost or left behind
+        return summary
+    summary = _summarize_jobs(_peek_cron())
+    _save_summary(summary, signature)
+    return summary
+
+
+def _cron_lock():
+    """Exclusive lock held across a load-modify-save of the cron file."""
+    return file_lock(_cron_path())
 
 
 def _parse_interval(schedule) -> Optional[int]:
@@ -71,7 +384,7 @@ def _parse_interval(schedule) -> Optional[int]:
       - "@hourly"  → 3600s
       - "@daily"   → 86400s
       - "@weekly"  → 604800s
-      - "*/N * * * *" → N minutes (simplified cron)
+    Cron expressions are not intervals; see _cron_expr().
     """
     if isinstance(schedule, dict):
         if "every_minutes" in schedule:
@@ -91,24 +404,114 @@ def _parse_interval(schedule) -> Optional[int]:
         if schedule == "@startup":
             return 0  # Run once at startup
 
-        # Simplified cron: */N * * * *
-        match = re.match(r'^\*/(\d+)\s+\*\s+\*\s+\*\s+\*$', schedule)
-        if match:
-            return int(match.group(1)) * 60
+    return None
+
 
+def _cron_expr(schedule) -> Optional[CronExpr]:
+    """
+    The compiled cron expression of a schedule, or None for interval
+    schedules. Accepts "0 9 * * 1-5", "CRON_TZ=Europe/Paris 0 9 * * 1-5",
+    the macros @monthly, @yearly, @annually and @midnight, and
+    {"cron": "...", "timezone": "Europe/Paris"}. (@hourly, @daily and
+    @weekly stay intervals, as they always were.)
+
+    Raises ValueError for a malformed expression.
+    """
+    if isinstance(schedule, dict) and "cron" in schedule:
+        return compile_expr(schedule["cron"], schedule.get("timezone"))
+    if isinstance(schedule, str) and _parse_interval(schedule) is None:
+        return compile_expr(schedule)
     return None
 
 
+def _next_run(schedule, after: float, interval: Optional[int] = None) -> Optional[float]:
+    """When a job with this schedule next fires after `after`, or None
+    for a one-shot job (or an expression that never matches)."""
+    expr = _cron_expr(schedule)
+    if expr is not None:
+        return expr.next_after(after)
+    if interval is None:
+        interval = _parse_interval(schedule)
+    return after + interval if interval else None
+
+
+def _misfire_limit(policy: str) -> Optional[int]:
+    """Runs fired for a misfire policy: 1, 0 (skip) or N; None if invalid."""
+    if policy == "fire_once_now":
+        return 1
+    if policy == "skip_to_next":
+        return 0
+    match = _FIRE_ALL.match(policy or "")
+    if match and int(match.group(1)) > 0:
+        return int(match.group(1))
+    return None
+
+
+def _jitter_offset(job: dict) -> float:
+    """Fixed offset in [0, jitter) seconds, the same for a job every time."""
+    jitter = job.get("jitter") or 0
+    return zlib.crc32(job["id"].encode()) / 2**32 * jitter
+
+
+def _fire_times(job: dict, now: float) -> list:
+    """Scheduled times (before jitter) from next_run up to now, oldest
+    first; at most MISFIRE_COUNT_MAX of them."""
+    at = job.get("next_run", 0) - _jitter_offset(job)
+    times = [at]
+    try:
+        while len(times) < MISFIRE_COUNT_MAX:
+            at = _next_run(job.get("schedule"), at, job.get("interval_seconds"))
+            if at is None or at > now:
+                break
+            times.append(at)
+    except ValueError:
+        pass  # Malformed expression from an older version
+    return times
+
+
 # ── Public API ─────────────────────────────────────────────────
 
 def add_job(name: str, schedule, instruction: str,
-            created_by: str = "user", tags: Optional[list] = None) -> dict:
+            created_by: str = "user", tags: Optional[list] = None,
+            misfire: str = "fire_once_now", jitter: float = 0,
+            namespace: str = "cron", timeout: Optional[float] = None,
+            on_file_change: Optional[list] = None, on_memory_change: Optional[list] = None) -> dict:
     """
-    Add a new cron job.
+    Add a new cron job. With on_file_change globs or on_memory_change
+    triggers it fires only when those inputs changed; the schedule is how
+    often they are checked.
+
+    Raises ValueError for a schedule that is neither an interval nor a
+    valid cron expression, or an expression that never fires (0 0 31 2 *),
+    for an unknown misfire policy or a negative jitter, for an empty
+    namespace or a non-positive timeout, and for a glob that is not
+    relative to the project or a memory trigger without a namespace or tag.
     """
-    data = _load_cron()
     now = time.time()
     interval = _parse_interval(schedule)
+    if _cron_expr(schedule) is not None:
+        next_run = _next_run(schedule, now)
+        if next_run is None:
+            raise ValueError(f"Cron expression never fires: {json.dumps(schedule)}")
+    elif interval is not None:
+        next_run = now + interval
+    else:
+        raise ValueError(f"Unrecognized schedule: {json.dumps(schedule)}")
+    if _misfire_limit(misfire) is None:
+        raise ValueError(f"misfire must be one of {', '.join(MISFIRE_POLICIES)}, not {misfire!r}")
+    if jitter < 0:
+        raise ValueError(f"jitter must be non-negative, not {jitter!r}")
+    if not namespace:
+        raise ValueError("namespace must not be empty")
+    if timeout is not None and timeout <= 0:
+        raise ValueError(f"timeout must be positive, not {timeout!r}")
+    for pattern in on_file_change or []:
+        if not isinstance(pattern, str) or not pattern or os.path.isabs(pattern) or ".." in Path(pattern).parts:
+            raise ValueError(f"on_file_change globs must be relative to the project, not {pattern!r}")
+    for trigger in on_memory_change or []:
+        if (not isinstance(trigger, dict) or not (trigger.get("namespace") or trigger.get("tag"))
+                or set(trigger) - {"namespace", "tag"}):
+            raise ValueError(f"on_memory_change triggers need a namespace and/or tag, not {trigger!r}")
 
     job = {
         "id": f"cron-{uuid.uuid4().hex[:8]}",
@@ -119,77 +522,382 @@ def add_job(name: str, schedule, instruction: str,
         "enabled": True,
         "created_at": now,
         "last_run": None,
-        "next_run": now + (interval or 0),
+        "next_run": next_run,
         "created_by": created_by,
         "run_count": 0,
         "tags": tags or [],
+        "misfire": misfire,
+        "jitter": jitter,
+        "namespace": namespace,
+        "timeout": timeout,
+        "on_file_change": on_file_change or [],
+        "on_memory_change": on_memory_change or [],
     }
+    job["next_run"] += _jitter_offset(job)
 
-    data["jobs"].append(job)
-    _save_cron(data)
+    with _cron_lock():
+        data = _load_cron()
+        data["jobs"].append(job)
+        _save_cron(data)
+        if _has_triggers(job):
+            # Changes from now on fire the job, not the state it was added in
+            snapshots = _load_snapshots()
+            snapshots["jobs"][job["id"]] = _trigger_changes(job, None)[1]
+            _save_snapshots(snapshots, data)
     return job
 
 
 def remove_job(job_id: str) -> bool:
     """Remove a cron job by ID."""
-    data = _load_cron()
-    before = len(data["jobs"])
-    data["jobs"] = [j for j in data["jobs"] if j["id"] != job_id]
-    if len(data["jobs"]) < before:
-        _save_cron(data)
-        return True
+    with _cron_lock():
+        data = _load_cron()
+        before = len(data["jobs"])
+        data["jobs"] = [j for j in data["jobs"] if j["id"] != job_id]
+        if len(data["jobs"]) < before:
+            _save_cron(data)
+            return True
     return False
 
 
 def enable_job(job_id: str, enabled: bool = True) -> bool:
     """Enable or disable a cron job."""
-    data = _load_cron()
-    for job in data["jobs"]:
-        if job["id"] == job_id:
-            job["enabled"] = enabled
-            _save_cron(data)
-            return True
+    with _cron_lock():
+        data = _load_cron()
+        for job in data["jobs"]:
+            if job["id"] == job_id:
+                job["enabled"] = enabled
+                _save_cron(data)
+                return True
     return False
 
 
 def list_jobs() -> list:
     """List all cron jobs."""
-    data = _load_cron()
-    return data["jobs"]
+    return [dict(job) for job in _peek_cron()["jobs"]]
 
 
-def check_due_jobs() -> list:
+def check_due_jobs(holder: Optional[str] = None, lease_seconds: Optional[int] = None,
+                   limit: Optional[int] = None, report: Optional[dict] = None) -> list:
     """
     Check which jobs are due for execution.
     Returns list of due jobs and updates their next_run times.
+
+    The common nothing-due case is a lock-free read. Otherwise the file
+    is re-read under the lock, so two sessions checking at once never
+    both fire the same run. Each job returned is leased to `holder`
+    (default: this process) for lease_seconds (default: the job's
+    lease_seconds, else CRON_LEASE_SECONDS); jobs whose previous run
+    still holds a live lease, or whose tags are at their limit, are
+    left for a later check.
+
+    At most `limit` jobs (default CRON_MAX_INJECT, 0 for all) are
+    claimed, longest overdue first. Each returned job carries "runs",
+    the scheduled times it fires for (more than one under
+    fire_all_up_to_N), and "missed", how many scheduled runs had passed.
+    A triggered job also carries "changed", the inputs that changed.
+    If `report` is a dict it receives {"queued", "skipped", "limited",
+    "unchanged"}: due jobs left for later checks by the cap, misfired
+    jobs skipped by skip_to_next, due jobs held back by tag limits, and
+    triggered jobs rescheduled because none of their inputs changed.
     """
-    data = _load_cron()
     now = time.time()
-    due = []
+    if report is not None:
+        report.update(queued=0, skipped=0, limited=0, unchanged=0)
+    if not any(job.get("enabled", True) and now >= _claimable_at(job, now)
+               for job in _peek_cron()["jobs"]):
+        return []
 
+    limit = CRON_MAX_INJECT if limit is None else limit
+    with _cron_lock():
+        return _claim_due_jobs(now, holder or f"pid-{os.getpid()}", lease_seconds,
+                               limit, report if report is not None else {})
+
+
+def _claim_due_jobs(now: float, holder: str, lease_seconds: Optional[int],
+                    limit: int, report: dict) -> list:
+    data = _load_cron()
+    limits = data.get("tag_limits", {})
+    running = {}
     for job in data["jobs"]:
-        if not job.get("enabled", True):
+        if _lease_active(job, now):
+            for tag in job.get("tags", []):
+                running[tag] = running.get(tag, 0) + 1
+
+    due = []
+    ended = []
+    changed = False
+    snapshots = None
+    snapshots_changed = False
+    report.update(queued=0, skipped=0, limited=0, unchanged=0)
+    candidates = [job for job in data["jobs"]
+                  if job.get("enabled", True) and now >= _claimable_at(job, now)]
+    for job in sorted(candidates, key=lambda j: j.get("next_run", 0)):
+        tags = job.get("tags", [])
+        if any(tag in limits and running.get(tag, 0) >= limits[tag] for tag in tags):
+            report["limited"] += 1
             continue
 
-        next_run = job.get("next_run", 0)
-        if now >= next_run:
-            due.append(job)
-            # Update scheduling
-            job["last_run"] = now
-            job["run_count"] = job.get("run_count", 0) + 1
-            interval = job.get("interval_seconds") or _parse_interval(job.get("schedule"))
-            if interval and interval > 0:
-                job["next_run"] = now + interval
+        inputs = None
+        if _has_triggers(job):
+            if snapshots is None:
+                snapshots = _load_snapshots()
+            inputs, snapshot = _trigger_changes(job, snapshots["jobs"].get(job["id"]))
+            if not inputs:
+                # Nothing changed: look again at the next scheduled time,
+                # from the memory log position read up to now
+                report["unchanged"] += 1
+                changed = True
+                if snapshot != snapshots["jobs"].get(job["id"]):
+                    snapshots["jobs"][job["id"]] = snapshot
+                    snapshots_changed = True
+                next_run = _rescheduled(job, now)
+                if next_run is not None:
+                    job["next_run"] = next_run
+                else:
+                    job["enabled"] = False
+                continue
+
+        times = _fire_times(job, now)
+        fires = _misfire_limit(job.get("misfire", "fire_once_now"))
+        if fires is None:
+            fires = 1  # Unknown policy from a newer version
+        if len(times) > 1 and fires == 0:
+            # skip_to_next: drop the missed runs
+            report["skipped"] += 1
+            changed = True
+            next_run = _rescheduled(job, now)
+            if next_run is not None:
+                job["next_run"] = next_run
             else:
-                # One-shot job — disable after run
                 job["enabled"] = False
+            continue
+        if limit and len(due) >= limit:
+            report["queued"] += 1
+            continue
+        for tag in tags:
+            running[tag] = running.get(tag, 0) + 1
+
+        runs = times[-max(fires, 1):]
+        if job.get("lease"):
+            # Expired without being completed (e.g. a crashed session)
+            ended.append((job["id"], _run_row(job["lease"], job["lease"]["expires"], "expired")))
+        # Update scheduling
+        job["last_run"] = now
+        job["run_count"] = job.get("run_count", 0) + len(runs)
+        job["lease"] = {
+            "holder": holder,
+            "claimed_at": now,
+            "expires": now + (lease_seconds or job.get("lease_seconds") or CRON_LEASE_SECONDS),
+            "due": job.get("next_run", now),
+        }
+        next_run = _rescheduled(job, now)
+        if next_run is not None:
+            job["next_run"] = next_run
+        else:
+            # One-shot job — disable after run
+            job["enabled"] = False
+            job["lease"]["one_shot"] = True
+        claimed = dict(job, runs=runs, missed=len(times))
+        if inputs:
+            claimed["changed"] = inputs
+            snapshots["jobs"][job["id"]] = snapshot
+            snapshots_changed = True
+        job["lease"]["injected"] = len("\n".join(_job_context(claimed)).encode())
+        due.append(claimed)
 
-    if due:
+    if due or changed:
         _save_cron(data)
+    if snapshots_changed:
+        _save_snapshots(snapshots, data)
+    _record_runs(ended)
 
     return due
 
 
+def _rescheduled(job: dict, now: float) -> Optional[float]:
+    """The job's next_run after a claim (or skip) at `now`, jitter included."""
+    try:
+        next_run = _next_run(job.get("schedule"), now, job.get("interval_seconds"))
+    except ValueError:
+        return None  # Malformed expression from an older version
+    return None if next_run is None else next_run + _jitter_offset(job)
+
+
+def complete_job(job_id: str, holder: Optional[str] = None, ok: bool = True,
+                 run: Optional[dict] = None, retry_after: float = 0) -> bool:
+    """
+    End the run of a claimed job: release its lease, and if the run
+    failed make the job due again in `retry_after` seconds, or at its
+    next scheduled run if that is sooner (re-enabling a one-shot job).
+    With a holder, only that holder's lease is released. Returns False if
+    the job holds no such lease (e.g. it expired and was claimed over).
+
+    The run is recorded in the history as "ok" or "failed"; `run`
+    overrides fields of its row, e.g. {"outcome": "timeout", "injected": 0}.
+    """
+    now = time.time()
+    with _cron_lock():
+        data = _load_cron()
+        for job in data["jobs"]:
+            if job["id"] != job_id:
+                continue
+            lease = job.get("lease")
+            if not lease or (holder is not None and lease.get("holder") != holder):
+                return False
+            del job["lease"]
+            if not ok:
+                retry = now + retry_after
+                if lease.get("one_shot"):
+                    job["enabled"] = True
+                    job["next_run"] = retry
+                else:
+                    job["next_run"] = min(job.get("next_run") or retry, retry)
+            _save_cron(data)
+            if not ok and _has_triggers(job):
+                # Forget the inputs it fired for, so the retry fires too
+                snapshots = _load_snapshots()
+                if snapshots["jobs"].pop(job_id, None) is not None:
+                    _save_snapshots(snapshots, data)
+            break
+        else:
+            return False
+    row = _run_row(lease, now, "ok" if ok else "failed")
+    for field, value in (run or {}).items():
+        row[HISTORY_FIELDS.index(field)] = value
+    _record_runs([(job_id, row)])
+    return True
+
+
+def release_leases(holder: str) -> int:
+    """Release every lease held by `holder` (its runs are over). Returns the count."""
+    if not any((job.get("lease") or {}).get("holder") == holder for job in _peek_cron()["jobs"]):
+        return 0
+    now = time.time()
+    rows = []
+    with _cron_lock():
+        data = _load_cron()
+        for job in data["jobs"]:
+            if (job.get("lease") or {}).get("holder") == holder:
+                rows.append((job["id"], _run_row(job.pop("lease"), now, "ok")))
+        if rows:
+            _save_cron(data)
+    _record_runs(rows)
+    return len(rows)
+
+
+def set_tag_limit(tag: str, limit: Optional[int]) -> dict:
+    """Allow at most `limit` jobs tagged `tag` to run at once (None removes
+    the limit). Returns all tag limits."""
+    if limit is not None and limit < 1:
+        raise ValueError(f"Tag limit must be a positive integer, not {limit!r}")
+    with _cron_lock():
+        data = _load_cron()
+        limits = data.setdefault("tag_limits", {})
+        if limit is None:
+            limits.pop(tag, None)
+        else:
+            limits[tag] = limit
+        _save_cron(data)
+        return dict(limits)
+
+
+def tag_limits() -> dict:
+    """{tag: limit} of the configured per-tag concurrency limits."""
+    return dict(_peek_cron().get("tag_limits", {}))
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _overran(job: dict, trigger: float, duration: float) -> Optional[bool]:
+    """Whether a run outlasted the time to the job's next scheduled run
+    (None for one-shot jobs)."""
+    interval = job.get("interval_seconds")
+    if not interval:
+        try:
+            following = _next_run(job.get("schedule"), trigger)
+        except ValueError:
+            return None
+        if following is None:
+            return None
+        interval = following - trigger
+    return duration > interval
+
+
+def run_stats(job_id: Optional[str] = None) -> list:
+    """
+    Per-job statistics from the run history: run count, outcomes, p50 /
+    p90 / p99 / max of duration and claim latency (seconds), injected
+    bytes, and "overrun", true when the job keeps outlasting its interval.
+    Jobs without recorded runs are left out.
+    """
+    history = read_json(_history_path(), {}).get("runs", {})
+    stats = []
+    for job in _peek_cron()["jobs"]:
+        rows = history.get(job["id"])
+        if not rows or (job_id is not None and job["id"] != job_id):
+            continue
+        columns = {field: [row[i] for row in rows] for i, field in enumerate(HISTORY_FIELDS)}
+        outcomes = {}
+        for outcome in columns["outcome"]:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        overruns = [_overran(job, row[0], row[2]) for row in rows]
+        overran = sum(1 for o in overruns if o)
+        scheduled = sum(1 for o in overruns if o is not None)
+        entry = {"id": job["id"], "name": job.get("name"), "runs": len(rows), "outcomes": outcomes}
+        for field in ("duration", "latency"):
+            values = sorted(columns[field])
+            entry[field] = {"p50": round(_percentile(values, 50), 3),
+                            "p90": round(_percentile(values, 90), 3),
+                            "p99": round(_percentile(values, 99), 3),
+                            "max": values[-1]}
+        entry["injected"] = {"mean": round(sum(columns["injected"]) / len(rows)),
+                             "max": max(columns["injected"])}
+        entry["overruns"] = overran
+        entry["overrun"] = scheduled >= OVERRUN_MIN_RUNS and overran >= OVERRUN_SHARE * scheduled
+        entry["last"] = dict(zip(HISTORY_FIELDS, rows[-1]))
+        stats.append(entry)
+    return stats
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{int(seconds) // 60}m {int(seconds) % 60}s"
+    return f"{int(seconds) // 3600}h {(int(seconds) % 3600) // 60}m"
+
+
+def format_stats_display(stats: list) -> str:
+    """Format run_stats() for terminal display."""
+    if not stats:
+        return "No cron runs recorded."
+
+    lines = []
+    for entry in stats:
+        outcomes = "  ".join(f"{k} {v}" for k, v in sorted(entry["outcomes"].items()))
+        duration, latency = entry["duration"], entry["latency"]
+        lines.append(f"  {entry['id']}  {entry['name']}  |  runs: {entry['runs']}  |  {outcomes}")
+        lines.append("             duration " + "  ".join(
+            f"{p} {_format_seconds(duration[p])}" for p in ("p50", "p90", "p99", "max")))
+        lines.append("             latency  " + "  ".join(
+            f"{p} {_format_seconds(latency[p])}" for p in ("p50", "p90", "p99", "max")))
+        lines.append(f"             injected mean {entry['injected']['mean']} B  max {entry['injected']['max']} B")
+        if entry["overrun"]:
+            lines.append(f"             OVERRUN: {entry['overruns']} of {entry['runs']} runs outlasted the interval")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
 def format_jobs_display(jobs: list) -> str:
     """Format jobs for terminal display."""
     if not jobs:
@@ -201,7 +909,11 @@ def format_jobs_display(jobs: list) -> str:
     for job in jobs:
         status = "enabled" if job.get("enabled", True) else "disabled"
         next_run = job.get("next_run", 0)
-        if next_run and next_run > now:
+        if _lease_active(job, now):
+            lease = job["lease"]
+            until = time.strftime("%H:%M:%S", time.localtime(lease["expires"]))
+            time_display = f"running ({lease['holder']}, lease until {until})"
+        elif next_run and next_run > now:
             remaining = int(next_run - now)
             if remaining > 3600:
                 time_str = f"{remaining // 3600}h {(remaining % 3600) // 60}m"
@@ -215,16 +927,47 @@ def format_jobs_display(jobs: list) -> str:
 
         lines.append(f"  [{status:>8}] {job['id']}  {job['name']}")
         lines.append(f"             schedule: {json.dumps(job['schedule'])}  |  {time_display}  |  runs: {job.get('run_count', 0)}")
+        if _has_triggers(job):
+            inputs = list(job.get("on_file_change", []))
+            inputs += ["memory " + ",".join(f"{k}:{v}" if k == "tag" else v for k, v in t.items())
+                       for t in job.get("on_memory_change", [])]
+            lines.append(f"             on change: {', '.join(inputs)}")
         lines.append(f"             {job['instruction'][:80]}")
         lines.append("")
 
     return "\n".join(lines)
 
 
-def generate_due_context(due_jobs: list) -> str:
+def _job_context(job: dict) -> list:
+    """The lines generate_due_context() shows for one claimed job."""
+    lines = [
+        f"### [{job['name']}] (`{job['id']}`)",
+        f"Created by: {job.get('created_by', 'unknown')}",
+        f"Run count: {job.get('run_count', 0)}",
+    ]
+    runs, missed = job.get("runs", []), job.get("missed", 1)
+    if len(runs) > 1:
+        at = ", ".join(time.strftime("%Y-%m-%d %H:%M", time.localtime(t)) for t in runs)
+        lines.append(f"Missed runs: {missed} — run this {len(runs)} times, once for each of: {at}")
+    elif missed > 1:
+        more = "+" if missed >= MISFIRE_COUNT_MAX else ""
+        lines.append(f"Missed runs: {missed}{more} — coalesced into this one run")
+    changed = job.get("changed")
+    if changed:
+        shown = ", ".join(changed[:TRIGGER_CHANGES_SHOWN])
+        more = f" (+{len(changed) - TRIGGER_CHANGES_SHOWN} more)" if len(changed) > TRIGGER_CHANGES_SHOWN else ""
+        lines.append(f"Changed since last run: {shown}{more}")
+    lines.append("")
+    lines.append(job["instruction"])
+    lines.append("")
+    return lines
+
+
+def generate_due_context(due_jobs: list, queued: int = 0) -> str:
     """
     Generate context to inject for due cron jobs.
     This is added to the system prompt when jobs trigger.
+    `queued` due jobs beyond the per-check cap are mentioned, not shown.
     """
     if not due_jobs:
         return ""
@@ -236,11 +979,10 @@ def generate_due_context(due_jobs: list) -> str:
     lines.append("")
 
     for job in due_jobs:
-        lines.append(f"### [{job['name']}] (`{job['id']}`)")
-        lines.append(f"Created by: {job.get('created_by', 'unknown')}")
-        lines.append(f"Run count: {job.get('run_count', 0)}")
-        lines.append(f"")
-        lines.append(job["instruction"])
+        lines.extend(_job_context(job))
+
+    if queued:
+        lines.append(f"*{queued} more due job(s) queued for the next prompts.*")
         lines.append("")
 
     return "\n".join(lines)
@@ -254,20 +996,120 @@ if __name__ == "__main__":
         jobs = list_jobs()
         print(format_jobs_display(jobs))
     elif action == "check":
-        due = check_due_jobs()
+        report = {}
+        due = check_due_jobs(report=report)
         if due:
-            print(generate_due_context(due))
+            print(generate_due_context(due, report["queued"]))
         else:
             print(json.dumps({"due_jobs": 0}))
     elif action == "add" and len(sys.argv) >= 5:
-        name = sys.argv[2]
-        schedule = json.loads(sys.argv[3])
-        instruction = sys.argv[4]
-        created_by = sys.argv[5] if len(sys.argv) > 5 else "user"
-        job = add_job(name, schedule, instruction, created_by=created_by)
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="cron.py add")
+        parser.add_argument("name")
+        parser.add_argument("schedule")
+        parser.add_argument("instruction")
+        parser.add_argument("created_by", nargs="?", default="user")
+        parser.add_argument("--tags", default="", help="comma-separated")
+        parser.add_argument("--misfire", default="fire_once_now",
+                            help="fire_once_now | skip_to_next | fire_all_up_to_N")
+        parser.add_argument("--jitter", type=float, default=0, help="seconds")
+        parser.add_argument("--namespace", default="cron", help="memory namespace for run-daemon output")
+        parser.add_argument("--timeout", type=float, default=None, help="run-daemon deadline, seconds")
+        parser.add_argument("--on-file-change", action="append", default=[], metavar="GLOB",
+                            help="fire only when matching files changed (repeatable)")
+        parser.add_argument("--on-memory-change", action="append", default=[], metavar="NS|tag:T",
+                            help="fire only when matching memory changed (repeatable)")
+        args = parser.parse_args(sys.argv[2:])
+        try:
+            schedule = json.loads(args.schedule)
+        except ValueError:
+            schedule = args.schedule  # A bare cron expression: 0 9 * * 1-5
+        tags = [t.strip() for t in args.tags.split(",") if t.strip()]
+        try:
+            job = add_job(args.name, schedule, args.instruction, created_by=args.created_by,
+                          tags=tags, misfire=args.misfire, jitter=args.jitter,
+                          namespace=args.namespace, timeout=args.timeout,
+                          on_file_change=args.on_file_change,
+                          on_memory_change=[_memory_trigger(t) for t in args.on_memory_change])
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
         print(json.dumps(job, indent=2))
+    elif action == "next" and len(sys.argv) >= 3:
+        # Preview the next fire times of a schedule
+        try:
+            schedule = json.loads(sys.argv[2])
+        except ValueError:
+            schedule = sys.argv[2]
+        count = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+        try:
+            at, times = time.time(), []
+            for _ in range(count):
+                at = _next_run(schedule, at)
+                if at is None:
+                    break
+                times.append(time.strftime("%Y-%m-%d %H:%M:%S %Z", time.localtime(at)))
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        print(json.dumps({"schedule": schedule, "next": times}, indent=2))
     elif action == "remove" and len(sys.argv) >= 3:
         result = remove_job(sys.argv[2])
         print(json.dumps({"removed": result}))
+    elif action == "complete" and len(sys.argv) >= 3:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="cron.py complete")
+        parser.add_argument("job_id")
+        parser.add_argument("--failed", action="store_true", help="make the job due again")
+        parser.add_argument("--holder", default=None, help="only release this holder's lease")
+        args = parser.parse_args(sys.argv[2:])
+        print(json.dumps({"completed": complete_job(args.job_id, args.holder, ok=not args.failed)}))
+    elif action == "stats":
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="cron.py stats")
+        parser.add_argument("job_id", nargs="?", default=None)
+        parser.add_argument("--json", action="store_true")
+        args = parser.parse_args(sys.argv[2:])
+        stats = run_stats(args.job_id)
+        print(json.dumps(stats, indent=2) if args.json else format_stats_display(stats))
+    elif action == "limit":
+        # limit                 → show limits
+        # limit <tag> <n|none>  → set or remove one
+        if len(sys.argv) >= 4:
+            try:
+                limit = None if sys.argv[3].lower() == "none" else int(sys.argv[3])
+                print(json.dumps(set_tag_limit(sys.argv[2], limit), indent=2))
+            except ValueError as e:
+                print(json.dumps({"error": str(e)}))
+                sys.exit(1)
+        else:
+            print(json.dumps(tag_limits(), indent=2))
+    elif action == "run-daemon":
+        import argparse
+
+        try:
+            from core import crondaemon
+        except ImportError:
+            import crondaemon
+
+        parser = argparse.ArgumentParser(prog="cron.py run-daemon")
+        parser.add_argument("--command", default=os.environ.get("NIKA_CRON_COMMAND", ""),
+                            help="e.g. 'claude -p {instruction}'; also {id}, {name}, {scheduled}")
+        parser.add_argument("--workers", type=int, default=2, help="jobs running at once")
+        parser.add_argument("--timeout", type=float, default=crondaemon.DAEMON_TIMEOUT,
+                            help="seconds per job, unless the job sets its own")
+        parser.add_argument("--once", action="store_true", help="run what is due now, then exit")
+        args = parser.parse_args(sys.argv[2:])
+        try:
+            if args.workers < 1 or args.timeout <= 0:
+                raise ValueError("--workers and --timeout must be positive")
+            crondaemon.run_daemon(args.command, workers=args.workers, timeout=args.timeout,
+                                  once=args.once)
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
     else:
-        print("Usage: cron.py [list|check|add|remove] [args...]")
+        print("Usage: cron.py [list|check|add|remove|next|complete|limit|stats|run-daemon] [args...]")
@@ -0,0 +1,239 @@
+"""
+Nika cron daemon — runs due jobs headless, without waiting for a session.
+
+  python3 core/cron.py run-daemon --command 'claude -p {instruction}' [--workers 2]
+                                  [--timeout 600] [--once]
+
+Sleeps until the earliest next_run, polling the one-line next-due
+sidecar so jobs added meanwhile are seen within DAEMON_POLL seconds.
+Then it claims due jobs, leased to the daemon like any session's claim,
+and runs each through the command template, at most --workers at a time.
+
+The template (--command, or NIKA_CRON_COMMAND) is split like a shell
+command line and {instruction}, {id}, {name} and {scheduled} (epoch
+seconds) are substituted inside each argument. No shell is involved, so
+an instruction needs no quoting. The process gets NIKA_CRON_JOB_ID,
+NIKA_CRON_JOB_NAME and, for triggered jobs, NIKA_CRON_CHANGED (the
+changed inputs, one per line). A job's runs share one deadline, its
+`timeout` or --timeout; past it the run's process group is killed.
+
+Each finished job is remembered under its namespace (default "cron")
+as "<name>-last-run": exit code, duration, and the last
+DAEMON_OUTPUT_MAX characters of stdout and stderr. Its lease is then
+released and the run added to the job's history as ok, failed or
+timeout (see `cron.py stats`). A failed or timed-out job is due again
+after DAEMON_RETRY_DELAY seconds (or at its next scheduled run, if
+sooner) rather than at once, which would loop on a broken command; a
+triggered job also forgets the inputs it fired for, so the retry runs
+even if nothing changes meanwhile. One JSON line per finished job goes
+to stdout.
+"""
+
+import concurrent.futures
+import json
+import os
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from typing import Optional
+
+try:
+    from core import cron
+    from core.paths import cron_next_due, find_project_root
+except ImportError:
+    # Run as a script from core/
+    import cron
+    from paths import cron_next_due, find_project_root
+
+
+# Longest sleep between looks at the next-due sidecar
+DAEMON_POLL = 1.0
+
+# Default per-job deadline, in seconds
+DAEMON_TIMEOUT = 600
+
+# Characters of stdout / stderr kept per run
+DAEMON_OUTPUT_MAX = 64 * 1024
+
+# Extra lease time past the deadline, for recording the result
+LEASE_SLACK = 60
+
+# Seconds before a failed or timed-out job is due again
+DAEMON_RETRY_DELAY = 60
+
+
+def build_command(template: str, job: dict, scheduled: float) -> list:
+    """argv for one run: the template split, then the job's fields substituted."""
+    fields = {
+        "{instruction}": job.get("instruction", ""),
+        "{id}": job["id"],
+        "{name}": job.get("name", ""),
+        "{scheduled}": str(int(scheduled)),
+    }
+    argv = []
+    for arg in shlex.split(template):
+        for placeholder, value in fields.items():
+            arg = arg.replace(placeholder, value)
+        argv.append(arg)
+    return argv
+
+
+def _run(argv: list, timeout: float, env: dict) -> dict:
+    """Run one process; kill its process group if it outlives `timeout`."""
+    start = time.time()
+    posix = os.name == "posix"
+    try:
+        proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, cwd=find_project_root(), env=env,
+                                start_new_session=posix)
+    except OSError as e:
+        return {"exit_code": None, "error": str(e), "timed_out": False,
+                "started": start, "ms": 0.0, "stdout": "", "stderr": ""}
+    timed_out = False
+    try:
+        out, err = proc.communicate(timeout=max(timeout, 0.0))
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        if posix:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            proc.kill()
+        out, err = proc.communicate()
+    return {
+        "exit_code": proc.returncode,
+        "timed_out": timed_out,
+        "started": start,
+        "ms": round((time.time() - start) * 1000, 1),
+        "stdout": out.decode("utf-8", "replace")[-DAEMON_OUTPUT_MAX:],
+        "stderr": err.decode("utf-8", "replace")[-DAEMON_OUTPUT_MAX:],
+    }
+
+
+def execute_job(job: dict, template: str, timeout: float) -> dict:
+    """Run every scheduled run of a claimed job within its deadline;
+    returns the result of the last one, with "runs" (how many ran)."""
+    deadline = time.time() + (job.get("timeout") or timeout)
+    env = dict(os.environ, NIKA_CRON_JOB_ID=job["id"], NIKA_CRON_JOB_NAME=job.get("name", ""),
+               NIKA_CRON_CHANGED="\n".join(job.get("changed", [])))
+    result, ran = None, 0
+    for scheduled in job.get("runs") or [time.time()]:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        result = _run(build_command(template, job, scheduled), remaining, env)
+        result["scheduled"] = scheduled
+        ran += 1
+        if result["timed_out"] or result["exit_code"] != 0:
+            break
+    if result is None:
+        result = {"exit_code": None, "timed_out": True, "started": time.time(), "ms": 0.0,
+                  "stdout": "", "stderr": "", "scheduled": None}
+    result["runs"] = ran
+    return result
+
+
+def _record(job: dict, result: dict) -> None:
+    try:
+        from core.memory import remember
+    except ImportError:
+        from memory import remember
+    remember(
+        namespace=job.get("namespace") or "cron",
+        key=f"{job.get('name') or job['id']}-last-run",
+        value=dict(result, job_id=job["id"], ok=_outcome(result) == "ok"),
+        tags=["cron-run", job["id"]],
+    )
+
+
+def _outcome(result: dict) -> str:
+    if result["timed_out"]:
+        return "timeout"
+    return "ok" if result["exit_code"] == 0 else "failed"
+
+
+def _finish(job: dict, template: str, timeout: float, holder: str) -> dict:
+    run = {"outcome": "failed", "injected": 0}
+    try:
+        result = execute_job(job, template, timeout)
+        run["outcome"] = _outcome(result)
+        try:
+            _record(job, result)
+        except Exception as e:
+            result["record_error"] = str(e)
+    finally:
+        cron.complete_job(job["id"], holder=holder, ok=run["outcome"] == "ok", run=run,
+                          retry_after=DAEMON_RETRY_DELAY)
+    return result
+
+
+def run_daemon(template: str, workers: int = 2, timeout: float = DAEMON_TIMEOUT,
+               once: bool = False, holder: Optional[str] = None,
+               stop: Optional[threading.Event] = None) -> int:
+    """
+    Claim and run due jobs until stopped (SIGTERM / Ctrl-C, or `stop`
+    being set); with once=True, until nothing is due and every job
+    started has finished. Returns how many jobs ran.
+    """
+    if not template:
+        raise ValueError("No command template: pass --command or set NIKA_CRON_COMMAND")
+    shlex.split(template)  # Fail early on unbalanced quotes
+    holder = holder or f"daemon-{os.getpid()}"
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    finished = 0
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nika-cron")
+    running = {}
+    try:
+        while True:
+            for future in [f for f in running if f.done()]:
+                job = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"error": str(e)}
+                finished += 1
+                print(json.dumps({"job": job["id"], "name": job.get("name"),
+                                  **{k: v for k, v in result.items() if k not in ("stdout", "stderr")}}),
+                      flush=True)
+            if stop.is_set():
+                if not running:
+                    break
+                concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                continue
+
+            due = cron_next_due()
+            if due is None:
+                due = cron.cron_summary()["next_due"]
+                due = float("inf") if due is None else due
+            now = time.time()
+            if now >= due and len(running) < workers:
+                # The lease outlasts the longest deadline a claimed job can have
+                longest = max([timeout] + [job.get("timeout") or 0 for job in cron.list_jobs()])
+                claimed = cron.check_due_jobs(holder=holder, lease_seconds=longest + LEASE_SLACK,
+                                              limit=workers - len(running))
+                for job in claimed:
+                    running[pool.submit(_finish, job, template, timeout, holder)] = job
+                if claimed:
+                    continue
+
+            if once and not running:
+                break
+            wait = min(DAEMON_POLL, max(due - now, 0.0)) if now < due else DAEMON_POLL
+            if running:
+                concurrent.futures.wait(running, timeout=wait,
+                                        return_when=concurrent.futures.FIRST_COMPLETED)
+            else:
+                stop.wait(wait)
+    except KeyboardInterrupt:
+        stop.set()
+        concurrent.futures.wait(running)
+    finally:
+        pool.shutdown(wait=True)
+    return finished
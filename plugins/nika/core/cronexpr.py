@@ -0,0 +1,253 @@
+"""
+Nika cron expressions — five-field schedules compiled to bitsets.
+
+  ┌───────── minute        0-59
+  │ ┌─────── hour          0-23
+  │ │ ┌───── day of month  1-31
+  │ │ │ ┌─── month         1-12 or jan-dec
+  │ │ │ │ ┌─ day of week   0-7 or sun-sat (0 and 7 are Sunday)
+  * * * * *
+
+Each field takes `*`, numbers, names, ranges (`1-5`, `mon-fri`), steps
+(`*/15`, `10-50/20`, `5/10` = 5 to the end of the range) and comma
+lists of these. As in Vixie cron, when both day fields are restricted a
+day matches either of them; otherwise it must match both. The macros
+@yearly (@annually), @monthly, @weekly, @daily (@midnight) and @hourly
+stand for their usual expressions.
+
+Times are wall-clock times in a timezone: the local one by default, or
+an IANA name given with a `CRON_TZ=Europe/Paris ` prefix or the tz
+argument. A time skipped by a DST change fires as far past the gap as
+it was into it (02:30 becomes 03:30); a time that occurs twice fires
+once, at its first occurrence.
+
+An expression is parsed once into one integer bitmask per field (and the
+day-of-week mask pre-expanded to day-of-month masks for the seven
+possible weekdays of the 1st), so next_after() jumps field by field to
+the next set bit instead of stepping through minutes.
+
+Usage:
+  expr = compile_expr("0 9 * * mon-fri", tz="Europe/Paris")
+  expr.next_after(time.time())   # epoch seconds of the next 09:00 weekday
+"""
+
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# (low, high, names) per field
+FIELDS = (
+    (0, 59, None),
+    (0, 23, None),
+    (1, 31, None),
+    (1, 12, MONTH_NAMES),
+    (0, 7, DAY_NAMES),
+)
+
+# Years searched before an expression is declared never to fire
+# (Feb 29 on a given weekday recurs within 28 years)
+MAX_YEARS = 28
+
+
+def _next_bit(mask: int, start: int) -> Optional[int]:
+    """Lowest set bit of mask at or above start, or None."""
+    rest = mask >> start
+    if not rest:
+        return None
+    return start + (rest & -rest).bit_length() - 1
+
+
+def _parse_value(text: str, names, field: str) -> int:
+    if names and text.lower() in names:
+        return names[text.lower()]
+    if not text.isdigit():
+        raise ValueError(f"Invalid value {text!r} in cron field {field!r}")
+    return int(text)
+
+
+def _parse_field(field: str, low: int, high: int, names) -> int:
+    """Bitmask (bit n = value n allowed) for one field."""
+    mask = 0
+    for part in field.split(","):
+        range_part, _, step_part = part.partition("/")
+        step = 1
+        if step_part:
+            if not step_part.isdigit() or int(step_part) == 0:
+                raise ValueError(f"Invalid step in cron field {field!r}")
+            step = int(step_part)
+        if range_part == "*":
+            start, end = low, high
+        elif "-" in range_part:
+            first, _, last = range_part.partition("-")
+            start, end = _parse_value(first, names, field), _parse_value(last, names, field)
+        else:
+            start = _parse_value(range_part, names, field)
+            end = high if step_part else start
+        if not low <= start <= high or not low <= end <= high or start > end:
+            raise ValueError(f"Out of range in cron field {field!r} (allowed {low}-{high})")
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask
+
+
+# Bits 1-35: the 7-bit week pattern repeated five times, from day 1
+_WEEKS = sum(1 << (7 * week + 1) for week in range(5))
+_ALL_DAYS = (1 << 32) - 2
+
+
+def _weekday_days(weekdays: int) -> tuple:
+    """Days of the month that fall on an allowed weekday, for each
+    weekday the 1st can fall on (0 = Sunday)."""
+    masks = []
+    for first in range(7):
+        # bit k: weekday of day k + 1
+        week = ((weekdays >> first) | (weekdays << (7 - first))) & 0x7F
+        masks.append(week * _WEEKS & _ALL_DAYS)
+    return tuple(masks)
+
+
+class CronExpr:
+    """A compiled five-field cron expression (see module docstring)."""
+
+    __slots__ = ("source", "tz", "tzinfo", "minutes", "hours", "days", "months",
+                 "weekdays", "_dom_any", "_dow_any", "_weekday_days")
+
+    def __init__(self, expression: str, tz: Optional[str] = None):
+        text = expression.strip()
+        if text.startswith(("CRON_TZ=", "TZ=")):
+            prefix, _, text = text.partition(" ")
+            tz = tz or prefix.split("=", 1)[1]
+            text = text.strip()
+        text = MACROS.get(text.lower(), text)
+        fields = text.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+
+        self.source = expression
+        self.tz = tz
+        self.tzinfo = None
+        if tz:
+            if ZoneInfo is None:
+                raise ValueError("Timezones need Python 3.9+ (zoneinfo)")
+            try:
+                self.tzinfo = ZoneInfo(tz)
+            except (KeyError, ValueError, OSError) as e:  # ZoneInfoNotFoundError is a KeyError
+                raise ValueError(f"Unknown timezone {tz!r}") from e
+
+        masks = [_parse_field(f, low, high, names) for f, (low, high, names) in zip(fields, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = masks
+        if weekdays & (1 << 7):
+            weekdays = (weekdays | 1) & ~(1 << 7)  # 7 is Sunday too
+        self.weekdays = weekdays
+        self._dom_any = fields[2].startswith("*")
+        self._dow_any = fields[4].startswith("*")
+
+        self._weekday_days = _weekday_days(weekdays)
+
+    def __repr__(self):
+        return f"CronExpr({self.source!r}, tz={self.tz!r})"
+
+    def _day_mask(self, year: int, month: int) -> int:
+        first, length = calendar.monthrange(year, month)
+        in_month = (1 << (length + 1)) - 2
+        by_weekday = self._weekday_days[(first + 1) % 7]  # monthrange: Monday = 0
+        if self._dom_any or self._dow_any:
+            return self.days & by_weekday & in_month
+        return (self.days | by_weekday) & in_month
+
+    def _next_wall(self, year: int, month: int, day: int, hour: int, minute: int):
+        """First matching wall time at or after the given one, or None."""
+        last_year = year + MAX_YEARS
+        while year <= last_year:
+            found = _next_bit(self.months, month)
+            if found is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if found != month:
+                month, day, hour, minute = found, 1, 0, 0
+
+            found = _next_bit(self._day_mask(year, month), day)
+            if found is None:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute = 1, 0, 0
+                continue
+            if found != day:
+                day, hour, minute = found, 0, 0
+
+            found = _next_bit(self.hours, hour)
+            if found is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if found != hour:
+                hour, minute = found, 0
+
+            found = _next_bit(self.minutes, minute)
+            if found is None:
+                hour, minute = hour + 1, 0
+                continue
+            return year, month, day, hour, found
+        return None
+
+    def _offset(self, ts: float) -> timedelta:
+        wall = datetime.fromtimestamp(ts, self.tzinfo)
+        return (wall if self.tzinfo else wall.astimezone()).utcoffset()
+
+    def next_after(self, ts: float) -> Optional[float]:
+        """Epoch seconds of the first fire time strictly after ts (None if it never fires)."""
+        wall = datetime.fromtimestamp(ts, self.tzinfo).replace(second=0, microsecond=0, tzinfo=None)
+        # Wall times skipped by a DST gap in the last day fire that much
+        # later, so some may still be due: search from before the gap
+        shift = self._offset(ts) - self._offset(ts - 86400)
+        if shift > timedelta(0):
+            wall -= shift
+        wall += timedelta(minutes=1)
+        best = limit = None
+        while True:
+            found = self._next_wall(wall.year, wall.month, wall.day, wall.hour, wall.minute)
+            if found is None:
+                return best
+            wall = datetime(*found)
+            if limit is not None and wall >= limit:
+                return best
+            # fold=0: the first of a repeated wall time, and a skipped
+            # one at the offset before the gap
+            fire = datetime(*found, tzinfo=self.tzinfo).timestamp()
+            if fire > ts:
+                best = fire if best is None else min(best, fire)
+                shown = datetime.fromtimestamp(fire, self.tzinfo).replace(tzinfo=None)
+                if shown == wall:
+                    return best
+                # A skipped wall time: a real one before `shown` fires sooner
+                limit = limit or shown
+            # Passed already (or fired before a DST fall-back): look further on
+            wall += timedelta(minutes=1)
+
+
+@lru_cache(maxsize=1024)
+def compile_expr(expression: str, tz: Optional[str] = None) -> CronExpr:
+    """Parse an expression once; later calls with the same text share the result.
+
+    Raises ValueError for anything that is not a valid expression."""
+    return CronExpr(expression, tz)
+
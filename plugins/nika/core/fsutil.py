@@ -0,0 +1,206 @@
+"""
+Nika file utilities — crash-atomic writes and advisory locks.
+
+Every Nika state file is replaced atomically: the new content goes to a
+temp file in the same directory, is fsync'd, and is renamed over the
+old file, so readers see either the old or the new version and a crash
+never leaves a truncated file behind. The temp file takes the replaced
+file's permissions (a new file gets 0666 less the umask, as open() would
+give it), so a group-shared checkout stays shared.
+
+Writers coordinate through an advisory lock on a sibling "<file>.lock"
+(the data file itself is replaced on every write, so it cannot carry
+the lock). Waiting is bounded: LockTimeout is raised after `timeout`
+seconds instead of hanging a hook past its deadline.
+
+read_json_cached() keeps the last parse of each file for the rest of
+the process and reuses it while the file's signature is unchanged, so
+lock-free readers parse a state file once however often they ask.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+LOCK_TIMEOUT = float(os.environ.get("NIKA_LOCK_TIMEOUT", "5"))
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a state-file lock cannot be acquired in time."""
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = None):
+    """Hold an exclusive advisory lock for `path` (via path + ".lock")."""
+    timeout = LOCK_TIMEOUT if timeout is None else timeout
+    lock_path = Path(str(path) + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o666)  # Less the umask
+    try:
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while not _try_lock(fd):
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out after {timeout:g}s waiting for {lock_path}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.005)
+        try:
+            yield
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(directory: Path) -> None:
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_UMASK = None
+
+
+def _default_mode() -> int:
+    global _UMASK
+    if _UMASK is None:
+        # Reading the umask means setting it; do it once per process
+        _UMASK = os.umask(0o022)
+        os.umask(_UMASK)
+    return 0o666 & ~_UMASK
+
+
+def match_mode(fd: int, path: Path) -> None:
+    """Give the temp file open on `fd` the permissions of `path`, or those
+    of a newly created file (mkstemp() makes it 0600)."""
+    if not hasattr(os, "fchmod"):
+        return  # Windows: no POSIX modes to keep
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except OSError:
+        mode = _default_mode()
+    os.fchmod(fd, mode)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write text to path via temp file + fsync + rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        match_mode(fd, path)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _SNAPSHOTS.pop(str(path), None)
+    _fsync_dir(path.parent)
+
+
+def atomic_write_json(path: Path, data, indent=2) -> None:
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+def read_json(path: Path, default):
+    """
+    Load JSON from path, or return `default` if the file is missing.
+
+    A file that exists but does not parse is moved aside to
+    "<file>.corrupt-<timestamp>" (and reported on stderr) before the
+    default is returned, so the next write cannot destroy it.
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return default
+    except OSError:
+        return default
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        quarantine = path.with_name(f"{path.name}.corrupt-{int(time.time())}")
+        try:
+            os.replace(path, quarantine)
+            print(f"Nika: {path} was unreadable ({e}); moved to {quarantine}", file=sys.stderr)
+        except OSError:
+            pass
+        return default
+
+
+def file_signature(path: Path):
+    """Identity of the current file version (changes on every atomic replace)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# {path: (signature, parsed data)} for read_json_cached()
+_SNAPSHOTS = {}
+
+
+def read_json_cached(path: Path, default):
+    """
+    read_json(), reusing this process's last parse of the file while its
+    signature is unchanged. The result is shared between callers and
+    must not be mutated; transactions read with read_json() instead.
+    """
+    key = str(path)
+    signature = file_signature(path)
+    if signature is None:
+        _SNAPSHOTS.pop(key, None)
+        return default
+    cached = _SNAPSHOTS.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    data = read_json(path, default)
+    # Only keep it if no writer replaced the file while we read it
+    if file_signature(path) == signature:
+        _SNAPSHOTS[key] = (signature, data)
+    return data
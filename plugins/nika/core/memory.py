@@ -2,35 +2,147 @@
 Nika Persistent Memory Engine.
 
 File-based persistent memory that survives across sessions.
-Stores structured knowledge in .claude/nika-memory.json with
-namespaced keys, TTL support, and semantic tagging.
-
-Memory layout:
-  .claude/nika-memory.json        — main memory store
-  .claude/nika-memory.index.json  — tag-based index for fast lookup
+Stores structured knowledge in .claude/ with namespaced keys,
+TTL support, and semantic tagging.
+
+Memory layout (see core/storage.py for backend selection):
+  .claude/nika-memory.json        — main memory store (json backend)
+  .claude/nika-memory.index.json  — tag and expiry index for fast lookup
+  .claude/nika-memory.search.json — full-text index (json backend)
+  .claude/nika-memory.db          — SQLite store (sqlite backend)
+  .claude/nika-memory.access.log  — write-behind log of recalls
+  .claude/nika-memory.changes.log — change feed for watch() (see core/changes.py)
+  .claude/nika-memory.vectors     — similarity vectors (see core/vectors.py)
+  .claude/nika-memory.limits.json — optional entry/byte budgets (see load_limits)
+  .claude/nika-memory.summary.json — what session start shows (see session_summary)
+  .claude/nika-memory.maintenance — touched after each full GC (see maintenance_due)
+  .claude/nika-blobs/             — large values, stored out of line (see core/blobs.py)
+
+recall() never writes the store: it appends a tiny "<id> <time>" record
+to the access log, and compact_access_log() later folds those records
+into each entry's access_count / last_accessed.
+
+Every mutation runs through _mutate(), which re-runs the change when an
+optimistic transaction loses a race (NIKA_MEMORY_CONCURRENCY=optimistic)
+and takes the store lock for the final attempt so a writer under heavy
+contention still makes progress. With NIKA_MEMORY_GC_BATCH=N each write
+also expires up to N due entries, spreading GC across normal traffic.
+Once a mutation commits, each entry it stored or removed is appended to
+the change log, which watch() follows so pods can react to each other's
+writes without re-reading the store. Its vector records (a new vector
+per stored entry, a tombstone per removed one) are appended as it
+commits, under the store's write lock, so they land in commit order.
+
+When budgets are configured, remember() evicts entries in the same
+transaction until the namespace and the store are back within them.
+
+Values whose JSON text exceeds NIKA_MEMORY_BLOB_THRESHOLD bytes (default
+16 KiB) go to the blob store; the entry keeps "value": null plus a
+"blob" reference with the digest, size and a short text preview. Read
+functions resolve the value per returned entry (resolve=False skips it),
+so loading the store, stats and listings never read blobs.
 """
 
 import json
 import os
 import time
 import hashlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional
+
+try:
+    from core.blobs import BlobStore
+    from core.changes import ChangeLog
+    from core.fsutil import atomic_write_json, read_json
+    from core.paths import find_project_root
+    from core.storage import (open_backend, migrate_json_to_sqlite, entry_size, WriteConflict,
+                              EVICTION_POLICIES, TOP_K_ORDERS)
+    from core.tagquery import parse as parse_tag_query
+    from core.textindex import entry_text, query_terms
+    from core.vectors import VectorIndex, embed
+except ImportError:
+    # Run as a script from core/
+    from blobs import BlobStore
+    from changes import ChangeLog
+    from fsutil import atomic_write_json, read_json
+    from paths import find_project_root
+    from storage import (open_backend, migrate_json_to_sqlite, entry_size, WriteConflict,
+                         EVICTION_POLICIES, TOP_K_ORDERS)
+    from tagquery import parse as parse_tag_query
+    from textindex import entry_text, query_terms
+    from vectors import VectorIndex, embed
 
 
 MEMORY_FILE = ".claude/nika-memory.json"
 INDEX_FILE = ".claude/nika-memory.index.json"
+DB_FILE = ".claude/nika-memory.db"
+ACCESS_LOG_FILE = ".claude/nika-memory.access.log"
+CHANGES_FILE = ".claude/nika-memory.changes.log"
+VECTORS_FILE = ".claude/nika-memory.vectors"
+LIMITS_FILE = ".claude/nika-memory.limits.json"
+SUMMARY_FILE = ".claude/nika-memory.summary.json"
+MAINTENANCE_FILE = ".claude/nika-memory.maintenance"
+BLOB_DIR = ".claude/nika-blobs"
+
+# Fold the access log into the store once it grows past this size
+ACCESS_LOG_COMPACT_BYTES = 256 * 1024
+
+# Claimed logs older than this are assumed orphaned by a crashed compaction
+ACCESS_LOG_ORPHAN_SECONDS = 60
+
+# The change log keeps its newest half once it grows past this size
+CHANGE_LOG_MAX_BYTES = 1024 * 1024
+
+# Optimistic attempts before falling back to a locked transaction
+WRITE_ATTEMPTS = 8
+
+# Amortized GC: every write also expires up to this many due entries
+# (0 disables; expiry then happens only in gc_expired)
+GC_BATCH = int(os.environ.get("NIKA_MEMORY_GC_BATCH", "0") or 0)
+
+# Similarity vectors are maintained unless NIKA_MEMORY_VECTORS=0
+VECTORS_ENABLED = os.environ.get("NIKA_MEMORY_VECTORS", "1") != "0"
+
+# Rewrite the vector file once it holds this many rows beyond 2x the live entries
+VECTOR_COMPACT_SLACK = 64
+
+# Eviction candidates fetched per index probe
+EVICT_BATCH = 16
+
+# Entries per list in the session summary (the similar-project list
+# keeps twice as many, so deletions rarely leave it short)
+SUMMARY_K = 5
+SUMMARY_VERSION = 1
+
+# Context entries with this tag are bookkeeping (the Stop hook's
+# last-session): shown, but left out of the text the related list is
+# matched against
+SUMMARY_FOCUS_SKIP_TAG = "meta"
+
+# Values whose JSON text is larger than this go to the blob store (0 disables)
+BLOB_THRESHOLD = int(os.environ.get("NIKA_MEMORY_BLOB_THRESHOLD", str(16 * 1024)) or 0)
+
+# zlib-compress blobs (when it makes them smaller) unless NIKA_MEMORY_BLOB_COMPRESS=0
+BLOB_COMPRESS = os.environ.get("NIKA_MEMORY_BLOB_COMPRESS", "1") != "0"
+
+# Characters of an out-of-line value kept inline for previews and search
+BLOB_PREVIEW_CHARS = 1024
+
+# Unreferenced blobs younger than this survive GC (a writer may not have
+# committed the entry that references them yet)
+BLOB_GC_GRACE = 300
+
+# gc_expired() also collects blobs at most this often
+BLOB_GC_INTERVAL = 24 * 3600
+
+# maintenance_due() once the last full GC is older than this
+MAINTENANCE_INTERVAL = 3600
 
 
 def _find_project_root() -> Path:
     """Walk up from cwd to find a directory containing .claude/."""
-    current = Path.cwd()
-    while current != current.parent:
-        if (current / ".claude").is_dir():
-            return current
-        current = current.parent
-    # Fallback to cwd
-    return Path.cwd()
+    return Path(find_project_root())
 
 
 def _memory_path() -> Path:
@@ -43,40 +155,118 @@ def _index_path() -> Path:
     return root / INDEX_FILE
 
 
-def _load_store() -> dict:
-    """Load the memory store from disk."""
-    path = _memory_path()
-    if path.exists():
-        try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            return {"version": 1, "entries": {}, "meta": {}}
-    return {"version": 1, "entries": {}, "meta": {}}
+def _db_path() -> Path:
+    root = _find_project_root()
+    return root / DB_FILE
 
 
-def _save_store(store: dict) -> None:
-    """Persist the memory store to disk."""
-    path = _memory_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(store, indent=2, ensure_ascii=False), encoding="utf-8")
+def _access_log_path() -> Path:
+    root = _find_project_root()
+    return root / ACCESS_LOG_FILE
 
 
-def _load_index() -> dict:
-    """Load the tag index."""
-    path = _index_path()
-    if path.exists():
-        try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            return {"tags": {}}
-    return {"tags": {}}
+def _limits_path() -> Path:
+    root = _find_project_root()
+    return root / LIMITS_FILE
 
 
-def _save_index(index: dict) -> None:
-    """Persist the tag index."""
-    path = _index_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+def _summary_path() -> Path:
+    root = _find_project_root()
+    return root / SUMMARY_FILE
+
+
+def _change_log() -> ChangeLog:
+    return ChangeLog(_find_project_root() / CHANGES_FILE, CHANGE_LOG_MAX_BYTES)
+
+
+def _blob_store() -> BlobStore:
+    return BlobStore(_find_project_root() / BLOB_DIR, compress=BLOB_COMPRESS)
+
+
+def _vector_index() -> Optional[VectorIndex]:
+    return VectorIndex(_find_project_root() / VECTORS_FILE) if VECTORS_ENABLED else None
+
+
+@contextmanager
+def _open_store(write: bool = False, concurrency: Optional[str] = None):
+    """Open the configured backend; with write=True, wrap in a transaction."""
+    backend = open_backend(_memory_path(), _index_path(), _db_path(), concurrency)
+    try:
+        if write:
+            with backend.transaction():
+                yield backend
+        else:
+            yield backend
+    finally:
+        backend.close()
+
+
+class _Journal:
+    """
+    The store as a _mutate() change sees it: put() and delete() are
+    recorded for the change log, everything else is passed through.
+    put(entry, record=False) is for bookkeeping that readers need not
+    hear about (access stats); delete() takes the op to log. Vector
+    records to write on commit go in `vectors`; delete() adds the
+    tombstones itself.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self.changes = []
+        self.touched = set()  # namespaces written, recorded or not
+        self.vectors = []  # (entry id, vector or None for a tombstone)
+
+    def __getattr__(self, name):
+        return getattr(self._store, name)
+
+    def put(self, entry: dict, record: bool = True) -> None:
+        self._store.put(entry)
+        self.touched.add(entry["namespace"])
+        if record:
+            self.changes.append(_change("put", entry))
+
+    def delete(self, entry_id: str, op: str = "delete") -> Optional[dict]:
+        removed = self._store.delete(entry_id)
+        if removed is not None:
+            self.touched.add(removed["namespace"])
+            self.changes.append(_change(op, removed))
+            self.vectors.append((entry_id, None))
+        return removed
+
+
+def _change(op: str, entry: dict) -> dict:
+    return {"op": op, "id": entry["id"], "namespace": entry["namespace"],
+            "key": entry["key"], "tags": entry.get("tags", [])}
+
+
+def _mutate(change):
+    """Run change(store) in a write transaction and return its result."""
+    for attempt in range(WRITE_ATTEMPTS):
+        final = attempt == WRITE_ATTEMPTS - 1
+        try:
+            with _open_store(write=True, concurrency="lock" if final else None) as backend:
+                store = _Journal(backend)
+                result = change(store)
+                if GC_BATCH > 0:
+                    _expire(store, time.time(), GC_BATCH)
+                summary = _summarize(store, store.changes, store.touched) if store.touched else None
+                index = _vector_index()
+                if index is not None and store.vectors:
+                    backend.on_commit(lambda: index.append(store.vectors))
+            if store.changes:
+                now = time.time()
+                _change_log().append([dict(c, at=now) for c in store.changes])
+            if summary is not None:
+                _save_summary(*summary, backend.revision())
+            return result
+        except WriteConflict:
+            if final:
+                # The last attempt holds the lock throughout and should not
+                # conflict; never report a write that did not happen
+                raise
+            # Randomized exponential backoff: 1ms, 2ms, 4ms, ... ceilings
+            time.sleep(os.urandom(1)[0] / 255 * 0.001 * (2 ** attempt))
 
 
 def _key_hash(namespace: str, key: str) -> str:
@@ -84,6 +274,349 @@ def _key_hash(namespace: str, key: str) -> str:
     return hashlib.sha256(f"{namespace}:{key}".encode()).hexdigest()[:16]
 
 
+def _log_access(entry_ids: list, when: float) -> int:
+    """Append one access record per id; returns the log size afterwards."""
+    path = _access_log_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)  # Less the umask
+    try:
+        # A single O_APPEND write, so concurrent recalls never interleave
+        os.write(fd, "".join(f"{eid} {when:.3f}\n" for eid in entry_ids).encode())
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+def _parse_access_records(paths) -> dict:
+    """Fold access records into {entry_id: [count, last_accessed]}."""
+    folded = {}
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 2:
+                        continue  # torn write from a crash
+                    try:
+                        when = float(parts[1])
+                    except ValueError:
+                        continue
+                    stats = folded.setdefault(parts[0], [0, 0.0])
+                    stats[0] += 1
+                    stats[1] = max(stats[1], when)
+        except OSError:
+            continue
+    return folded
+
+
+def pending_access() -> dict:
+    """Access records not yet compacted, as {entry_id: [count, last_accessed]}."""
+    log = _access_log_path()
+    return _parse_access_records([log] + sorted(log.parent.glob(log.name + ".compacting-*")))
+
+
+# ── Out-of-line values ─────────────────────────────────────────
+
+def _value_text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _offload(value: Any) -> Optional[dict]:
+    """Write a large value to the blob store; returns the entry's "blob" field, or None."""
+    if BLOB_THRESHOLD <= 0:
+        return None
+    raw = json.dumps(value, ensure_ascii=False).encode("utf-8")
+    if len(raw) <= BLOB_THRESHOLD:
+        return None
+    return {
+        "digest": _blob_store().put(raw),
+        "bytes": len(raw),
+        "preview": _value_text(value)[:BLOB_PREVIEW_CHARS],
+    }
+
+
+def _resolve(entry: Optional[dict], load: bool = True) -> Optional[dict]:
+    """
+    A copy of the entry for the caller (the backend's may be the shared
+    snapshot of the store), with its out-of-line value loaded if `load`.
+    """
+    if entry is None:
+        return None
+    if not load or not entry.get("blob"):
+        return dict(entry)
+    resolved = {k: v for k, v in entry.items() if k != "blob"}
+    raw = _blob_store().get(entry["blob"]["digest"])
+    resolved["value"] = json.loads(raw) if raw is not None else None
+    return resolved
+
+
+def preview(entry: dict, chars: int = 200) -> str:
+    """The start of an entry's value as text, without loading a blob."""
+    if entry.get("blob"):
+        return entry["blob"].get("preview", "")[:chars]
+    return str(entry.get("value"))[:chars]
+
+
+def gc_blobs() -> dict:
+    """Delete blobs that no entry references. Returns {"removed", "bytes_freed"}."""
+    with _open_store() as store:
+        referenced = {e["blob"]["digest"] for e in store.entries() if e.get("blob")}
+    blobs = _blob_store()
+    result = blobs.gc(referenced, grace=BLOB_GC_GRACE)
+    if blobs.root.is_dir():
+        (blobs.root / ".last-gc").touch()
+    return result
+
+
+# ── Budgets ────────────────────────────────────────────────────
+
+def load_limits() -> dict:
+    """
+    The store's budgets from .claude/nika-memory.limits.json ({} if none):
+
+        {
+          "max_entries": 5000, "max_bytes": 2000000, "policy": "lru",
+          "namespaces": {
+            "agents": {"max_entries": 200, "policy": "oldest"},
+            "context": {"max_bytes": 50000}
+          }
+        }
+
+    Top-level limits cap the whole store, "namespaces" caps individual
+    namespaces. Sizes are serialized entry bytes. "policy" (lru, lfu or
+    oldest; default lru) picks what is evicted first; a namespace
+    without its own policy uses the top-level one. Raises ValueError for
+    a malformed file.
+    """
+    path = _limits_path()
+    try:
+        limits = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        raise ValueError(f"Invalid {path}: {e}")
+    if not isinstance(limits, dict):
+        raise ValueError(f"Invalid {path}: expected a JSON object")
+    for scope, budget in [("store", limits)] + list(limits.get("namespaces", {}).items()):
+        policy = budget.get("policy", "lru")
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Invalid {path}: {scope} policy must be one of "
+                             f"{', '.join(EVICTION_POLICIES)}, not {policy!r}")
+        for field in ("max_entries", "max_bytes"):
+            if budget.get(field) is not None and (not isinstance(budget[field], int) or budget[field] < 0):
+                raise ValueError(f"Invalid {path}: {scope} {field} must be a non-negative integer")
+    return limits
+
+
+def _budgets(limits: dict, namespaces) -> list:
+    """[(namespace or None for the whole store, budget, policy)] with a cap set."""
+    default = limits.get("policy", "lru")
+    scoped = [(ns, limits.get("namespaces", {}).get(ns, {})) for ns in namespaces]
+    return [
+        (scope, budget, budget.get("policy", default))
+        for scope, budget in scoped + [(None, limits)]
+        if budget.get("max_entries") is not None or budget.get("max_bytes") is not None
+    ]
+
+
+def _over_budget(store, scope: Optional[str], budget: dict) -> bool:
+    usage = store.usage()
+    parts = [usage.get(scope, {})] if scope else usage.values()
+    entries = sum(u.get("entries", 0) for u in parts)
+    size = sum(u.get("bytes", 0) for u in parts)
+    return ((budget.get("max_entries") is not None and entries > budget["max_entries"])
+            or (budget.get("max_bytes") is not None and size > budget["max_bytes"]))
+
+
+def _enforce_limits(store, limits: dict, namespaces, keep=()) -> list:
+    """
+    Evict until each namespace in `namespaces`, then the whole store, is
+    within budget; returns the evicted ids. `keep` is never evicted.
+
+    Entries recalled since the last access-log compaction have a stale
+    last_accessed / access_count, so lru and lfu spare them until
+    nothing else is left.
+    """
+    evicted = []
+    pending = None
+    for scope, budget, policy in _budgets(limits, namespaces):
+        if not _over_budget(store, scope, budget):
+            continue
+        spare = set(keep)
+        if policy in ("lru", "lfu"):
+            if pending is None:
+                pending = set(pending_access())
+            spare |= pending
+        for protected in (spare, set(keep)):
+            while _over_budget(store, scope, budget):
+                # Candidates come from the eviction index; deleted ids
+                # drop out of it, protected ones are skipped
+                batch = store.eviction_candidates(policy, scope, len(protected) + EVICT_BATCH)
+                victims = [eid for eid in batch if eid not in protected]
+                if not victims:
+                    break
+                for eid in victims:
+                    store.delete(eid, op="evict")
+                    evicted.append(eid)
+                    if not _over_budget(store, scope, budget):
+                        break
+    return evicted
+
+
+def enforce_limits() -> int:
+    """
+    Evict until the store is within the configured budgets (e.g. after
+    lowering a limit; remember() enforces them on every write).
+    Returns the number of entries evicted.
+    """
+    limits = load_limits()
+    if not limits:
+        return 0
+    evicted = _mutate(lambda store: _enforce_limits(store, limits, list(store.usage())))
+    return len(evicted)
+
+
+# ── Session summary ────────────────────────────────────────────
+#
+# Session start shows entry counts and sizes per namespace, the latest
+# context entries and the project entries most related to them (topped
+# up with the most used). Every write refreshes that summary in its own
+# transaction, recomputing only the lists of the namespaces it touched,
+# and stamps it with the store revision it describes. Reading it is then
+# one small file plus a stat (JSON) or one row (SQLite), whatever the
+# store size; a missing or stale summary is rebuilt once. The related
+# list is only rescored against the whole vector file when the focus
+# (the non-bookkeeping context text) actually changes.
+
+def _summary_item(entry: dict, chars: int = 200) -> dict:
+    return {"id": entry["id"], "key": entry["key"], "preview": preview(entry, chars)}
+
+
+def _stored_summary(revision) -> Optional[dict]:
+    """The summary file, if it describes store revision `revision`."""
+    summary = read_json(_summary_path(), None)
+    if (isinstance(summary, dict) and summary.get("version") == SUMMARY_VERSION
+            and revision is not None and summary.get("revision") == revision):
+        return summary
+    return None
+
+
+def _similarity(focus: list, entry: dict) -> float:
+    return sum(a * b for a, b in zip(focus, embed(entry_text(entry))))
+
+
+def _summarize(store, changes: Optional[list] = None, touched: Optional[set] = None):
+    """
+    Summarize the store as `store` sees it. Lists of namespaces not in
+    `touched` are carried over from the summary of the revision the
+    transaction started from, if there is one (touched=None rebuilds
+    everything). Returns (summary, candidates): when the focus changed,
+    the similar-project list needs a scan of the vector file, which
+    _save_summary() does outside the transaction over `candidates`
+    ({id: project entry}); otherwise candidates is None.
+    """
+    previous = _stored_summary(store.revision()) if touched is not None else None
+    touched = touched or set()
+    now = time.time()
+    usage = store.usage()
+    summary = {
+        "version": SUMMARY_VERSION,
+        "total_entries": sum(u["entries"] for u in usage.values()),
+        "namespaces": {ns: u["entries"] for ns, u in usage.items() if u["entries"]},
+        "namespace_bytes": {ns: u["bytes"] for ns, u in usage.items() if u["entries"]},
+        "next_expiry": store.next_expiry(),
+    }
+
+    def stale(namespace):
+        return previous is None or namespace in touched
+
+    if stale("context"):
+        latest = store.top_k("context", "updated_at", SUMMARY_K, now=now)
+        summary["context"] = [_summary_item(e, 1000) for e in latest]
+        focus_text = " ".join(f"{c['key']} {c['preview']}" for e, c in zip(latest, summary["context"])
+                              if SUMMARY_FOCUS_SKIP_TAG not in e.get("tags", []))
+    else:
+        summary["context"] = previous["context"]
+    if stale("project"):
+        summary["project"] = [_summary_item(e)
+                              for e in store.top_k("project", "access_count", SUMMARY_K, now=now)]
+    else:
+        summary["project"] = previous["project"]
+
+    candidates = None
+    focus = None
+    if VECTORS_ENABLED:
+        focus = previous["focus"] if not stale("context") else [round(v, 5) for v in embed(focus_text)]
+    if not focus or not any(focus):
+        summary["focus"], summary["related"] = None, []
+    elif previous is None or focus != previous["focus"]:
+        summary["focus"] = focus
+        # Entries written by this transaction have no vector yet (or a
+        # stale one), so they are scored from their text here
+        written = {c["id"] for c in changes or () if c["namespace"] == "project" and c["op"] == "put"}
+        summary["related"] = []
+        candidates = {}
+        for entry in store.namespace_entries("project", now=now):
+            if entry["id"] not in written:
+                candidates[entry["id"]] = entry
+                continue
+            score = _similarity(summary["focus"], entry)
+            if score > 0:
+                summary["related"].append(dict(_summary_item(entry), similarity=round(score, 4)))
+    else:
+        # Same focus: rescore only the project entries this write changed
+        summary["focus"] = focus
+        related = {r["id"]: r for r in previous["related"]}
+        for change in changes or ():
+            if change["namespace"] != "project":
+                continue
+            related.pop(change["id"], None)
+            entry = store.get(change["id"]) if change["op"] == "put" else None
+            if entry is not None and summary["focus"]:
+                score = _similarity(summary["focus"], entry)
+                if score > 0:
+                    related[entry["id"]] = dict(_summary_item(entry), similarity=round(score, 4))
+        summary["related"] = list(related.values())
+    return summary, candidates
+
+
+def _save_summary(summary: dict, candidates: Optional[dict], revision) -> None:
+    """Finish the similar-project list if needed, stamp and write the summary."""
+    related = summary["related"]
+    if candidates:
+        for score, entry_id in _vector_index().scores(summary["focus"], set(candidates))[:2 * SUMMARY_K]:
+            related.append(dict(_summary_item(candidates[entry_id]), similarity=round(score, 4)))
+    related.sort(key=lambda r: (-r["similarity"], r["id"]))
+    del related[2 * SUMMARY_K:]
+    if revision is None:
+        return
+    summary["revision"] = revision
+    atomic_write_json(_summary_path(), summary, indent=None)
+
+
+def session_summary() -> dict:
+    """
+    What session start shows, without reading the store:
+
+        {"total_entries", "namespaces": {ns: count}, "namespace_bytes": {ns: bytes},
+         "next_expiry", "context": [item], "project": [item], "related": [item]}
+
+    Items are {"id", "key", "preview"}: "context" holds the latest
+    context entries (previews up to 1000 chars), "project" the most used
+    project entries and "related" the project entries most similar to
+    the context, best first, each with a "similarity". Kept up to date by
+    every write; rebuilt here only when missing or stale.
+    """
+    with _open_store() as store:
+        revision = store.revision()
+        summary = _stored_summary(revision)
+        if summary is not None:
+            return summary
+        summary, candidates = _summarize(store)
+    _save_summary(summary, candidates, revision)
+    return summary
+
+
 # ── Public API ─────────────────────────────────────────────────
 
 def remember(namespace: str, key: str, value: Any,
@@ -99,179 +632,608 @@ def remember(namespace: str, key: str, value: Any,
         ttl: Optional time-to-live in seconds (None = permanent)
 
     Returns:
-        The stored entry dict.
+        The stored entry dict (with the value, even when it was stored
+        out of line).
+
+    Raises:
+        ValueError: if the entry alone is larger than a byte budget it
+        falls under (see load_limits).
     """
-    store = _load_store()
-    entry_id = _key_hash(namespace, key)
-    now = time.time()
+    return remember_many([{"namespace": namespace, "key": key, "value": value,
+                           "tags": tags, "ttl": ttl}])[0]
 
-    entry = {
-        "id": entry_id,
-        "namespace": namespace,
-        "key": key,
-        "value": value,
-        "tags": tags or [],
-        "created_at": store["entries"].get(entry_id, {}).get("created_at", now),
-        "updated_at": now,
-        "expires_at": (now + ttl) if ttl else None,
-        "access_count": store["entries"].get(entry_id, {}).get("access_count", 0),
-    }
 
-    store["entries"][entry_id] = entry
-    store["meta"]["last_write"] = now
-    store["meta"]["total_entries"] = len(store["entries"])
-    _save_store(store)
-
-    # Update tag index
-    if tags:
-        index = _load_index()
-        for tag in tags:
-            if tag not in index["tags"]:
-                index["tags"][tag] = []
-            if entry_id not in index["tags"][tag]:
-                index["tags"][tag].append(entry_id)
-        _save_index(index)
+def _check_budgets(limits: dict, entry: dict) -> None:
+    for scope, budget, _ in _budgets(limits, [entry["namespace"]]):
+        if budget.get("max_bytes") is not None and entry_size(entry) > budget["max_bytes"]:
+            raise ValueError(
+                f"{entry['namespace']}/{entry['key']} is {entry_size(entry)} bytes, over the "
+                f"{scope or 'store'} budget of {budget['max_bytes']} bytes")
 
+
+def _inline(entry: dict, value: Any) -> dict:
+    """The entry as callers see it: with its value, without a blob reference."""
+    if not entry.get("blob"):
+        return entry
+    entry = {k: v for k, v in entry.items() if k != "blob"}
+    entry["value"] = value
     return entry
 
 
+def remember_many(items) -> list:
+    """
+    Store many entries in a single transaction.
+
+    Each item is a dict with "namespace", "key" and "value", plus
+    optional "tags" and "ttl", as for remember(). On the JSON backend
+    the store and its indexes are rewritten once for the whole batch
+    instead of once per entry. A later item replaces an earlier one with
+    the same namespace and key. Returns the stored entries in order.
+
+    Raises ValueError for an item without a namespace or key, or one
+    over a byte budget; nothing is stored then.
+    """
+    now = time.time()
+    prepared = []
+    for item in items:
+        if not item.get("namespace") or not item.get("key"):
+            raise ValueError(f"remember_many items need a namespace and a key: {item!r}")
+        # Blobs are written (and vectors computed) before the transaction,
+        # so retries reuse them
+        vector = embed(entry_text({"key": item["key"], "value": item.get("value"),
+                                   "tags": item.get("tags") or []})) if VECTORS_ENABLED else None
+        prepared.append((_key_hash(item["namespace"], item["key"]), item,
+                         _offload(item.get("value")), vector))
+    if not prepared:
+        return []
+    limits = load_limits()
+
+    def change(store):
+        entries = []
+        for entry_id, item, blob, vector in prepared:
+            previous = store.get(entry_id) or {}
+            ttl = item.get("ttl")
+            entry = {
+                "id": entry_id,
+                "namespace": item["namespace"],
+                "key": item["key"],
+                "value": None if blob else item.get("value"),
+                "tags": item.get("tags") or [],
+                "created_at": previous.get("created_at", now),
+                "updated_at": now,
+                "expires_at": (now + ttl) if ttl else None,
+                "access_count": previous.get("access_count", 0),
+            }
+            if blob:
+                entry["blob"] = blob
+            _check_budgets(limits, entry)
+            store.put(entry)
+            store.vectors.append((entry_id, vector))
+            entries.append(entry)
+        store.set_meta("last_write", now)
+        if limits:
+            namespaces = list(dict.fromkeys(e["namespace"] for e in entries))
+            _enforce_limits(store, limits, namespaces, keep={e["id"] for e in entries})
+        return entries
+
+    return [_inline(entry, item.get("value"))
+            for entry, (_, item, _, _) in zip(_mutate(change), prepared)]
+
+
 def recall(namespace: str, key: str) -> Optional[dict]:
     """
     Retrieve a memory entry by namespace and key.
 
-    Returns None if not found or expired.
+    Returns None if not found or expired. This is a pure read of the
+    store; the access is recorded in the write-behind access log, so
+    access_count / last_accessed reflect the last compaction.
     """
-    store = _load_store()
-    entry_id = _key_hash(namespace, key)
-    entry = store["entries"].get(entry_id)
+    return recall_many([(namespace, key)])[0]
 
-    if entry is None:
-        return None
 
-    # Check TTL
-    if entry.get("expires_at") and time.time() > entry["expires_at"]:
-        del store["entries"][entry_id]
-        _save_store(store)
-        return None
+def recall_many(keys, resolve: bool = True) -> list:
+    """
+    Retrieve many entries by (namespace, key) with one store read and
+    one access-log write. Returns a list aligned with `keys`, holding
+    None for entries that are missing or expired.
+    """
+    now = time.time()
+    ids = [_key_hash(namespace, key) for namespace, key in keys]
+    if not ids:
+        return []
 
-    # Update access count
-    entry["access_count"] = entry.get("access_count", 0) + 1
-    entry["last_accessed"] = time.time()
-    store["entries"][entry_id] = entry
-    _save_store(store)
+    with _open_store() as store:
+        entries = [store.get(entry_id) for entry_id in ids]
 
-    return entry
+    # Check TTL (expired entries are removed by gc_expired)
+    entries = [None if e is None or (e.get("expires_at") and now > e["expires_at"]) else e
+               for e in entries]
+
+    found = [e["id"] for e in entries if e is not None]
+    if found and _log_access(found, now) > ACCESS_LOG_COMPACT_BYTES:
+        compact_access_log()
 
+    return [_resolve(e, resolve) for e in entries]
 
-def recall_by_tag(tag: str) -> list:
+
+def recall_by_tag(tag: str, resolve: bool = True) -> list:
     """Retrieve all memory entries with a given tag."""
-    index = _load_index()
-    entry_ids = index.get("tags", {}).get(tag, [])
+    with _open_store() as store:
+        entries = store.tag_entries(tag, now=time.time())
+    return [_resolve(e, resolve) for e in entries]
 
-    store = _load_store()
-    now = time.time()
-    results = []
 
-    for eid in entry_ids:
-        entry = store["entries"].get(eid)
-        if entry and (not entry.get("expires_at") or now <= entry["expires_at"]):
-            results.append(entry)
+def query(expression: str, namespace: Optional[str] = None, limit: Optional[int] = None,
+          offset: int = 0, keys_only: bool = False, resolve: bool = True) -> list:
+    """
+    Retrieve entries matching a boolean tag expression, newest first.
+
+    Examples:
+        query("python AND (api OR cli) AND NOT deprecated")
+        query("urgent -done", namespace="project", limit=10)
 
-    return results
+    See core/tagquery.py for the syntax; a malformed expression raises
+    QuerySyntaxError (a ValueError). With keys_only=True each result is
+    just {"namespace", "key"}.
+    """
+    node = parse_tag_query(expression)
+    with _open_store() as store:
+        results = store.query(node, namespace=namespace, now=time.time(),
+                              limit=limit, offset=offset, keys_only=keys_only)
+    return results if keys_only else [_resolve(e, resolve) for e in results]
+
+
+def recall_search(query: str, namespace: Optional[str] = None, k: int = 10,
+                  resolve: bool = True) -> list:
+    """
+    Full-text search over keys, values and tags, best match first.
+
+    Ranks with BM25 over an inverted index that remember/forget keep up
+    to date. Each result is the entry plus a "score" field. Only the
+    preview of an out-of-line value is indexed.
+    """
+    terms = query_terms(query)
+    if not terms or k <= 0:
+        return []
+    with _open_store() as store:
+        results = store.search(terms, namespace=namespace, now=time.time(), k=k)
+    return [_resolve(e, resolve) for e in results]
 
 
-def recall_namespace(namespace: str) -> list:
+def recall_namespace(namespace: str, resolve: bool = True) -> list:
     """Retrieve all entries in a namespace."""
-    store = _load_store()
-    now = time.time()
-    return [
-        e for e in store["entries"].values()
-        if e["namespace"] == namespace
-        and (not e.get("expires_at") or now <= e["expires_at"])
-    ]
+    with _open_store() as store:
+        entries = store.namespace_entries(namespace, now=time.time())
+    return [_resolve(e, resolve) for e in entries]
+
+
+def top_k(namespace: str, by: str = "updated_at", k: int = 5, resolve: bool = True) -> list:
+    """
+    The k most recently updated (by="updated_at") or most used
+    (by="access_count") live entries of a namespace, best first.
+
+    Uses the per-namespace ordered indexes on the SQLite backend, so
+    the cost grows with k rather than the namespace. access_count
+    reflects the last access-log compaction.
+    """
+    if by not in TOP_K_ORDERS:
+        raise ValueError(f"top_k by must be one of {', '.join(TOP_K_ORDERS)}, not {by!r}")
+    if k <= 0:
+        return []
+    with _open_store() as store:
+        entries = store.top_k(namespace, by, k, now=time.time())
+    return [_resolve(e, resolve) for e in entries]
 
 
 def forget(namespace: str, key: str) -> bool:
     """Remove a memory entry. Returns True if it existed."""
-    store = _load_store()
-    entry_id = _key_hash(namespace, key)
-
-    if entry_id in store["entries"]:
-        entry = store["entries"].pop(entry_id)
-        store["meta"]["total_entries"] = len(store["entries"])
-        _save_store(store)
-
-        # Clean tag index
-        index = _load_index()
-        for tag in entry.get("tags", []):
-            if tag in index["tags"]:
-                index["tags"][tag] = [
-                    eid for eid in index["tags"][tag] if eid != entry_id
-                ]
-                if not index["tags"][tag]:
-                    del index["tags"][tag]
-        _save_index(index)
-        return True
+    return forget_many([(namespace, key)]) == 1
+
 
-    return False
+def forget_many(keys) -> int:
+    """Remove entries by (namespace, key) in a single transaction. Returns count removed."""
+    ids = list(dict.fromkeys(_key_hash(namespace, key) for namespace, key in keys))
+    if not ids:
+        return 0
+    removed = _mutate(lambda store: [eid for eid in ids if store.delete(eid) is not None])
+    return len(removed)
 
 
 def forget_namespace(namespace: str) -> int:
     """Remove all entries in a namespace. Returns count removed."""
-    store = _load_store()
-    to_remove = [
-        eid for eid, e in store["entries"].items()
-        if e["namespace"] == namespace
-    ]
-    for eid in to_remove:
-        del store["entries"][eid]
+    def change(store):
+        to_remove = store.namespace_ids(namespace)
+        for eid in to_remove:
+            store.delete(eid)
+        return to_remove
 
-    store["meta"]["total_entries"] = len(store["entries"])
-    _save_store(store)
-    return len(to_remove)
+    removed = _mutate(change)
+    return len(removed)
 
 
-def gc_expired() -> int:
-    """Garbage-collect expired entries. Returns count removed."""
-    store = _load_store()
-    now = time.time()
-    expired = [
-        eid for eid, e in store["entries"].items()
-        if e.get("expires_at") and now > e["expires_at"]
-    ]
-    for eid in expired:
-        del store["entries"][eid]
+def compact_access_log() -> int:
+    """
+    Fold pending access records into entry metadata.
+
+    The live log is first renamed to a claim file, so recalls that
+    happen during compaction start a fresh log and are never lost.
+    Returns the number of access records applied.
+    """
+    log = _access_log_path()
+    claim = log.with_name(f"{log.name}.compacting-{os.getpid()}-{time.time_ns()}")
+    try:
+        os.replace(log, claim)
+        claimed = [claim]
+    except FileNotFoundError:
+        claimed = []
+
+    # Pick up claims left behind by a compaction that crashed
+    cutoff = time.time() - ACCESS_LOG_ORPHAN_SECONDS
+    for orphan in log.parent.glob(log.name + ".compacting-*"):
+        try:
+            if orphan != claim and orphan.stat().st_mtime < cutoff:
+                claimed.append(orphan)
+        except OSError:
+            continue
+
+    if not claimed:
+        return 0
+
+    folded = _parse_access_records(claimed)
+
+    def change(store):
+        for entry_id, (count, last_accessed) in folded.items():
+            entry = store.get(entry_id)
+            if entry is None:
+                continue
+            entry = dict(entry)  # put() diffs against the stored copy
+            entry["access_count"] = entry.get("access_count", 0) + count
+            entry["last_accessed"] = max(entry.get("last_accessed") or 0.0, last_accessed)
+            store.put(entry, record=False)
+
+    _mutate(change)
+
+    for path in claimed:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    return sum(count for count, _ in folded.values())
+
 
+def _expire(store, now: float, limit: Optional[int] = None) -> list:
+    """Delete up to `limit` entries expired at `now`, earliest first; returns their ids."""
+    expired = store.expired_ids(now, limit)
+    for eid in expired:
+        store.delete(eid, op="expire")
     if expired:
-        store["meta"]["total_entries"] = len(store["entries"])
-        store["meta"]["last_gc"] = now
-        _save_store(store)
+        store.set_meta("last_gc", now)
+    return expired
+
+
+def gc_expired(limit: Optional[int] = None, maintenance: bool = True) -> int:
+    """
+    Garbage-collect expired entries. Returns count removed.
+
+    Pops entries off the expiry index in deadline order, so the cost
+    follows the number expired; when the earliest deadline is still in
+    the future it returns without opening a write transaction. With
+    maintenance=False only that is done: folding the access log,
+    compacting the vector file and collecting blobs wait for the next
+    full call (the Stop hook makes one when maintenance_due()).
+    """
+    if maintenance:
+        compact_access_log()
+
+    now = time.time()
+    with _open_store() as store:
+        summary = _stored_summary(store.revision())
+        if summary is not None:
+            due, total = summary["next_expiry"], summary["total_entries"]
+        else:
+            due = store.next_expiry()
+            total = store.get_meta().get("total_entries", 0)
+
+    if maintenance:
+        index = _vector_index()
+        if index is not None and index.row_count() > 2 * total + VECTOR_COMPACT_SLACK:
+            compact_vectors()
 
+        try:
+            last_blob_gc = (_find_project_root() / BLOB_DIR / ".last-gc").stat().st_mtime
+        except OSError:
+            last_blob_gc = 0
+        if last_blob_gc < now - BLOB_GC_INTERVAL and (_find_project_root() / BLOB_DIR).is_dir():
+            gc_blobs()
+        try:
+            (_find_project_root() / MAINTENANCE_FILE).touch()
+        except OSError:
+            pass
+
+    if due is None or due >= now:
+        return 0
+
+    expired = _mutate(lambda store: _expire(store, now, limit))
     return len(expired)
 
 
+def maintenance_due(interval: float = MAINTENANCE_INTERVAL) -> bool:
+    """Whether the last full gc_expired() (with maintenance) was more than
+    `interval` seconds ago, or never happened."""
+    try:
+        last = (_find_project_root() / MAINTENANCE_FILE).stat().st_mtime
+    except OSError:
+        return True
+    return last < time.time() - interval
+
+
+def compact_vectors(backfill: bool = False) -> dict:
+    """
+    Rewrite the vector file with one row per live entry.
+
+    With backfill=True, entries that have no vector yet (stores created
+    before vectors existed, or an append lost to a crash) are embedded
+    too. Returns {"rows": rows written, "embedded": newly embedded}.
+    """
+    index = _vector_index()
+    if index is None:
+        return {"rows": 0, "embedded": 0}
+    missing = {}
+    if backfill:
+        # Embedding is the slow part: do it before taking the lock
+        have = index.latest()
+        with _open_store() as store:
+            missing = {e["id"]: embed(entry_text(e)) for e in store.entries() if e["id"] not in have}
+    # Writers append vectors under the store's write lock; holding it
+    # here means none lands between reading the ids and the rewrite
+    with _open_store(write=True, concurrency="lock") as store:
+        ids = {e["id"] for e in store.entries()}
+        missing = {eid: vec for eid, vec in missing.items() if eid in ids}
+        rows = index.compact(ids, missing)
+    return {"rows": rows, "embedded": len(missing)}
+
+
+def recall_similar(text: str, namespace: Optional[str] = None, k: int = 5,
+                   resolve: bool = True) -> list:
+    """
+    Entries most similar to `text` (cosine over local hashed n-gram
+    vectors, no network), best first, each with a "similarity" field.
+
+    Entries remembered before vectors existed are only found after
+    `memory.py vectors --backfill`.
+    """
+    index = _vector_index()
+    query_vector = embed(text)
+    if index is None or k <= 0 or not any(query_vector):
+        return []
+    now = time.time()
+    results = []
+    with _open_store() as store:
+        for score, entry_id in index.scores(query_vector):
+            entry = store.get(entry_id)
+            if entry is None or (entry.get("expires_at") and now > entry["expires_at"]):
+                continue
+            if namespace and entry["namespace"] != namespace:
+                continue
+            results.append(dict(entry, similarity=round(score, 4)))
+            if len(results) >= k:
+                break
+    return [_resolve(e, resolve) for e in results]
+
+
 def memory_stats() -> dict:
     """Return statistics about the memory store."""
-    store = _load_store()
-    entries = store.get("entries", {})
-    namespaces = {}
-    for e in entries.values():
-        ns = e.get("namespace", "unknown")
-        namespaces[ns] = namespaces.get(ns, 0) + 1
-
-    return {
-        "total_entries": len(entries),
-        "namespaces": namespaces,
-        "memory_file": str(_memory_path()),
-        "index_file": str(_index_path()),
-        "last_write": store.get("meta", {}).get("last_write"),
-        "last_gc": store.get("meta", {}).get("last_gc"),
-    }
+    with _open_store() as store:
+        namespaces = store.namespace_counts()
+        meta = store.get_meta()
+        try:
+            access_log_bytes = _access_log_path().stat().st_size
+        except OSError:
+            access_log_bytes = 0
+        usage = store.usage()
+        index = _vector_index()
+        stats = {
+            "total_entries": sum(namespaces.values()),
+            "namespaces": namespaces,
+            "namespace_bytes": {ns: u["bytes"] for ns, u in usage.items()},
+            "total_bytes": sum(u["bytes"] for u in usage.values()),
+            "backend": store.name,
+            "memory_file": str(store.path),
+            "last_write": meta.get("last_write"),
+            "last_gc": meta.get("last_gc"),
+            "access_log_bytes": access_log_bytes,
+            "vector_rows": index.row_count() if index is not None else 0,
+            "change_seq": _change_log().head(),
+        }
+        if getattr(store, "index_path", None) is not None:
+            # Only the JSON backend keeps a separate tag index
+            stats["index_file"] = str(store.index_path)
+        return stats
 
 
 def dump_all() -> dict:
-    """Return the entire memory store (for debugging / export)."""
-    return _load_store()
+    """Return the entire memory store (for debugging / export); out-of-line
+    values stay as their "blob" references."""
+    with _open_store() as store:
+        meta = dict(store.get_meta())
+        return {
+            "version": 1,
+            "entries": {e["id"]: dict(e) for e in store.entries()},
+            "meta": meta,
+        }
+
+
+# ── JSONL export / import ──────────────────────────────────────
+
+# Import conflict policies for entries that already exist
+IMPORT_CONFLICTS = ("newer", "replace", "skip")
+
+# Entries written per import transaction
+IMPORT_BATCH = 500
+
+
+def export_jsonl() -> Iterator[str]:
+    """
+    Yield every live entry as one JSON line, with out-of-line values
+    inlined so the output is self-contained.
+
+    Entries are streamed from the backend one at a time: on SQLite
+    memory use stays constant however large the store is (the JSON
+    backend holds its store in memory regardless).
+    """
+    now = time.time()
+    with _open_store() as store:
+        for entry in store.entries(now=now):
+            yield json.dumps(_resolve(entry), ensure_ascii=False)
+
+
+def _import_batch(records: list, on_conflict: str, counts: dict) -> None:
+    now = time.time()
+    prepared = []
+    for record in records:
+        blob = _offload(record["value"])
+        entry = {
+            "id": _key_hash(record["namespace"], record["key"]),
+            "namespace": record["namespace"],
+            "key": record["key"],
+            "value": None if blob else record["value"],
+            "tags": list(record.get("tags") or []),
+            "created_at": record.get("created_at") or now,
+            "updated_at": record.get("updated_at") or now,
+            "expires_at": record.get("expires_at") or (now + record["ttl"] if record.get("ttl") else None),
+            "access_count": record.get("access_count") or 0,
+        }
+        if record.get("last_accessed"):
+            entry["last_accessed"] = record["last_accessed"]
+        if blob:
+            entry["blob"] = blob
+        prepared.append((entry, record["value"]))
+    limits = load_limits()
+    written, vectors = [], {}  # vectors: id -> vector, kept across retries
+
+    def change(store):
+        written.clear()
+        skipped = rejected = 0
+        for entry, value in prepared:
+            if entry["expires_at"] and entry["expires_at"] < now:
+                skipped += 1
+                continue
+            existing = store.get(entry["id"])
+            if existing is not None and (
+                    on_conflict == "skip"
+                    or (on_conflict == "newer" and existing.get("updated_at", 0) >= entry["updated_at"])):
+                skipped += 1
+                continue
+            try:
+                _check_budgets(limits, entry)
+            except ValueError:
+                rejected += 1
+                continue
+            store.put(entry)
+            written.append(entry)
+            if VECTORS_ENABLED:
+                if entry["id"] not in vectors:
+                    vectors[entry["id"]] = embed(entry_text(_inline(entry, value)))
+                store.vectors.append((entry["id"], vectors[entry["id"]]))
+        if written and limits:
+            namespaces = list(dict.fromkeys(e["namespace"] for e in written))
+            _enforce_limits(store, limits, namespaces, keep={e["id"] for e in written})
+        return skipped, rejected
+
+    skipped, rejected = _mutate(change)
+    counts["imported"] += len(written)
+    counts["skipped"] += skipped
+    counts["rejected"] += rejected
+
+
+def import_jsonl(lines: Iterable[str], on_conflict: str = "newer",
+                 batch_size: int = IMPORT_BATCH) -> dict:
+    """
+    Import entries from JSON lines (as written by export_jsonl), one
+    transaction per `batch_size` entries so memory stays bounded.
+
+    A line needs "namespace", "key" and "value"; timestamps, tags,
+    expires_at (or ttl) and access stats are kept when present. Entries
+    that already exist are handled per `on_conflict`: "newer" keeps
+    whichever was updated last, "replace" always overwrites, "skip"
+    keeps the existing one. Expired entries are skipped, entries over a
+    byte budget are rejected and malformed lines counted as invalid.
+
+    Returns {"imported", "skipped", "rejected", "invalid"} counts.
+    """
+    if on_conflict not in IMPORT_CONFLICTS:
+        raise ValueError(f"on_conflict must be one of {', '.join(IMPORT_CONFLICTS)}, not {on_conflict!r}")
+    counts = {"imported": 0, "skipped": 0, "rejected": 0, "invalid": 0}
+    batch = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            counts["invalid"] += 1
+            continue
+        if (not isinstance(record, dict) or not isinstance(record.get("namespace"), str)
+                or not isinstance(record.get("key"), str) or "value" not in record):
+            counts["invalid"] += 1
+            continue
+        if record.get("blob") and record["value"] is None:
+            record = _resolve(record)  # exported without inlining, from this project
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _import_batch(batch, on_conflict, counts)
+            batch = []
+    if batch:
+        _import_batch(batch, on_conflict, counts)
+    return counts
+
+
+def migrate_to_sqlite() -> dict:
+    """One-shot move of the JSON store into .claude/nika-memory.db."""
+    return migrate_json_to_sqlite(_memory_path(), _index_path(), _db_path())
+
+
+# ── Change feed ────────────────────────────────────────────────
+
+def watch(namespace: Optional[str] = None, tag: Optional[str] = None,
+          since: Optional[int] = None, timeout: float = 0.0) -> dict:
+    """
+    Changes to entries of `namespace` and/or carrying `tag` committed
+    after sequence number `since`, waiting up to `timeout` seconds for
+    one when there are none yet.
+
+    Returns {"seq", "changes", "reset"}: pass "seq" back as `since` to
+    continue where this call stopped (since=None starts from now).
+    Each change is {"seq", "op", "id", "namespace", "key", "tags", "at"}
+    with op put, delete, expire or evict; recall the entry for its
+    value. "reset" means changes after `since` were rotated out of the
+    log, so the caller should re-read what it follows.
+
+        cursor = watch("coordination")["seq"]
+        while True:
+            batch = watch("coordination", since=cursor, timeout=30)
+            cursor = batch["seq"]
+            ...
+    """
+    log = _change_log()
+    if since is None:
+        since = log.head()
+    deadline = time.monotonic() + timeout
+    while True:
+        signature = log.signature()
+        records, reset = log.read(since)
+        if records:
+            since = records[-1]["seq"]
+        elif reset:
+            since = 0  # the log is gone; follow it from its restart
+        changes = [c for c in records
+                   if (namespace is None or c["namespace"] == namespace)
+                   and (tag is None or tag in c["tags"])]
+        remaining = deadline - time.monotonic()
+        if changes or reset or remaining <= 0:
+            return {"seq": since, "changes": changes, "reset": reset}
+        log.wait(signature, remaining)
 
 
 # ── CLI entry point ────────────────────────────────────────────
@@ -301,5 +1263,116 @@ if __name__ == "__main__":
         ns, key = sys.argv[2], sys.argv[3]
         result = forget(ns, key)
         print(json.dumps({"forgotten": result}))
+    elif action == "query" and len(sys.argv) >= 3:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="memory.py query")
+        parser.add_argument("expression", help='e.g. "python AND (api OR cli) AND NOT deprecated"')
+        parser.add_argument("--namespace")
+        parser.add_argument("--limit", type=int)
+        parser.add_argument("--offset", type=int, default=0)
+        parser.add_argument("--keys-only", action="store_true")
+        args = parser.parse_args(sys.argv[2:])
+        try:
+            results = query(args.expression, namespace=args.namespace, limit=args.limit,
+                            offset=args.offset, keys_only=args.keys_only)
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        print(json.dumps(results, indent=2))
+    elif action == "search" and len(sys.argv) >= 3:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="memory.py search")
+        parser.add_argument("query", nargs="+")
+        parser.add_argument("--namespace")
+        parser.add_argument("-k", "--limit", type=int, default=10)
+        args = parser.parse_args(sys.argv[2:])
+        print(json.dumps(recall_search(" ".join(args.query), namespace=args.namespace, k=args.limit), indent=2))
+    elif action == "similar" and len(sys.argv) >= 3:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="memory.py similar")
+        parser.add_argument("text", nargs="+")
+        parser.add_argument("--namespace")
+        parser.add_argument("-k", "--limit", type=int, default=5)
+        args = parser.parse_args(sys.argv[2:])
+        print(json.dumps(recall_similar(" ".join(args.text), namespace=args.namespace, k=args.limit), indent=2))
+    elif action == "vectors":
+        backfill = "--backfill" in sys.argv[2:]
+        print(json.dumps(compact_vectors(backfill=backfill), indent=2))
+    elif action == "limits":
+        with _open_store() as store:
+            usage = store.usage()
+        print(json.dumps({"limits": load_limits(), "usage": usage}, indent=2))
+    elif action == "evict":
+        print(json.dumps({"evicted": enforce_limits()}))
+    elif action == "export":
+        # memory.py export [file]  (stdout by default)
+        target = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+        out = open(target, "w", encoding="utf-8") if target else sys.stdout
+        try:
+            count = 0
+            for line in export_jsonl():
+                out.write(line + "\n")
+                count += 1
+        finally:
+            if target:
+                out.close()
+        if target:
+            print(json.dumps({"exported": count, "file": target}))
+    elif action == "import":
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="memory.py import")
+        parser.add_argument("file", nargs="?", default="-", help="JSONL file (default: stdin)")
+        parser.add_argument("--on-conflict", choices=IMPORT_CONFLICTS, default="newer")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH)
+        args = parser.parse_args(sys.argv[2:])
+        source = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8")
+        try:
+            print(json.dumps(import_jsonl(source, args.on_conflict, args.batch_size)))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+    elif action == "remember-many":
+        # JSONL on stdin: {"namespace", "key", "value", "tags"?, "ttl"?} per line
+        items = [json.loads(line) for line in sys.stdin if line.strip()]
+        try:
+            entries = remember_many(items)
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        print(json.dumps({"stored": len(entries)}))
+    elif action == "watch":
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="memory.py watch")
+        parser.add_argument("--namespace")
+        parser.add_argument("--tag")
+        parser.add_argument("--since", type=int, help="sequence number to continue from (default: now)")
+        parser.add_argument("--timeout", type=float, default=0.0, help="seconds to wait for a change")
+        parser.add_argument("--follow", action="store_true", help="keep printing changes, one JSON line each")
+        args = parser.parse_args(sys.argv[2:])
+        if not args.follow:
+            print(json.dumps(watch(args.namespace, args.tag, args.since, args.timeout), indent=2))
+        else:
+            cursor = args.since
+            try:
+                while True:
+                    batch = watch(args.namespace, args.tag, cursor, timeout=60)
+                    cursor = batch["seq"]
+                    for change in batch["changes"]:
+                        print(json.dumps(change), flush=True)
+                    if batch["reset"]:
+                        print(json.dumps({"reset": True, "seq": cursor}), flush=True)
+            except KeyboardInterrupt:
+                pass
+    elif action == "gc-blobs":
+        print(json.dumps(gc_blobs()))
+    elif action == "compact":
+        print(json.dumps({"access_records_applied": compact_access_log()}))
+    elif action == "migrate":
+        print(json.dumps(migrate_to_sqlite(), indent=2))
     else:
-        print("Usage: memory.py [stats|gc|dump|remember|recall|forget] [args...]")
+        print("Usage: memory.py [stats|gc|compact|dump|remember|recall|query|search|similar|vectors|remember-many|forget|export|import|watch|limits|evict|gc-blobs|migrate] [args...]")
@@ -0,0 +1,97 @@
+"""
+Nika project paths.
+
+Locates the project root (nearest ancestor containing .claude/) and the
+Nika state files inside it. Deliberately imports nothing but os so hook
+handlers can check for state files before loading the heavier engines.
+
+The root is resolved once per working directory and process: every
+state-file path goes through it, and a hook handler builds dozens.
+"""
+
+import os
+
+
+MEMORY_FILE = os.path.join(".claude", "nika-memory.json")
+MEMORY_DB_FILE = os.path.join(".claude", "nika-memory.db")
+MEMORY_CHANGES_FILE = os.path.join(".claude", "nika-memory.changes.log")
+CRON_FILE = os.path.join(".claude", "nika-cron.json")
+CRON_NEXT_FILE = os.path.join(".claude", "nika-cron.next")
+BOOTSTRAP_FILE = os.path.join(".claude", "nika-bootstrap.json")
+
+
+# {cwd: project root}; only roots that were found, so a .claude/
+# created later (e.g. by the first write) is still picked up
+_ROOTS = {}
+
+
+def find_project_root() -> str:
+    """Walk up from cwd to find a directory containing .claude/."""
+    cwd = os.getcwd()
+    root = _ROOTS.get(cwd)
+    if root is not None:
+        return root
+    current = cwd
+    while True:
+        if os.path.isdir(os.path.join(current, ".claude")):
+            _ROOTS[cwd] = current
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            # Fallback to cwd
+            return cwd
+        current = parent
+
+
+def clear_root_cache() -> None:
+    """Forget resolved roots (after moving or deleting a .claude/ directory)."""
+    _ROOTS.clear()
+
+
+def project_file(relative: str) -> str:
+    """Absolute path of a file relative to the project root."""
+    return os.path.join(find_project_root(), relative)
+
+
+def has_memory_store() -> bool:
+    root = find_project_root()
+    return (os.path.exists(os.path.join(root, MEMORY_FILE))
+            or os.path.exists(os.path.join(root, MEMORY_DB_FILE)))
+
+
+def has_cron_store() -> bool:
+    return os.path.exists(project_file(CRON_FILE))
+
+
+def cron_next_due():
+    """
+    Earliest next_run of an enabled cron job, from the one-line sidecar
+    the cron engine rewrites with every change to the job file:
+    `<next_run> <inode> <mtime_ns> <size>` of the job file it describes.
+
+    Returns inf when no job can fire (no job file, or no enabled job),
+    and None when the sidecar is missing or describes another version
+    of the job file, e.g. one written by an older release; the cron
+    engine then has to be asked (cron_summary() rebuilds it).
+    """
+    root = find_project_root()
+    try:
+        st = os.stat(os.path.join(root, CRON_FILE))
+    except FileNotFoundError:
+        return float("inf")
+    try:
+        with open(os.path.join(root, CRON_NEXT_FILE)) as f:
+            fields = f.read().split()
+    except OSError:
+        return None
+    if fields[1:] != [str(st.st_ino), str(st.st_mtime_ns), str(st.st_size)]:
+        return None
+    try:
+        return float(fields[0])
+    except ValueError:
+        return None
+
+
+def has_project_dir() -> bool:
+    """Whether a .claude/ directory was found (find_project_root() fell back to cwd otherwise)."""
+    return os.path.isdir(project_file(".claude"))
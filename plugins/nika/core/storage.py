@@ -0,0 +1,1161 @@
+"""
+Nika Memory Storage Backends.
+
+core.memory talks to the on-disk store through a small backend
+interface, so the storage format can change without touching the
+public memory API.
+
+Backends:
+  json    — .claude/nika-memory.json + .claude/nika-memory.index.json
+            (the original format; whole-file load and rewrite)
+  sqlite  — .claude/nika-memory.db in WAL mode, one row per entry with
+            indexed namespace, tags, expires_at and updated_at
+
+Selection: NIKA_MEMORY_BACKEND=json|sqlite. When unset, an existing
+nika-memory.db is used, otherwise the JSON files. `memory.py migrate`
+moves a JSON store into SQLite once.
+
+Concurrency (json backend): NIKA_MEMORY_CONCURRENCY=lock|optimistic.
+  lock        — a write transaction holds an advisory lock on the store
+                from its first read until its atomic rename (default)
+  optimistic  — transactions read and modify without the lock; commit
+                takes it only to check the store was not replaced since
+                the read and raises WriteConflict if it was (the caller
+                retries). meta.revision counts commits, but the check
+                compares the file's (inode, mtime_ns, size): every commit
+                renames a new file into place, so the signature changes
+                with the revision, and a stat under the lock is enough
+                where reading the counter would mean parsing the store.
+SQLite serializes writers itself (BEGIN IMMEDIATE under WAL, readers
+never block), so the setting does not apply to it.
+
+Files derived from the store that are appended to rather than rewritten
+(the vector index) are written by on_commit() callbacks, which run while
+the committing writer still holds the write lock, so they see changes in
+commit order.
+"""
+
+import bisect
+import heapq
+import itertools
+import json
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Set
+
+try:
+    from core.fsutil import atomic_write_json, file_lock, file_signature, read_json, read_json_cached
+    from core.tagquery import compile_sql, evaluate
+    from core.textindex import B, K1, bm25, entry_terms, entry_text, idf
+except ImportError:
+    # Run as a script from core/
+    from fsutil import atomic_write_json, file_lock, file_signature, read_json, read_json_cached
+    from tagquery import compile_sql, evaluate
+    from textindex import B, K1, bm25, entry_terms, entry_text, idf
+
+
+BACKEND_ENV = "NIKA_MEMORY_BACKEND"
+CONCURRENCY_ENV = "NIKA_MEMORY_CONCURRENCY"
+CONCURRENCY_MODES = ("lock", "optimistic")
+
+# Orderings supported by top_k(); ties break on updated_at
+TOP_K_ORDERS = ("updated_at", "access_count")
+
+# Orderings supported by eviction_candidates(), least valuable first:
+#   lru     — least recently used (last_accessed or updated_at, whichever is later)
+#   lfu     — least frequently used (access_count, then updated_at)
+#   oldest  — earliest created_at
+EVICTION_POLICIES = ("lru", "lfu", "oldest")
+
+# Columns stored natively by the SQLite backend; anything else on an
+# entry dict round-trips through the "extra" JSON column.
+ENTRY_FIELDS = (
+    "id", "namespace", "key", "value", "tags", "created_at",
+    "updated_at", "expires_at", "access_count", "last_accessed",
+)
+
+
+def _empty_store() -> dict:
+    return {"version": 1, "entries": {}, "meta": {}}
+
+
+class WriteConflict(Exception):
+    """An optimistic transaction lost the race to another writer."""
+
+
+def entry_size(entry: dict) -> int:
+    """An entry's serialized size in bytes (compact JSON, UTF-8), counting
+    an out-of-line value at its full size."""
+    size = len(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return size + (entry.get("blob") or {}).get("bytes", 0)
+
+
+def eviction_key(entry: dict, policy: str) -> tuple:
+    """Sort key under an eviction policy; smaller keys are evicted first."""
+    if policy == "lru":
+        return (max(entry.get("last_accessed") or 0, entry.get("updated_at") or 0),)
+    if policy == "lfu":
+        return (entry.get("access_count") or 0, entry.get("updated_at") or 0)
+    return (entry.get("created_at") or 0,)
+
+
+def _is_live(entry: dict, now: Optional[float]) -> bool:
+    expires_at = entry.get("expires_at")
+    return now is None or not expires_at or now <= expires_at
+
+
+class MemoryBackend:
+    """Interface shared by the storage backends.
+
+    All mutations should happen inside transaction(); reads may happen
+    outside one. Methods taking `now` skip entries expired at that time
+    (pass None to include them).
+    """
+
+    name = "abstract"
+    path: Path
+
+    def transaction(self):
+        raise NotImplementedError
+
+    def get(self, entry_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def put(self, entry: dict) -> None:
+        raise NotImplementedError
+
+    def delete(self, entry_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def entries(self, now: Optional[float] = None) -> Iterator[dict]:
+        raise NotImplementedError
+
+    def namespace_entries(self, namespace: str, now: Optional[float] = None) -> List[dict]:
+        raise NotImplementedError
+
+    def namespace_ids(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    def tag_entries(self, tag: str, now: Optional[float] = None) -> List[dict]:
+        raise NotImplementedError
+
+    def top_k(self, namespace: str, by: str, k: int, now: Optional[float] = None) -> List[dict]:
+        """The k entries of a namespace with the highest `by` (see TOP_K_ORDERS)."""
+        raise NotImplementedError
+
+    def expired_ids(self, now: float, limit: Optional[int] = None) -> List[str]:
+        """Ids expired at `now`, earliest deadline first (at most `limit`)."""
+        raise NotImplementedError
+
+    def next_expiry(self) -> Optional[float]:
+        """The earliest expires_at in the store, or None."""
+        raise NotImplementedError
+
+    def search(self, terms: List[str], namespace: Optional[str] = None,
+               now: Optional[float] = None, k: int = 10) -> List[dict]:
+        """Top k entries for the query terms by BM25 (core.textindex),
+        each a copy of the entry with a "score" field."""
+        raise NotImplementedError
+
+    def query(self, node, namespace: Optional[str] = None, now: Optional[float] = None,
+              limit: Optional[int] = None, offset: int = 0, keys_only: bool = False) -> List[dict]:
+        """Entries matching a parsed tag query (core.tagquery), newest first.
+
+        With keys_only=True only "namespace" and "key" are returned.
+        """
+        raise NotImplementedError
+
+    def eviction_candidates(self, policy: str, namespace: Optional[str] = None,
+                            limit: int = 16) -> List[str]:
+        """Up to `limit` ids of a namespace (or the whole store) in
+        eviction order under `policy` (see EVICTION_POLICIES)."""
+        raise NotImplementedError
+
+    def usage(self) -> dict:
+        """{namespace: {"entries": count, "bytes": serialized size}}, kept
+        up to date by put/delete rather than computed by a scan."""
+        raise NotImplementedError
+
+    def namespace_counts(self) -> dict:
+        raise NotImplementedError
+
+    def get_meta(self) -> dict:
+        raise NotImplementedError
+
+    def set_meta(self, key: str, value) -> None:
+        raise NotImplementedError
+
+    def revision(self):
+        """A JSON value identifying the committed state this backend last
+        read or wrote (or the current one); it changes with every commit,
+        so files derived from the store can be stamped with it."""
+        raise NotImplementedError
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Call callback() when the current transaction commits, while its
+        write lock is still held; dropped if the transaction does not."""
+        self._callbacks.append(callback)
+
+    def _run_callbacks(self) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self) -> None:
+        pass
+
+
+# ── JSON backend ───────────────────────────────────────────────
+
+class JsonBackend(MemoryBackend):
+    """The original single-file JSON store plus an index file.
+
+    The index file holds a posting set per tag and the expiry index, a
+    list of (expires_at, id) sorted by deadline. It is written in the
+    same commit as the store and stamped with the store revision it
+    matches (meta.index_revision); an index that does not match — a
+    crash between the two renames, or a file from an older version — is
+    rebuilt from the entries on load. meta.next_expiry mirrors the head
+    of the expiry index so reads can skip TTL checks without loading it.
+
+    The full-text index (doc lengths and term postings) lives in its own
+    file, stamped the same way with meta.search_revision, so tag queries
+    and plain writes whose text is unchanged never load it.
+
+    meta.usage holds [entries, bytes] per namespace, adjusted by every
+    put/delete, so budget checks never re-serialize the store.
+    """
+
+    name = "json"
+
+    def __init__(self, store_path: Path, index_path: Path, concurrency: str = "lock",
+                 search_path: Optional[Path] = None):
+        if concurrency not in CONCURRENCY_MODES:
+            raise ValueError(f"Unknown {CONCURRENCY_ENV}: {concurrency!r} (expected 'lock' or 'optimistic')")
+        self.path = store_path
+        self.index_path = index_path
+        self.search_path = search_path or store_path.with_name(store_path.stem + ".search.json")
+        self.concurrency = concurrency
+        self._store = None
+        self._tags = None
+        self._expiry = None
+        self._search = None
+        self._signature = None
+        self._store_dirty = False
+        self._index_dirty = False
+        self._search_dirty = False
+        self._depth = 0
+        self._locks = None
+        self._callbacks = []
+
+    # ── file I/O ──
+
+    @property
+    def store(self) -> dict:
+        if self._store is None:
+            # Stat before reading: if a writer replaces the file in
+            # between, the commit check sees a stale signature and
+            # reports a (harmless) conflict rather than missing one
+            self._signature = file_signature(self.path)
+            self._store = self._read(self.path, _empty_store())
+        return self._store
+
+    def _read(self, path: Path, default):
+        # Plain reads share the process-wide parse of an unchanged file;
+        # a transaction mutates what it loads, so it gets its own copy
+        if self._depth == 0:
+            return read_json_cached(path, default)
+        return read_json(path, default)
+
+    def _load_index(self) -> None:
+        # Only ever copied into sets and tuples, so the shared parse is safe
+        raw = read_json_cached(self.index_path, {})
+        expected = self.store["meta"].get("index_revision")
+        if expected is not None and raw.get("revision") == expected and "expiry" in raw:
+            self._tags = {tag: set(ids) for tag, ids in raw.get("tags", {}).items()}
+            self._expiry = [tuple(pair) for pair in raw["expiry"]]
+            return
+        self._tags = {}
+        self._expiry = []
+        for eid, entry in self.store["entries"].items():
+            for tag in entry.get("tags", []):
+                self._tags.setdefault(tag, set()).add(eid)
+            if entry.get("expires_at"):
+                self._expiry.append((entry["expires_at"], eid))
+        self._expiry.sort()
+        self._index_dirty = True
+
+    @property
+    def tags(self) -> dict:
+        """{tag: set(entry_ids)}, loaded or rebuilt on first use."""
+        if self._tags is None:
+            self._load_index()
+        return self._tags
+
+    @property
+    def expiry(self) -> list:
+        """[(expires_at, entry_id)] sorted by deadline."""
+        if self._expiry is None:
+            self._load_index()
+        return self._expiry
+
+    @property
+    def search_index(self) -> dict:
+        """{"docs": {id: length}, "terms": {term: {id: tf}}, "total": sum of lengths}."""
+        if self._search is None:
+            raw = self._read(self.search_path, {})
+            expected = self.store["meta"].get("search_revision")
+            if expected is not None and raw.get("revision") == expected:
+                self._search = {"docs": raw.get("docs", {}), "terms": raw.get("terms", {})}
+            else:
+                self._search = {"docs": {}, "terms": {}}
+                for eid, entry in self.store["entries"].items():
+                    self._search_add(eid, entry)
+                self._search_dirty = True
+            self._search["total"] = sum(self._search["docs"].values())
+        return self._search
+
+    def _search_add(self, entry_id: str, entry: dict) -> None:
+        index = self._search if self._search is not None else self.search_index
+        terms = entry_terms(entry)
+        length = sum(terms.values())
+        index["docs"][entry_id] = length
+        index["total"] = index.get("total", 0) + length
+        for term, tf in terms.items():
+            index["terms"].setdefault(term, {})[entry_id] = tf
+        self._search_dirty = True
+
+    def _search_remove(self, entry_id: str, entry: dict) -> None:
+        index = self.search_index
+        index["total"] -= index["docs"].pop(entry_id, 0)
+        for term in entry_terms(entry):
+            postings = index["terms"].get(term)
+            if postings is not None:
+                postings.pop(entry_id, None)
+                if not postings:
+                    del index["terms"][term]
+        self._search_dirty = True
+
+    def _dirty(self) -> bool:
+        return self._store_dirty or self._index_dirty or self._search_dirty
+
+    def flush(self) -> None:
+        """Atomically write whatever changed (caller holds the store lock)."""
+        if not self._dirty():
+            return
+        meta = self.store["meta"]
+        if "index_revision" not in meta or "next_expiry" not in meta:
+            self.tags  # stores from before index stamping: rebuild once
+        meta["total_entries"] = len(self.store["entries"])
+        self._usage()  # validate against the current revision before bumping it
+        meta["revision"] = meta.get("revision", 0) + 1
+        if self._index_dirty:
+            meta["index_revision"] = meta["revision"]
+            meta["next_expiry"] = self._expiry[0][0] if self._expiry else None
+        if self._search_dirty:
+            meta["search_revision"] = meta["revision"]
+        meta["usage_revision"] = meta["revision"]
+        # Store first: if we crash before the index lands, the revision
+        # stamps disagree and the next load rebuilds the index
+        atomic_write_json(self.path, self.store)
+        self._signature = file_signature(self.path)
+        if self._index_dirty:
+            atomic_write_json(self.index_path, {
+                "revision": meta["revision"],
+                "tags": {tag: sorted(ids) for tag, ids in sorted(self._tags.items())},
+                "expiry": self._expiry,
+            })
+        if self._search_dirty:
+            atomic_write_json(self.search_path, {
+                "revision": meta["revision"],
+                "docs": self._search["docs"],
+                "terms": self._search["terms"],
+            }, indent=None)
+        self._store_dirty = self._index_dirty = self._search_dirty = False
+
+    def _discard(self) -> None:
+        # Drop cached state; the next read reloads from disk
+        self._store = self._tags = self._expiry = self._search = self._signature = None
+        self._store_dirty = self._index_dirty = self._search_dirty = False
+        self._callbacks = []
+
+    def _commit(self) -> None:
+        if not self._dirty() and not self._callbacks:
+            return
+        if self.concurrency == "lock":
+            self.flush()  # already under the transaction's lock
+            self._run_callbacks()
+            return
+        with file_lock(self.path):
+            if self._dirty() and file_signature(self.path) != self._signature:
+                self._discard()
+                raise WriteConflict(f"{self.path} changed during the transaction")
+            self.flush()
+            self._run_callbacks()
+
+    @contextmanager
+    def transaction(self):
+        if self._depth == 0:
+            # Start from a fresh read so nothing cached before the
+            # transaction leaks into it
+            self._discard()
+            self._locks = ExitStack()
+            if self.concurrency == "lock":
+                self._locks.enter_context(file_lock(self.path))
+        self._depth += 1
+        try:
+            yield self
+            if self._depth == 1:
+                self._commit()
+        except BaseException:
+            if self._depth == 1:
+                self._discard()
+            raise
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._locks.close()
+                self._locks = None
+
+    # ── tag index ──
+
+    def _index_add(self, tag: str, entry_id: str) -> None:
+        postings = self.tags.setdefault(tag, set())
+        if entry_id not in postings:
+            postings.add(entry_id)
+            self._index_dirty = True
+
+    def _index_remove(self, tag: str, entry_id: str) -> None:
+        postings = self.tags.get(tag)
+        if postings and entry_id in postings:
+            postings.discard(entry_id)
+            if not postings:
+                del self.tags[tag]
+            self._index_dirty = True
+
+    def _expiry_remove(self, expires_at: float, entry_id: str) -> None:
+        pos = bisect.bisect_left(self.expiry, (expires_at, entry_id))
+        if pos < len(self.expiry) and self.expiry[pos] == (expires_at, entry_id):
+            del self.expiry[pos]
+            self._index_dirty = True
+
+    def _expiry_add(self, expires_at: float, entry_id: str) -> None:
+        bisect.insort(self.expiry, (expires_at, entry_id))
+        self._index_dirty = True
+
+    def _live_cutoff(self, now: Optional[float]) -> Optional[float]:
+        """`now`, or None when nothing can have expired by then (skip TTL checks)."""
+        meta = self.store["meta"]
+        if self._expiry is not None or "next_expiry" not in meta:
+            head = self.next_expiry()  # meta may lag changes in this transaction
+        else:
+            head = meta["next_expiry"]
+        if now is None or head is None or now <= head:
+            return None
+        return now
+
+    # ── usage accounting ──
+
+    def _usage(self) -> dict:
+        """meta["usage"] as {namespace: [entries, bytes]}, rebuilt when its
+        stamp disagrees with the store (older stores, or a write by an
+        older version that did not maintain it)."""
+        meta = self.store["meta"]
+        if "usage" not in meta or meta.get("usage_revision") != meta.get("revision"):
+            usage = {}
+            for entry in self.store["entries"].values():
+                counts = usage.setdefault(entry["namespace"], [0, 0])
+                counts[0] += 1
+                counts[1] += entry_size(entry)
+            meta["usage"] = usage
+            meta["usage_revision"] = meta.get("revision")
+        return meta["usage"]
+
+    def _account(self, entry: dict, sign: int) -> None:
+        usage = self._usage()
+        counts = usage.setdefault(entry["namespace"], [0, 0])
+        counts[0] += sign
+        counts[1] += sign * entry_size(entry)
+        if counts[0] <= 0:
+            del usage[entry["namespace"]]
+
+    # ── entries ──
+
+    def get(self, entry_id: str) -> Optional[dict]:
+        return self.store["entries"].get(entry_id)
+
+    def put(self, entry: dict) -> None:
+        entry_id = entry["id"]
+        previous = self.store["entries"].get(entry_id)
+        self._usage()  # before the store changes, in case it is rebuilt
+        if previous is not None:
+            self._account(previous, -1)
+        self._account(entry, +1)
+        old_tags = set(previous.get("tags", [])) if previous else set()
+        new_tags = set(entry.get("tags", []))
+
+        self.store["entries"][entry_id] = entry
+        self._store_dirty = True
+
+        for tag in old_tags - new_tags:
+            self._index_remove(tag, entry_id)
+        for tag in entry.get("tags", []):
+            self._index_add(tag, entry_id)
+
+        old_expiry = previous.get("expires_at") if previous else None
+        if old_expiry != entry.get("expires_at"):
+            if old_expiry:
+                self._expiry_remove(old_expiry, entry_id)
+            if entry.get("expires_at"):
+                self._expiry_add(entry["expires_at"], entry_id)
+
+        # Access-count updates and same-value rewrites leave the text alone
+        if previous is None or entry_text(previous) != entry_text(entry):
+            if previous is not None:
+                self._search_remove(entry_id, previous)
+            self._search_add(entry_id, entry)
+
+    def delete(self, entry_id: str) -> Optional[dict]:
+        if entry_id not in self.store["entries"]:
+            return None
+        self._usage()
+        entry = self.store["entries"].pop(entry_id)
+        self._account(entry, -1)
+        self._store_dirty = True
+        for tag in entry.get("tags", []):
+            self._index_remove(tag, entry_id)
+        if entry.get("expires_at"):
+            self._expiry_remove(entry["expires_at"], entry_id)
+        self._search_remove(entry_id, entry)
+        return entry
+
+    def entries(self, now: Optional[float] = None) -> Iterator[dict]:
+        now = self._live_cutoff(now)
+        for entry in self.store["entries"].values():
+            if _is_live(entry, now):
+                yield entry
+
+    def namespace_entries(self, namespace: str, now: Optional[float] = None) -> List[dict]:
+        return [e for e in self.entries(now) if e["namespace"] == namespace]
+
+    def namespace_ids(self, namespace: str) -> List[str]:
+        return [eid for eid, e in self.store["entries"].items() if e["namespace"] == namespace]
+
+    def top_k(self, namespace: str, by: str, k: int, now: Optional[float] = None) -> List[dict]:
+        # The whole file is parsed on load anyway, so a bounded heap over
+        # the namespace beats persisting ordered lists that every
+        # remember() would have to rewrite
+        return heapq.nlargest(
+            k, self.namespace_entries(namespace, now),
+            key=lambda e: (e.get(by) or 0, e.get("updated_at") or 0),
+        )
+
+    def tag_entries(self, tag: str, now: Optional[float] = None) -> List[dict]:
+        now = self._live_cutoff(now)
+        results = []
+        for eid in self.tags.get(tag, ()):
+            entry = self.store["entries"].get(eid)
+            if entry and _is_live(entry, now):
+                results.append(entry)
+        return results
+
+    def query(self, node, namespace: Optional[str] = None, now: Optional[float] = None,
+              limit: Optional[int] = None, offset: int = 0, keys_only: bool = False) -> List[dict]:
+        entries = self.store["entries"]
+        now = self._live_cutoff(now)
+
+        def universe() -> Set[str]:
+            return set(self.namespace_ids(namespace)) if namespace else set(entries)
+
+        matched = []
+        for eid in evaluate(node, lambda tag: self.tags.get(tag, ()), universe):
+            entry = entries.get(eid)
+            if entry and _is_live(entry, now) and (not namespace or entry["namespace"] == namespace):
+                matched.append(entry)
+        matched.sort(key=lambda e: (-e.get("updated_at", 0), e["id"]))
+        matched = matched[offset:offset + limit if limit is not None else None]
+        if keys_only:
+            return [{"namespace": e["namespace"], "key": e["key"]} for e in matched]
+        return matched
+
+    def expired_ids(self, now: float, limit: Optional[int] = None) -> List[str]:
+        # Everything before the first deadline >= now has expired
+        end = bisect.bisect_left(self.expiry, (now,))
+        if limit is not None:
+            end = min(end, limit)
+        return [eid for _, eid in self.expiry[:end]]
+
+    def next_expiry(self) -> Optional[float]:
+        return self.expiry[0][0] if self.expiry else None
+
+    def search(self, terms: List[str], namespace: Optional[str] = None,
+               now: Optional[float] = None, k: int = 10) -> List[dict]:
+        index = self.search_index
+        doc_count = len(index["docs"])
+        if not doc_count:
+            return []
+        postings = [index["terms"].get(term, {}) for term in terms]
+        scores = bm25(postings, [len(p) for p in postings], index["docs"],
+                      doc_count, index["total"] / doc_count)
+
+        now = self._live_cutoff(now)
+        results = []
+        for eid in sorted(scores, key=lambda d: (-scores[d], d)):
+            entry = self.store["entries"].get(eid)
+            if entry and _is_live(entry, now) and (not namespace or entry["namespace"] == namespace):
+                results.append(dict(entry, score=round(scores[eid], 4)))
+                if len(results) >= k:
+                    break
+        return results
+
+    def eviction_candidates(self, policy: str, namespace: Optional[str] = None,
+                            limit: int = 16) -> List[str]:
+        # Same trade-off as top_k: a bounded heap over the loaded entries
+        entries = self.store["entries"].values()
+        if namespace:
+            entries = (e for e in entries if e["namespace"] == namespace)
+        return [e["id"] for e in heapq.nsmallest(limit, entries, key=lambda e: eviction_key(e, policy))]
+
+    def usage(self) -> dict:
+        return {ns: {"entries": c, "bytes": b} for ns, (c, b) in self._usage().items()}
+
+    def namespace_counts(self) -> dict:
+        counts = {}
+        for e in self.store["entries"].values():
+            ns = e.get("namespace", "unknown")
+            counts[ns] = counts.get(ns, 0) + 1
+        return counts
+
+    def get_meta(self) -> dict:
+        return self.store.get("meta", {})
+
+    def set_meta(self, key: str, value) -> None:
+        self.store["meta"][key] = value
+        self._store_dirty = True
+
+    def revision(self):
+        # Every commit replaces the file, so its signature will do; a
+        # stat, where meta.revision would need the whole store parsed
+        signature = self._signature if self._signature is not None else file_signature(self.path)
+        return list(signature) if signature is not None else None
+
+
+# ── SQLite backend ─────────────────────────────────────────────
+
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id            TEXT PRIMARY KEY,
+    namespace     TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    value         TEXT NOT NULL,
+    tags          TEXT NOT NULL DEFAULT '[]',
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    expires_at    REAL,
+    access_count  INTEGER NOT NULL DEFAULT 0,
+    last_accessed REAL,
+    extra         TEXT,
+    size          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_namespace ON entries(namespace, updated_at);
+CREATE INDEX IF NOT EXISTS idx_entries_namespace_access ON entries(namespace, access_count, updated_at);
+CREATE INDEX IF NOT EXISTS idx_entries_namespace_lru ON entries(namespace, max(coalesce(last_accessed, 0), updated_at));
+CREATE INDEX IF NOT EXISTS idx_entries_namespace_created ON entries(namespace, created_at);
+CREATE INDEX IF NOT EXISTS idx_entries_updated ON entries(updated_at);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires_at) WHERE expires_at IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS entry_tags (
+    tag TEXT NOT NULL,
+    id  TEXT NOT NULL,
+    PRIMARY KEY (tag, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entry_tags_id ON entry_tags(id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS search_docs (
+    id     TEXT PRIMARY KEY,
+    length INTEGER NOT NULL,
+    digest TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS search_terms (
+    term TEXT NOT NULL,
+    id   TEXT NOT NULL,
+    tf   INTEGER NOT NULL,
+    PRIMARY KEY (term, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_terms_id ON search_terms(id);
+
+CREATE TABLE IF NOT EXISTS search_stats (
+    id    INTEGER PRIMARY KEY CHECK (id = 1),
+    docs  INTEGER NOT NULL,
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO search_stats (id, docs, total) VALUES (1, 0, 0);
+
+CREATE TABLE IF NOT EXISTS namespace_usage (
+    namespace TEXT PRIMARY KEY,
+    entries   INTEGER NOT NULL,
+    bytes     INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# ORDER BY expressions for eviction_candidates(); each matches the
+# trailing columns of a per-namespace index so the scan stops at `limit`
+_EVICTION_ORDER = {
+    "lru": "max(coalesce(last_accessed, 0), updated_at)",
+    "lfu": "access_count, updated_at",
+    "oldest": "created_at",
+}
+
+
+class SqliteBackend(MemoryBackend):
+    """Row-per-entry SQLite store; reads and writes touch only what they need."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Path, busy_timeout: float = 10.0):
+        import sqlite3
+
+        self.path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=busy_timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self._depth = 0
+        self._revision = None
+        self._changes_at_begin = 0
+        self._callbacks = []
+
+        if self.conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._upgrade()
+
+    def _upgrade(self) -> None:
+        # Statement by statement rather than executescript(), which
+        # would commit the BEGIN IMMEDIATE that guards against a
+        # concurrent upgrade
+        with self.transaction():
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            columns = {r[1] for r in self.conn.execute("PRAGMA table_info(entries)")}
+            if columns and "size" not in columns:
+                self.conn.execute("ALTER TABLE entries ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+            if version < 3:
+                # v3 added the full-text index: index existing entries
+                for entry in list(self.entries()):
+                    self._index_text(entry)
+            if version < 4:
+                # v4 added per-entry sizes and per-namespace usage
+                self.conn.executemany(
+                    "UPDATE entries SET size = ? WHERE id = ?",
+                    [(entry_size(entry), entry["id"]) for entry in list(self.entries())],
+                )
+                self.conn.execute("DELETE FROM namespace_usage")
+                self.conn.execute(
+                    "INSERT INTO namespace_usage (namespace, entries, bytes) "
+                    "SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace")
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @contextmanager
+    def transaction(self):
+        if self._depth == 0:
+            # IMMEDIATE takes the write lock up front so concurrent
+            # writers queue on busy_timeout instead of failing to upgrade
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._revision = None
+            self._changes_at_begin = self.conn.total_changes
+            self._callbacks = []
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("ROLLBACK")
+                self._revision = None
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if self.conn.total_changes != self._changes_at_begin:
+                    # meta.revision counts commits that changed something
+                    self._revision = self._stored_revision() + 1
+                    self.set_meta("revision", self._revision)
+                # Just before COMMIT: the write lock is only held until then
+                self._run_callbacks()
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                self._revision = None
+                self._callbacks = []
+                raise
+            self.conn.execute("COMMIT")
+
+    @staticmethod
+    def _row_to_entry(row) -> dict:
+        entry = {
+            "id": row["id"],
+            "namespace": row["namespace"],
+            "key": row["key"],
+            "value": json.loads(row["value"]),
+            "tags": json.loads(row["tags"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "expires_at": row["expires_at"],
+            "access_count": row["access_count"],
+        }
+        if row["last_accessed"] is not None:
+            entry["last_accessed"] = row["last_accessed"]
+        if row["extra"]:
+            entry.update(json.loads(row["extra"]))
+        return entry
+
+    def _select(self, where: str = "", params: tuple = (), now: Optional[float] = None,
+                suffix: str = "") -> List[dict]:
+        clauses = [where] if where else []
+        if now is not None:
+            clauses.append("(expires_at IS NULL OR expires_at >= ?)")
+            params = params + (now,)
+        sql = "SELECT * FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [self._row_to_entry(r) for r in self.conn.execute(sql + suffix, params)]
+
+    def get(self, entry_id: str) -> Optional[dict]:
+        rows = self._select("id = ?", (entry_id,))
+        return rows[0] if rows else None
+
+    def put(self, entry: dict) -> None:
+        extra = {k: v for k, v in entry.items() if k not in ENTRY_FIELDS}
+        tags = list(entry.get("tags", []))
+        size = entry_size(entry)
+        previous = self.conn.execute(
+            "SELECT namespace, size FROM entries WHERE id = ?", (entry["id"],)).fetchone()
+        self.conn.execute(
+            """
+            INSERT INTO entries (id, namespace, key, value, tags, created_at, updated_at,
+                                 expires_at, access_count, last_accessed, extra, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                namespace = excluded.namespace, key = excluded.key, value = excluded.value,
+                tags = excluded.tags, created_at = excluded.created_at,
+                updated_at = excluded.updated_at, expires_at = excluded.expires_at,
+                access_count = excluded.access_count, last_accessed = excluded.last_accessed,
+                extra = excluded.extra, size = excluded.size
+            """,
+            (
+                entry["id"], entry["namespace"], entry["key"],
+                json.dumps(entry.get("value"), ensure_ascii=False),
+                json.dumps(tags, ensure_ascii=False),
+                entry.get("created_at"), entry.get("updated_at"), entry.get("expires_at"),
+                entry.get("access_count", 0), entry.get("last_accessed"),
+                json.dumps(extra, ensure_ascii=False) if extra else None,
+                size,
+            ),
+        )
+        if previous is not None:
+            self._account(previous[0], -1, -previous[1])
+        self._account(entry["namespace"], 1, size)
+        self.conn.execute("DELETE FROM entry_tags WHERE id = ?", (entry["id"],))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO entry_tags (tag, id) VALUES (?, ?)",
+            [(tag, entry["id"]) for tag in tags],
+        )
+        self._index_text(entry)
+
+    def _index_text(self, entry: dict) -> None:
+        """Refresh an entry's postings unless its indexed text is unchanged."""
+        import hashlib
+
+        text = entry_text(entry)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        row = self.conn.execute(
+            "SELECT digest, length FROM search_docs WHERE id = ?", (entry["id"],)).fetchone()
+        if row is not None and row[0] == digest:
+            return
+        terms = entry_terms(entry)
+        length = sum(terms.values())
+        self.conn.execute("DELETE FROM search_terms WHERE id = ?", (entry["id"],))
+        self.conn.executemany(
+            "INSERT INTO search_terms (term, id, tf) VALUES (?, ?, ?)",
+            [(term, entry["id"], tf) for term, tf in terms.items()],
+        )
+        self.conn.execute(
+            "INSERT INTO search_docs (id, length, digest) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET length = excluded.length, digest = excluded.digest",
+            (entry["id"], length, digest),
+        )
+        self.conn.execute(
+            "UPDATE search_stats SET docs = docs + ?, total = total + ? WHERE id = 1",
+            (0 if row else 1, length - (row[1] if row else 0)),
+        )
+
+    def delete(self, entry_id: str) -> Optional[dict]:
+        rows = self.conn.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)).fetchall()
+        if not rows:
+            return None
+        entry = self._row_to_entry(rows[0])
+        self._account(entry["namespace"], -1, -rows[0]["size"])
+        self.conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+        self.conn.execute("DELETE FROM entry_tags WHERE id = ?", (entry_id,))
+        row = self.conn.execute("SELECT length FROM search_docs WHERE id = ?", (entry_id,)).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM search_terms WHERE id = ?", (entry_id,))
+            self.conn.execute("DELETE FROM search_docs WHERE id = ?", (entry_id,))
+            self.conn.execute(
+                "UPDATE search_stats SET docs = docs - 1, total = total - ? WHERE id = 1", (row[0],))
+        return entry
+
+    def _account(self, namespace: str, entries: int, size: int) -> None:
+        self.conn.execute(
+            "INSERT INTO namespace_usage (namespace, entries, bytes) VALUES (?, ?, ?) "
+            "ON CONFLICT(namespace) DO UPDATE SET entries = entries + excluded.entries, "
+            "bytes = bytes + excluded.bytes",
+            (namespace, entries, size),
+        )
+        if entries < 0:
+            self.conn.execute(
+                "DELETE FROM namespace_usage WHERE namespace = ? AND entries <= 0", (namespace,))
+
+    def entries(self, now: Optional[float] = None) -> Iterator[dict]:
+        sql = "SELECT * FROM entries"
+        params: tuple = ()
+        if now is not None:
+            sql += " WHERE expires_at IS NULL OR expires_at >= ?"
+            params = (now,)
+        for row in self.conn.execute(sql, params):
+            yield self._row_to_entry(row)
+
+    def namespace_entries(self, namespace: str, now: Optional[float] = None) -> List[dict]:
+        return self._select("namespace = ?", (namespace,), now)
+
+    def namespace_ids(self, namespace: str) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT id FROM entries WHERE namespace = ?", (namespace,))]
+
+    def tag_entries(self, tag: str, now: Optional[float] = None) -> List[dict]:
+        return self._select("id IN (SELECT id FROM entry_tags WHERE tag = ?)", (tag,), now)
+
+    def top_k(self, namespace: str, by: str, k: int, now: Optional[float] = None) -> List[dict]:
+        # Walks idx_entries_namespace / idx_entries_namespace_access
+        # backwards and stops after k live rows
+        order = "updated_at DESC" if by == "updated_at" else "access_count DESC, updated_at DESC"
+        return self._select("namespace = ?", (namespace,), now,
+                            suffix=f" ORDER BY {order} LIMIT {int(k)}")
+
+    def query(self, node, namespace: Optional[str] = None, now: Optional[float] = None,
+              limit: Optional[int] = None, offset: int = 0, keys_only: bool = False) -> List[dict]:
+        # Drive from the matched id set (sized by the posting lists
+        # involved) and join back to entries for filters and ordering
+        matches, params = compile_sql(node)
+        columns = "e.namespace, e.key" if keys_only else "e.*"
+        sql = f"SELECT {columns} FROM ({matches}) AS m JOIN entries e ON e.id = m.id"
+        clauses = []
+        if namespace:
+            clauses.append("e.namespace = ?")
+            params.append(namespace)
+        if now is not None:
+            clauses.append("(e.expires_at IS NULL OR e.expires_at >= ?)")
+            params.append(now)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.updated_at DESC, e.id"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        rows = self.conn.execute(sql, params)
+        if keys_only:
+            return [{"namespace": r["namespace"], "key": r["key"]} for r in rows]
+        return [self._row_to_entry(r) for r in rows]
+
+    def expired_ids(self, now: float, limit: Optional[int] = None) -> List[str]:
+        # Range scan over the partial idx_entries_expires index
+        return [r[0] for r in self.conn.execute(
+            "SELECT id FROM entries WHERE expires_at IS NOT NULL AND expires_at < ? "
+            "ORDER BY expires_at LIMIT ?", (now, -1 if limit is None else limit))]
+
+    def next_expiry(self) -> Optional[float]:
+        return self.conn.execute(
+            "SELECT MIN(expires_at) FROM entries WHERE expires_at IS NOT NULL").fetchone()[0]
+
+    def search(self, terms: List[str], namespace: Optional[str] = None,
+               now: Optional[float] = None, k: int = 10) -> List[dict]:
+        doc_count, total_length = self.conn.execute(
+            "SELECT docs, total FROM search_stats WHERE id = 1").fetchone()
+        weighted = []  # (doc_freq, term, idf), rarest first
+        for term in terms:
+            doc_freq = self.conn.execute(
+                "SELECT COUNT(*) FROM search_terms WHERE term = ?", (term,)).fetchone()[0]
+            if doc_freq:
+                weighted.append((doc_freq, term, idf(doc_count, doc_freq)))
+        if not weighted:
+            return []
+        weighted.sort()
+        avg_length = total_length / doc_count
+        if now is not None:
+            head = self.next_expiry()
+            if head is None or head >= now:
+                now = None  # nothing has expired: skip the TTL predicate
+
+        # MaxScore: a term adds at most idf * (K1 + 1) to any document.
+        # Scoring only documents that contain a rarer ("essential") term
+        # is exact when the k-th score beats everything the common terms
+        # alone could add up to; otherwise fall back to scoring them all.
+        essential = [term for doc_freq, term, _ in weighted if doc_freq <= doc_count // 10]
+        if essential and len(essential) < len(weighted):
+            bound = sum(w for doc_freq, _, w in weighted if doc_freq > doc_count // 10) * (K1 + 1)
+            results = self._bm25(weighted, avg_length, namespace, now, k, essential)
+            if len(results) == k and results[-1][1] > bound:
+                return [dict(self._row_to_entry(r), score=round(score, 4)) for r, score in results]
+        return [dict(self._row_to_entry(r), score=round(score, 4))
+                for r, score in self._bm25(weighted, avg_length, namespace, now, k)]
+
+    def _bm25(self, weighted, avg_length: float, namespace: Optional[str], now: Optional[float],
+              k: int, candidate_terms: Optional[List[str]] = None) -> list:
+        """Top k (row, score) pairs, summing BM25 over the matching postings."""
+        params = [x for _, term, weight in weighted for x in (term, weight)]
+        params.append(avg_length)
+        term_score = (f"q.weight * t.tf * {K1 + 1}"
+                      f" / (t.tf + {K1} * (1 - {B} + {B} * d.length / ?))")
+        restrict = ""
+        if candidate_terms:
+            marks = ", ".join("?" for _ in candidate_terms)
+            restrict = f"WHERE t.id IN (SELECT id FROM search_terms WHERE term IN ({marks}))"
+            params += candidate_terms
+        if len(weighted) > 1:
+            scored = (f"SELECT t.id AS id, SUM({term_score}) AS score FROM q"
+                      f" JOIN search_terms t ON t.term = q.term JOIN search_docs d ON d.id = t.id"
+                      f" {restrict} GROUP BY t.id")
+        else:
+            scored = (f"SELECT t.id AS id, {term_score} AS score FROM q"
+                      f" JOIN search_terms t ON t.term = q.term JOIN search_docs d ON d.id = t.id"
+                      f" {restrict}")
+        if not namespace and now is None:
+            # No entry filters: rank before joining back to entries
+            scored += " ORDER BY score DESC, id LIMIT ?"
+            params.append(k)
+        values = ", ".join("(?, ?)" for _ in weighted)
+        sql = (f"WITH q(term, weight) AS (VALUES {values}), scored AS ({scored}) "
+               f"SELECT e.*, s.score AS score FROM scored s JOIN entries e ON e.id = s.id")
+        clauses = []
+        if namespace:
+            clauses.append("e.namespace = ?")
+            params.append(namespace)
+        if now is not None:
+            clauses.append("(e.expires_at IS NULL OR e.expires_at >= ?)")
+            params.append(now)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY s.score DESC, e.id LIMIT ?"
+        params.append(k)
+        return [(r, r["score"]) for r in self.conn.execute(sql, params)]
+
+    def eviction_candidates(self, policy: str, namespace: Optional[str] = None,
+                            limit: int = 16) -> List[str]:
+        # One short index scan per namespace, merged on the policy key,
+        # instead of sorting the whole table
+        order = _EVICTION_ORDER[policy]
+        namespaces = [namespace] if namespace else list(self.usage())
+        streams = [
+            [(tuple(r[1:]), r[0]) for r in self.conn.execute(
+                f"SELECT id, {order} FROM entries WHERE namespace = ? ORDER BY {order} LIMIT ?",
+                (ns, limit))]
+            for ns in namespaces
+        ]
+        merged = heapq.merge(*streams, key=lambda pair: pair[0])
+        return [eid for _, eid in itertools.islice(merged, limit)]
+
+    def usage(self) -> dict:
+        return {r[0]: {"entries": r[1], "bytes": r[2]} for r in self.conn.execute(
+            "SELECT namespace, entries, bytes FROM namespace_usage ORDER BY namespace")}
+
+    def namespace_counts(self) -> dict:
+        return {r[0]: r[1] for r in self.conn.execute(
+            "SELECT namespace, COUNT(*) FROM entries GROUP BY namespace")}
+
+    def get_meta(self) -> dict:
+        meta = {r[0]: json.loads(r[1]) for r in self.conn.execute("SELECT key, value FROM meta")}
+        meta["total_entries"] = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return meta
+
+    def set_meta(self, key: str, value) -> None:
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value)),
+        )
+
+    def _stored_revision(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return json.loads(row[0]) if row else 0
+
+    def revision(self):
+        if self._revision is None:
+            self._revision = self._stored_revision()
+        return self._revision
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# ── Selection and migration ────────────────────────────────────
+
+def open_backend(store_path: Path, index_path: Path, db_path: Path,
+                 concurrency: Optional[str] = None) -> MemoryBackend:
+    """Open the configured backend (see module docstring)."""
+    import os
+
+    kind = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if not kind:
+        kind = "sqlite" if db_path.exists() else "json"
+    if kind == "sqlite":
+        return SqliteBackend(db_path)
+    if kind == "json":
+        if concurrency is None:
+            concurrency = os.environ.get(CONCURRENCY_ENV, "").strip().lower() or "lock"
+        return JsonBackend(store_path, index_path, concurrency)
+    raise ValueError(f"Unknown {BACKEND_ENV}: {kind!r} (expected 'json' or 'sqlite')")
+
+
+def migrate_json_to_sqlite(store_path: Path, index_path: Path, db_path: Path) -> dict:
+    """
+    Copy a JSON store into SQLite, then retire the JSON files.
+
+    The JSON files are renamed with a .migrated suffix (not deleted) so
+    the SQLite store is picked up automatically from then on.
+    """
+    if not store_path.exists():
+        return {"migrated": 0, "reason": f"no JSON store at {store_path}"}
+
+    source = JsonBackend(store_path, index_path)
+    target = SqliteBackend(db_path)
+    # Hold the JSON store's lock so no writer lands between copy and rename
+    with source.transaction():
+        try:
+            with target.transaction():
+                count = 0
+                for entry in source.entries():
+                    target.put(entry)
+                    count += 1
+                for key, value in source.get_meta().items():
+                    if key not in ("total_entries", "revision", "index_revision",
+                                   "next_expiry", "search_revision", "usage", "usage_revision"):
+                        target.set_meta(key, value)
+        finally:
+            target.close()
+
+        for path in (store_path, index_path, source.search_path):
+            if path.exists():
+                path.rename(path.with_name(path.name + ".migrated"))
+
+    return {"migrated": count, "database": str(db_path)}
@@ -0,0 +1,219 @@
+"""
+Nika tag query language.
+
+Boolean expressions over memory tags:
+
+  python AND (api OR cli) AND NOT deprecated
+  python api -deprecated          adjacent terms AND together, "-" negates
+  urgent | (bug & !wontfix)       &, |, ! work as AND, OR, NOT
+  "not" AND -'c++ (old)'          a quoted tag is taken literally, even a
+                                  keyword; backslash escapes a quote
+
+Keywords are case-insensitive. NOT binds tighter than AND, which binds
+tighter than OR. parse() turns an expression into a small tuple AST:
+
+  ("tag", name) | ("not", node) | ("and", [nodes]) | ("or", [nodes])
+
+which the storage backends evaluate — as set algebra over the posting
+lists (evaluate) or as a compound SQL SELECT (compile_sql) — so the work
+done is proportional to the posting lists involved, not the store.
+"""
+
+import re
+from typing import Callable, List, Set, Tuple
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for a malformed tag query."""
+
+
+_TOKEN = re.compile(r"""\s*(\(|\)|&&?|\|\|?|!|-?"(?:[^"\\]|\\.)*"|-?'(?:[^'\\]|\\.)*'"""
+                    r"""|[^\s()&|!"'][^\s()&|!]*)""")
+_ESCAPE = re.compile(r"\\(.)")
+_KEYWORDS = {"and": "AND", "&": "AND", "&&": "AND",
+             "or": "OR", "|": "OR", "||": "OR",
+             "not": "NOT", "!": "NOT"}
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match:
+            rest = text[pos:].lstrip()
+            if rest[:1] in ("'", '"') or rest[:2] in ("-'", '-"'):
+                raise QuerySyntaxError(f"Unterminated quote at {len(text) - len(rest)}: {rest!r}")
+            raise QuerySyntaxError(f"Unexpected character at {pos}: {text[pos:]!r}")
+        token = match.group(1)
+        pos = match.end()
+        keyword = _KEYWORDS.get(token.lower())
+        if token[-1] in ("'", '"'):
+            # A quoted tag: never a keyword
+            negated = token[0] == "-"
+            literal = _ESCAPE.sub(r"\1", token[1 + negated:-1])
+            if negated:
+                tokens.append("NOT")
+            tokens.append("TAG:" + literal)
+        elif keyword:
+            tokens.append(keyword)
+        elif token.startswith("-") and len(token) > 1:
+            tokens.extend(("NOT", "TAG:" + token[1:]))
+        else:
+            tokens.append(token if token in "()" else "TAG:" + token)
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise QuerySyntaxError("Empty tag query")
+        node = self.or_expr()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected {self.peek()!r}")
+        return node
+
+    def or_expr(self):
+        children = [self.and_expr()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.and_expr())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def and_expr(self):
+        children = [self.not_expr()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            children.append(self.not_expr())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def not_expr(self):
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.not_expr())
+        return self.atom()
+
+    def atom(self):
+        token = self.take()
+        if token is None:
+            raise QuerySyntaxError("Unexpected end of query")
+        if token == "(":
+            node = self.or_expr()
+            if self.take() != ")":
+                raise QuerySyntaxError("Missing closing parenthesis")
+            return node
+        if token.startswith("TAG:"):
+            return ("tag", token[4:])
+        raise QuerySyntaxError(f"Unexpected {token!r}")
+
+
+def parse(text: str):
+    """Parse a tag query into its AST (raises QuerySyntaxError)."""
+    return _Parser(_tokenize(text)).parse()
+
+
+# ── Set evaluation ─────────────────────────────────────────────
+
+def _eval(node, postings: Callable[[str], Set[str]]) -> Tuple[Set[str], bool]:
+    """Evaluate to (ids, negated); negated means "everything except ids".
+
+    Carrying the complement symbolically means NOT never touches the
+    full id set unless the whole query is negative.
+    """
+    kind = node[0]
+    if kind == "tag":
+        return set(postings(node[1])), False
+    if kind == "not":
+        ids, negated = _eval(node[1], postings)
+        return ids, not negated
+
+    parts = [_eval(child, postings) for child in node[1]]
+    positive = sorted((ids for ids, neg in parts if not neg), key=len)
+    negative = [ids for ids, neg in parts if neg]
+
+    if kind == "and":
+        # A ∩ B ∩ ¬C ∩ ¬D = (A ∩ B) − (C ∪ D)
+        excluded = set().union(*negative) if negative else set()
+        if positive:
+            result = set(positive[0])
+            for ids in positive[1:]:
+                result &= ids
+                if not result:
+                    break
+            return result - excluded, False
+        return excluded, True
+
+    # A ∪ B ∪ ¬C ∪ ¬D = ¬((C ∩ D) − (A ∪ B))
+    included = set().union(*positive) if positive else set()
+    if negative:
+        common = set(min(negative, key=len))
+        for ids in negative:
+            common &= ids
+        return common - included, True
+    return included, False
+
+
+def evaluate(node, postings: Callable[[str], Set[str]], universe: Callable[[], Set[str]]) -> Set[str]:
+    """Ids matching the query; universe() is only called for negative queries."""
+    ids, negated = _eval(node, postings)
+    return universe() - ids if negated else ids
+
+
+# ── SQL compilation ────────────────────────────────────────────
+
+def compile_sql(node, universe: str = "SELECT id FROM entries") -> Tuple[str, list]:
+    """Compile to a compound SELECT yielding matching ids, plus its parameters.
+
+    Expects an entry_tags(tag, id) table. SQLite compound operators are
+    left-associative and do not allow parenthesized operands, so every
+    nested compound is wrapped as a subquery.
+    """
+    kind = node[0]
+    if kind == "tag":
+        return "SELECT id FROM entry_tags WHERE tag = ?", [node[1]]
+    if kind == "not":
+        sql, params = _sub(node[1], universe)
+        return f"{universe} EXCEPT {sql}", params
+
+    positive = [c for c in node[1] if c[0] != "not"]
+    negative = [c[1] for c in node[1] if c[0] == "not"]
+    params: list = []
+    if kind == "and":
+        parts = []
+        for child in positive:
+            sql, p = _sub(child, universe)
+            parts.append(sql)
+            params += p
+        sql = " INTERSECT ".join(parts) if parts else universe
+        for child in negative:
+            sub, p = _sub(child, universe)
+            sql += f" EXCEPT {sub}"
+            params += p
+        return sql, params
+
+    parts = []
+    for child in node[1]:
+        sql, p = _sub(child, universe)
+        parts.append(sql)
+        params += p
+    return " UNION ".join(parts), params
+
+
+def _sub(node, universe: str) -> Tuple[str, list]:
+    sql, params = compile_sql(node, universe)
+    if node[0] == "tag":
+        return sql, params
+    return f"SELECT id FROM ({sql})", params
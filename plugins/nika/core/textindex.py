@@ -0,0 +1,71 @@
+"""
+Nika full-text search helpers.
+
+Tokenization and BM25 scoring shared by the storage backends' inverted
+indexes. An entry is indexed as its key, its value (strings as-is,
+anything else as JSON) and its tags; search queries go through the same
+tokenizer.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable
+
+# Okapi BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r"\w+")
+MAX_TOKEN_LENGTH = 64
+
+
+def tokenize(text: str) -> list:
+    """Lowercased word tokens of two or more characters."""
+    return [
+        word for word in _WORD.findall(text.lower())
+        if 2 <= len(word) <= MAX_TOKEN_LENGTH
+    ]
+
+
+def entry_text(entry: dict) -> str:
+    value = entry.get("value")
+    if value is None and entry.get("blob"):
+        value = entry["blob"].get("preview", "")  # out-of-line value: index its preview
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False)
+    return " ".join([entry.get("key", ""), value, " ".join(entry.get("tags", []))])
+
+
+def entry_terms(entry: dict) -> Counter:
+    """Term frequencies for an entry."""
+    return Counter(tokenize(entry_text(entry)))
+
+
+def query_terms(query: str) -> list:
+    """Distinct terms of a search query, in order."""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def idf(doc_count: int, doc_freq: int) -> float:
+    return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25(postings: Iterable[Dict[str, int]], doc_freqs: Iterable[int], doc_lengths: Dict[str, int],
+         doc_count: int, avg_length: float) -> Dict[str, float]:
+    """
+    Score documents against the query terms.
+
+    postings[i] maps doc id -> term frequency for the i-th query term and
+    doc_freqs[i] is that term's document frequency. Only documents that
+    contain at least one term are scored.
+    """
+    scores: Dict[str, float] = {}
+    avg_length = avg_length or 1.0
+    for term_postings, doc_freq in zip(postings, doc_freqs):
+        weight = idf(doc_count, doc_freq)
+        for doc_id, tf in term_postings.items():
+            norm = K1 * (1 - B + B * doc_lengths.get(doc_id, 0) / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf * (K1 + 1) / (tf + norm)
+    return scores
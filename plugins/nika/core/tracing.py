@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Low-overhead span tracing for hook entry points.
+
+Tracing is off unless CLAUDE_HOOK_TRACE is set:
+
+  CLAUDE_HOOK_TRACE=1 (or true, yes)     → ~/.claude/hook-traces/spans.jsonl
+  CLAUDE_HOOK_TRACE=/path/to/spans.jsonl → that file (absolute, or ~/...)
+
+Any other value (0, false, a relative path) leaves it off.
+
+When off, span() hands back a shared no-op context manager and nothing
+is buffered or written. When on, finished spans are buffered in memory
+and appended to the sink in a single write at interpreter exit. The sink
+is rotated once it exceeds CLAUDE_HOOK_TRACE_MAX_BYTES (default 5 MiB),
+keeping CLAUDE_HOOK_TRACE_BACKUPS old files (default 3).
+
+Every span is tagged with plugin, event, tool and session from
+configure(), which may be called after the spans it applies to (e.g.
+once stdin has been decoded).
+
+This file is vendored into each plugin that ships Python hooks; keep
+the copies identical.
+
+Usage:
+  tracing.configure(plugin="hookify", event="PreToolUse")
+  with tracing.span("stdin_decode"):
+      data = json.load(sys.stdin)
+  tracing.configure(tool=data.get("tool_name"), session=data.get("session_id"))
+
+Report:
+  python3 tracing.py report [spans.jsonl ...] [--top N] [--json]
+"""
+
+import os
+import time
+
+
+def _trace_target(value):
+    """Sink path for a CLAUDE_HOOK_TRACE value, or None to leave tracing off."""
+    value = value.strip()
+    if value.lower() in ("1", "true", "yes"):
+        return os.path.join(os.path.expanduser("~"), ".claude", "hook-traces", "spans.jsonl")
+    path = os.path.expanduser(value)
+    return path if os.path.isabs(path) else None
+
+
+_SINK = _trace_target(os.environ.get("CLAUDE_HOOK_TRACE", ""))
+ENABLED = _SINK is not None
+
+_context = {"plugin": None, "event": None, "tool": None, "session": None}
+_buffer = []
+_trace_id = None
+
+
+class _NullSpan:
+    """Shared do-nothing span used when tracing is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def tag(self, **tags):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """A timed stage; recorded into the buffer when the block exits."""
+    __slots__ = ("stage", "tags", "start_ns", "wall")
+
+    def __init__(self, stage, tags):
+        self.stage = stage
+        self.tags = tags
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {
+            "ts": round(self.wall, 6),
+            "stage": self.stage,
+            "dur_us": (time.perf_counter_ns() - self.start_ns) // 1000,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.tags:
+            record.update(self.tags)
+        _buffer.append(record)
+        return False
+
+    def tag(self, **tags):
+        """Attach extra tags discovered while the span is running."""
+        self.tags.update(tags)
+
+
+def configure(**context):
+    """Set plugin/event/tool/session tags for every span in this process."""
+    global _trace_id
+    if not ENABLED:
+        return
+    if _trace_id is None:
+        _trace_id = f"{os.getpid():x}-{time.time_ns():x}"
+        import atexit
+        atexit.register(flush)
+    _context.update({k: v for k, v in context.items() if v is not None})
+
+
+def span(stage, **tags):
+    """Time a block of work as one stage."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(stage, tags)
+
+
+def log(message, **tags):
+    """Record a zero-duration message alongside the spans."""
+    if not ENABLED:
+        return
+    record = {"ts": round(time.time(), 6), "stage": "log", "dur_us": 0, "message": str(message)}
+    record.update(tags)
+    _buffer.append(record)
+
+
+def _sink_path():
+    return _SINK
+
+
+def _rotate(path, backups):
+    for i in range(backups - 1, 0, -1):
+        older = f"{path}.{i}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def flush():
+    """Append buffered spans to the sink in one write."""
+    if not _buffer:
+        return
+    import json
+
+    context = {k: v for k, v in _context.items() if v is not None}
+    context["trace"] = _trace_id
+    lines = []
+    for record in _buffer:
+        merged = dict(context)
+        merged.update(record)
+        lines.append(json.dumps(merged, separators=(",", ":"), default=str))
+    _buffer.clear()
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+    path = _sink_path()
+    try:
+        max_bytes = int(os.environ.get("CLAUDE_HOOK_TRACE_MAX_BYTES", 5 * 1024 * 1024))
+        backups = int(os.environ.get("CLAUDE_HOOK_TRACE_BACKUPS", 3))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            if backups > 0 and os.path.getsize(path) + len(payload) > max_bytes:
+                _rotate(path, backups)
+        except OSError:
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+    except (OSError, ValueError):
+        # Tracing must never break a hook
+        pass
+
+
+# ── Report ─────────────────────────────────────────────────────
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _rotated_files(path):
+    """path and every rotated copy of it (path.1, path.2, ...), oldest first."""
+    directory, base = os.path.split(path)
+    try:
+        names = os.listdir(directory or ".")
+    except OSError:
+        names = []
+    rotated = sorted((int(name[len(base) + 1:]), os.path.join(directory, name)) for name in names
+                     if name.startswith(base + ".") and name[len(base) + 1:].isdigit())
+    files = [p for _, p in reversed(rotated)]
+    return files + [path] if os.path.exists(path) else files
+
+
+def _read_spans(paths):
+    import json
+
+    for path in paths:
+        for candidate in _rotated_files(path):
+            with open(candidate, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def build_report(spans, top=10, tail_pct=99.0):
+    """Per-stage percentiles plus the slowest traces above the tail cutoff."""
+    stages = {}
+    traces = {}
+    for s in spans:
+        if s.get("stage") == "log":
+            continue
+        group = (s.get("plugin") or "?", s.get("event") or "?", s["stage"])
+        stages.setdefault(group, []).append(s["dur_us"] / 1000)
+        trace = traces.setdefault(s.get("trace"), {
+            "plugin": s.get("plugin"), "event": s.get("event"), "tool": s.get("tool"),
+            "session": s.get("session"), "ts": s.get("ts"), "total_ms": 0.0, "stages": {},
+        })
+        ms = s["dur_us"] / 1000
+        trace["total_ms"] += ms
+        trace["stages"][s["stage"]] = round(trace["stages"].get(s["stage"], 0.0) + ms, 3)
+
+    stage_rows = []
+    for (plugin, event, stage), values in sorted(stages.items()):
+        values.sort()
+        stage_rows.append({
+            "plugin": plugin, "event": event, "stage": stage, "n": len(values),
+            "p50_ms": round(_percentile(values, 50), 3),
+            "p90_ms": round(_percentile(values, 90), 3),
+            "p99_ms": round(_percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+        })
+
+    # Slow tail: traces above the tail percentile of their own plugin/event
+    by_hook = {}
+    for trace in traces.values():
+        by_hook.setdefault((trace["plugin"], trace["event"]), []).append(trace["total_ms"])
+    cutoffs = {k: _percentile(sorted(v), tail_pct) for k, v in by_hook.items()}
+    slow = [t for t in traces.values()
+            if len(by_hook[(t["plugin"], t["event"])]) > 1
+            and t["total_ms"] >= cutoffs[(t["plugin"], t["event"])]]
+    slow.sort(key=lambda t: t["total_ms"], reverse=True)
+    for t in slow:
+        t["total_ms"] = round(t["total_ms"], 3)
+
+    return {"traces": len(traces), "stages": stage_rows, "slow_tail": slow[:top], "tail_pct": tail_pct}
+
+
+def format_report(report):
+    lines = [f"{report['traces']} traces", ""]
+    header = f"{'plugin':<18} {'event':<18} {'stage':<14} {'n':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"
+    lines.append(header)
+    lines.append("─" * len(header))
+    for row in report["stages"]:
+        lines.append(
+            f"{row['plugin']:<18} {row['event']:<18} {row['stage']:<14} {row['n']:>6} "
+            f"{row['p50_ms']:>8.2f} {row['p90_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}"
+        )
+    lines.append("")
+    lines.append(f"Slow tail (≥ p{report['tail_pct']:g} per plugin/event):")
+    if not report["slow_tail"]:
+        lines.append("  (none)")
+    for t in report["slow_tail"]:
+        worst = max(t["stages"].items(), key=lambda kv: kv[1]) if t["stages"] else ("-", 0)
+        lines.append(
+            f"  {t['total_ms']:>8.2f} ms  {t['plugin']}/{t['event']}  tool={t['tool'] or '-'}  "
+            f"session={t['session'] or '-'}  slowest={worst[0]} ({worst[1]:.2f} ms)"
+        )
+    lines.append("")
+    lines.append("Durations in ms.")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(description="Summarize hook trace spans.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="Per-stage percentiles and slow-tail traces")
+    rep.add_argument("files", nargs="*", help="Span files (default: the configured sink)")
+    rep.add_argument("--top", type=int, default=10, help="Slow traces to list (default: 10)")
+    rep.add_argument("--tail", type=float, default=99.0, help="Tail percentile cutoff (default: 99)")
+    rep.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    files = args.files or [_sink_path() if ENABLED else
+                           os.path.join(os.path.expanduser("~"), ".claude", "hook-traces", "spans.jsonl")]
+    report = build_report(_read_spans(files), top=args.top, tail_pct=args.tail)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    sys.exit(0)
@@ -0,0 +1,232 @@
+"""
+Nika local similarity index.
+
+Embeds memory entries without any network service: hashed word and
+character-trigram features (signed feature hashing into DIM buckets,
+sublinear term frequency, L2-normalized), so cosine similarity is a dot
+product.
+
+Vectors live in one append-only file of fixed-size records next to the
+store:
+
+  .claude/nika-memory.vectors   16-byte header, then per record
+                                16-byte entry id + DIM little-endian float32
+
+remember() appends a record; forget/gc append a tombstone (an all-zero
+vector). The latest record for an id wins, and compact() rewrites the
+file with only live rows once the garbage outweighs them. Fixed-size
+records keep appends to a single write and let readers memory-map the
+file as a structured array: with NumPy installed a query is one
+matrix-vector product over the mapping; without it a pure-Python loop
+gives the same results, only slower.
+"""
+
+import math
+import os
+import re
+import struct
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from core.fsutil import file_lock
+except ImportError:
+    # Run as a script from core/
+    from fsutil import file_lock
+
+
+DIM = 256
+MAGIC = b"NIKAVEC1"
+HEADER = MAGIC + struct.pack("<II", DIM, 0)
+ID_BYTES = 16
+RECORD = ID_BYTES + 4 * DIM
+
+_WORD = re.compile(r"\w+")
+
+
+def _numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+# ── Vectorizer ─────────────────────────────────────────────────
+
+def _features(text: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for word in _WORD.findall(text.lower()):
+        counts["w:" + word] = counts.get("w:" + word, 0) + 1
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            gram = padded[i:i + 3]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def embed(text: str) -> List[float]:
+    """Unit-length hashed feature vector for text (all zeros if no words)."""
+    vec = [0.0] * DIM
+    for feature, count in _features(text).items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        weight = (1.0 + math.log(count)) * (2.0 if feature.startswith("w:") else 1.0)
+        vec[h % DIM] += weight if (h >> 16) & 1 else -weight
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec] if norm else vec
+
+
+# ── Index file ─────────────────────────────────────────────────
+
+def _pack_id(entry_id: str) -> bytes:
+    raw = entry_id.encode("ascii")
+    if len(raw) > ID_BYTES:
+        raise ValueError(f"entry id too long for the vector index: {entry_id!r}")
+    return raw.ljust(ID_BYTES, b"\0")
+
+
+def _record(entry_id: str, vec: Optional[List[float]]) -> bytes:
+    values = array("f", vec if vec is not None else [0.0] * DIM)
+    if struct.pack("=I", 1) != struct.pack("<I", 1):
+        values.byteswap()
+    return _pack_id(entry_id) + values.tobytes()
+
+
+class VectorIndex:
+    """Append-only record file of entry vectors (see module docstring)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def row_count(self) -> int:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        return max(0, (size - len(HEADER)) // RECORD)
+
+    def _valid(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                return f.read(len(HEADER)) == HEADER
+        except FileNotFoundError:
+            return False
+
+    def append(self, records: Iterable[Tuple[str, Optional[List[float]]]]) -> None:
+        """Append (entry_id, vector) records; a None vector is a tombstone."""
+        payload = b"".join(_record(eid, vec) for eid, vec in records)
+        if not payload:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path):
+            fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o666)  # Less the umask
+            try:
+                size = os.fstat(fd).st_size
+                if size < len(HEADER) or os.read(fd, len(HEADER)) != HEADER:
+                    # New file, or written with another layout: start over
+                    os.ftruncate(fd, 0)
+                    os.write(fd, HEADER)
+                    size = len(HEADER)
+                torn = (size - len(HEADER)) % RECORD
+                if torn:
+                    # Drop a partial record left by a crash mid-append
+                    os.ftruncate(fd, size - torn)
+                os.lseek(fd, 0, os.SEEK_END)
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+
+    def remove(self, entry_ids: Iterable[str]) -> None:
+        self.append((eid, None) for eid in entry_ids)
+
+    # ── reading ──
+
+    def _rows(self) -> Iterator[Tuple[str, bytes]]:
+        """(entry_id, raw vector bytes) per record, oldest first."""
+        if not self._valid():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(len(HEADER))
+            while True:
+                record = f.read(RECORD)
+                if len(record) < RECORD:
+                    return
+                yield record[:ID_BYTES].rstrip(b"\0").decode("ascii"), record[ID_BYTES:]
+
+    def latest(self, ids: Optional[Set[str]] = None) -> Dict[str, bytes]:
+        """Live entry id -> raw vector bytes (the latest record per id),
+        limited to `ids` if given."""
+        rows: Dict[str, bytes] = {}
+        for eid, raw in self._rows():
+            if ids is None or eid in ids:
+                rows[eid] = raw
+        return {eid: raw for eid, raw in rows.items() if raw.count(0) != len(raw)}
+
+    def scores(self, query: List[float], ids: Optional[Set[str]] = None) -> List[Tuple[float, str]]:
+        """(cosine, entry_id) for every live id (of `ids`, if given) with a
+        positive score, best first."""
+        rows = self.row_count()
+        if not rows or not self._valid():
+            return []
+        np = _numpy()
+        if np is not None:
+            results = self._scores_numpy(np, query, rows)
+            return results if ids is None else [r for r in results if r[1] in ids]
+
+        q = array("f", query)
+        results = []
+        little = struct.pack("=I", 1) == struct.pack("<I", 1)
+        for eid, raw in self.latest(ids).items():
+            vec = array("f")
+            vec.frombytes(raw)
+            if not little:
+                vec.byteswap()
+            score = sum(a * b for a, b in zip(vec, q))
+            if score > 0:
+                results.append((score, eid))
+        results.sort(key=lambda r: (-r[0], r[1]))
+        return results
+
+    def _scores_numpy(self, np, query: List[float], rows: int) -> List[Tuple[float, str]]:
+        dtype = np.dtype([("id", f"S{ID_BYTES}"), ("vec", "<f4", (DIM,))])
+        data = np.memmap(self.path, dtype=dtype, mode="r", offset=len(HEADER), shape=(rows,))
+        scores = data["vec"] @ np.asarray(query, dtype=np.float32)
+
+        # Keep only the latest record per id (first hit scanning backwards);
+        # tombstones score exactly 0 and fall out below
+        ids = data["id"]
+        _, first_from_end = np.unique(ids[::-1], return_index=True)
+        latest = np.zeros(rows, dtype=bool)
+        latest[rows - 1 - first_from_end] = True
+        scores = np.where(latest & (scores > 0), scores, -np.inf)
+
+        order = np.argsort(-scores, kind="stable")
+        results = []
+        for row in order:
+            if not np.isfinite(scores[row]):
+                break
+            results.append((float(scores[row]), ids[row].rstrip(b"\0").decode("ascii")))
+        return results
+
+    def compact(self, keep: Iterable[str], missing: Dict[str, List[float]] = None) -> int:
+        """
+        Rewrite the file with the latest live vector of each id in `keep`,
+        plus `missing` (id -> vector) for ids that had none. Returns rows written.
+        """
+        keep = set(keep)
+        with file_lock(self.path):
+            live = {eid: raw for eid, raw in self.latest().items() if eid in keep}
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(HEADER)
+                for eid, raw in live.items():
+                    f.write(_pack_id(eid) + raw)
+                for eid, vec in (missing or {}).items():
+                    if eid not in live:
+                        f.write(_record(eid, vec))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        return len(live) + len(set(missing or {}) - set(live))
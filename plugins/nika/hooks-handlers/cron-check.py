@@ -4,42 +4,77 @@ Nika Cron Check Hook.
 
 Runs on each UserPromptSubmit to check for due cron jobs.
 If jobs are due, injects their instructions into the context.
+
+The common case, nothing due, is answered from one number: the earliest
+next_run the cron engine keeps in .claude/nika-cron.next. The job file
+is only loaded once that time has passed (or the sidecar is stale).
 """
 
-import json
 import os
 import sys
-import time
 
 plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, plugin_root)
 
-from core.cron import check_due_jobs, generate_due_context
+import time
+
+from core.paths import cron_next_due
+
+# Fast path: nothing due before the earliest next_run (inf without a
+# cron file), so answer before importing json and the cron engine.
+next_due = cron_next_due()
+if next_due is not None and time.time() < next_due:
+    try:
+        sys.stdin.buffer.read()
+    except (OSError, ValueError):
+        pass
+    sys.stdout.write("{}\n")
+    sys.exit(0)
+
+import json
+
+from core.cron import check_due_jobs, cron_summary, generate_due_context
+from core import tracing
 
 
 def main():
     try:
+        tracing.configure(plugin="nika", event="UserPromptSubmit")
+
         input_data = {}
         try:
-            raw = sys.stdin.read()
-            if raw.strip():
-                input_data = json.loads(raw)
+            with tracing.span("stdin_decode"):
+                raw = sys.stdin.read()
+                if raw.strip():
+                    input_data = json.loads(raw)
         except (json.JSONDecodeError, EOFError):
             pass
+        tracing.configure(session=input_data.get("session_id"))
 
-        due_jobs = check_due_jobs()
+        due_jobs, report = [], {}
+        if next_due is None:
+            # Stale sidecar: rebuilding the summary rewrites it
+            with tracing.span("state_io", op="cron_summary"):
+                due_at = cron_summary()["next_due"]
+        else:
+            due_at = next_due
+        if due_at is not None and time.time() >= due_at:
+            with tracing.span("state_io", op="check_due_jobs") as span:
+                due_jobs = check_due_jobs(holder=input_data.get("session_id"), report=report)
+                span.tag(due=len(due_jobs))
 
-        if due_jobs:
-            context = generate_due_context(due_jobs)
-            response = {
-                "hookSpecificOutput": {
-                    "additionalContext": context
+        with tracing.span("output_encode"):
+            if due_jobs:
+                context = generate_due_context(due_jobs, report.get("queued", 0))
+                response = {
+                    "hookSpecificOutput": {
+                        "additionalContext": context
+                    }
                 }
-            }
-            print(json.dumps(response))
-        else:
-            # No due jobs — silent pass
-            print(json.dumps({}))
+                print(json.dumps(response))
+            else:
+                # No due jobs — silent pass
+                print(json.dumps({}))
 
     except Exception as e:
         # Don't block on errors
@@ -6,41 +6,83 @@ Runs when a session is ending to:
 1. Persist session context to memory
 2. Update cron job states
 3. Log session metadata
+4. Run a bounded memory GC, plus the maintenance session start defers
+   (access-log folding, vector compaction, blob GC) at most once per
+   MAINTENANCE_INTERVAL
+5. Release the leases of cron jobs this session claimed: it runs on
+   Stop, so their runs (injected this turn) are over
+
+In a project with neither a memory store nor a cron file there is
+nothing to persist or release, so the hook answers before importing
+json and the engines.
 """
 
-import json
 import os
 import sys
-import time
 
 plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, plugin_root)
 
-from core.memory import remember, memory_stats
+from core.paths import has_cron_store, has_memory_store
+
+# Fast path: no Nika state in this project
+if not has_memory_store() and not has_cron_store():
+    try:
+        sys.stdin.buffer.read()
+    except (OSError, ValueError):
+        pass
+    sys.stdout.write("{}\n")
+    sys.exit(0)
+
+import json
+import time
+
+from core.memory import gc_expired, maintenance_due, remember, session_summary
+from core import tracing
+
+# Most expired entries removed per turn; the rest go at the next Stop
+STOP_GC_LIMIT = 500
 
 
 def main():
     try:
+        tracing.configure(plugin="nika", event="Stop")
+
         input_data = {}
         try:
-            raw = sys.stdin.read()
-            if raw.strip():
-                input_data = json.loads(raw)
+            with tracing.span("stdin_decode"):
+                raw = sys.stdin.read()
+                if raw.strip():
+                    input_data = json.loads(raw)
         except (json.JSONDecodeError, EOFError):
             pass
+        tracing.configure(session=input_data.get("session_id"))
+
+        # Record session end in memory; the stored summary has the count
+        # without parsing the store
+        with tracing.span("state_io", op="session_summary"):
+            total = session_summary().get("total_entries", 0)
+        with tracing.span("state_io", op="remember"):
+            remember(
+                namespace="context",
+                key="last-session",
+                value={
+                    "ended_at": time.time(),
+                    "ended_at_human": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "memory_entries_at_end": total,
+                },
+                tags=["session", "meta"],
+            )
+        with tracing.span("state_io", op="gc_expired"):
+            gc_expired(limit=STOP_GC_LIMIT, maintenance=maintenance_due())
+
+        session_id = input_data.get("session_id")
+        if session_id and has_cron_store():
+            from core.cron import cron_summary, release_leases
 
-        # Record session end in memory
-        stats = memory_stats()
-        remember(
-            namespace="context",
-            key="last-session",
-            value={
-                "ended_at": time.time(),
-                "ended_at_human": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "memory_entries_at_end": stats.get("total_entries", 0),
-            },
-            tags=["session", "meta"],
-        )
+            with tracing.span("state_io", op="release_leases"):
+                if cron_summary().get("leased"):
+                    release_leases(session_id)
 
         # Output minimal response
         response = {
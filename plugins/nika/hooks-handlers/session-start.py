@@ -7,9 +7,20 @@ Runs at the beginning of each session to:
 2. Load persistent memory summary
 3. Check for due cron jobs
 4. Inject context into the session
+
+The independent phases (expired-memory GC, memory summary, cron summary,
+banner) run side by side on daemon threads under one deadline,
+NIKA_BOOTSTRAP_BUDGET seconds (default 5). Sections whose phase misses
+it are left out with a note, and the phase keeps running only until the
+hook exits. GC here is bounded and skips the maintenance work, which the
+Stop hook does at most hourly. Per-phase timings are written to
+.claude/nika-bootstrap.json for /nika-status.
+
+In a project with neither a memory store nor a cron file the context is
+constant, so the hook answers without importing json, threading or the
+tracer.
 """
 
-import json
 import os
 import sys
 import time
@@ -18,16 +29,148 @@ import time
 plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, plugin_root)
 
-from core.memory import memory_stats, recall_namespace, gc_expired
-from core.cron import check_due_jobs, generate_due_context, list_jobs
-from core.colors import (
-    nika_banner, nika_box, ACCENT, HEADER, MUTED, RESET, BOLD,
-    DOT, ARROW, BULLET, status_dot
-)
+from core.paths import BOOTSTRAP_FILE, has_memory_store, has_cron_store, has_project_dir, project_file
+
+# Overall deadline for the bootstrap phases (the hook itself times out at 15 s)
+BOOTSTRAP_BUDGET = float(os.environ.get("NIKA_BOOTSTRAP_BUDGET", "5"))
+
+# Most expired entries removed at session start; the rest go at the next GC
+BOOTSTRAP_GC_LIMIT = 500
+
+EMPTY_MEMORY_CONTEXT = [
+    "### Memory: Empty (first session)",
+    "Use `/nika-memory` to store persistent knowledge.",
+    "",
+]
+
+COMMANDS_CONTEXT = [
+    "### Nika Commands",
+    "  - `/nika <task>` — Multi-agent orchestration",
+    "  - `/nika-spawn <n> <task>` — Spawn N parallel agents",
+    "  - `/nika-memory <action>` — Persistent memory management",
+    "  - `/nika-cron <action>` — Cron job management",
+    "  - `/nika-status` — System dashboard",
+    "",
+]
+
+
+# ── Phases ─────────────────────────────────────────────────
+
+def _gc_phase():
+    from core.memory import gc_expired
+    return gc_expired(limit=BOOTSTRAP_GC_LIMIT, maintenance=False)
+
+
+def _memory_phase():
+    from core.memory import session_summary
+    return session_summary()
+
+
+def _cron_phase():
+    from core.cron import cron_summary
+    return cron_summary()
+
+
+def run_phases(phases, budget):
+    """
+    Run each (name, fn) on its own daemon thread and wait for all of
+    them, but no longer than `budget` seconds in total.
+
+    Returns {name: {"status": "ok"|"error"|"timeout", "ms", "result"|"error"}}.
+    A phase that times out is abandoned, not cancelled: daemon threads
+    do not hold up interpreter exit, and every store write is atomic.
+    """
+    import threading
+    from core import tracing
+
+    results = {}
+    lock = threading.Lock()
+
+    def run(name, fn):
+        start = time.perf_counter()
+        try:
+            with tracing.span("phase", name=name):
+                outcome = {"status": "ok", "result": fn()}
+        except Exception as e:
+            outcome = {"status": "error", "error": str(e)}
+        outcome["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        with lock:
+            results[name] = outcome
+
+    deadline = time.monotonic() + budget
+    threads = [threading.Thread(target=run, args=(name, fn), name=f"nika-{name}", daemon=True)
+               for name, fn in phases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    with lock:
+        finished = dict(results)
+    for name, _ in phases:
+        if name not in finished:
+            finished[name] = {"status": "timeout", "ms": round(budget * 1000, 1)}
+    return finished
+
+
+def _save_timings(phases, total_ms, budget):
+    """Record per-phase timings for /nika-status (only in a project with
+    .claude/ and a store: with neither, only the banner ran)."""
+    if not has_project_dir() or set(phases) <= {"banner"}:
+        return
+    from pathlib import Path
+    from core.fsutil import atomic_write_json
+    try:
+        atomic_write_json(Path(project_file(BOOTSTRAP_FILE)), {
+            "at": time.time(),
+            "budget": budget,
+            "total_ms": round(total_ms, 1),
+            "phases": {name: {k: v for k, v in phase.items() if k in ("status", "ms", "error")}
+                       for name, phase in phases.items()},
+        })
+    except OSError:
+        pass
+
+
+# ── Context ────────────────────────────────────────────────
+
+def build_session_context(memory_present=True, cron_present=True, summary=None,
+                          budget=None, phases=None, session_id=None):
+    """Build the context to inject at session start.
+
+    The memory and cron engines are only imported when their store
+    files exist; a fresh project renders from constants alone. Both
+    render from the summaries their engines keep up to date on every
+    write, so neither store is parsed unless GC or a cron job is due.
+    If `summary` is a dict, it receives the entry and active-job counts
+    for the terminal banner, so main() need not read the stores again.
 
+    The phases run concurrently within `budget` seconds (default
+    BOOTSTRAP_BUDGET); `phases` may be a dict to receive their results
+    (see run_phases()), including the rendered "banner". Due cron jobs
+    are leased to `session_id`.
+    """
+    from core.colors import nika_banner
+
+    budget = BOOTSTRAP_BUDGET if budget is None else budget
+    started = time.monotonic()
+
+    plan = [("banner", nika_banner)]
+    if memory_present:
+        plan += [("gc", _gc_phase), ("memory", _memory_phase)]
+    if cron_present:
+        plan.append(("cron", _cron_phase))
+    results = run_phases(plan, budget)
+    if phases is not None:
+        phases.update(results)
+
+    def result(name, default):
+        phase = results.get(name)
+        return phase["result"] if phase and phase["status"] == "ok" else default
+
+    def missed(name):
+        return name in results and results[name]["status"] != "ok"
 
-def build_session_context():
-    """Build the context to inject at session start."""
     context_parts = []
 
     # ── Banner ─────────────────────────────────────────────
@@ -35,103 +178,170 @@ def build_session_context():
     context_parts.append("")
 
     # ── Memory Summary ─────────────────────────────────────
-    # Garbage collect first
-    gc_count = gc_expired()
+    gc_count = result("gc", 0)
+    memory = result("memory", {})
+    if gc_count and memory and time.monotonic() - started < budget:
+        # The summary may have been read before GC's commit; re-reading
+        # the stored summary is cheap
+        memory = _memory_phase()
+    total = memory.get("total_entries", 0)
 
-    stats = memory_stats()
-    total = stats.get("total_entries", 0)
-    namespaces = stats.get("namespaces", {})
-
-    if total > 0:
+    if missed("memory"):
+        context_parts.append(f"### Persistent Memory: not loaded ({results['memory']['status']})")
+        context_parts.append("Use `/nika-memory stats` to inspect it.")
+        context_parts.append("")
+    elif total > 0:
+        namespace_bytes = memory.get("namespace_bytes", {})
         context_parts.append(f"### Persistent Memory: {total} entries")
-        for ns, count in namespaces.items():
-            context_parts.append(f"  - `{ns}`: {count} entries")
+        for ns, count in memory.get("namespaces", {}).items():
+            size_kb = namespace_bytes.get(ns, 0) / 1024
+            context_parts.append(f"  - `{ns}`: {count} entries ({size_kb:.1f} KB)")
         context_parts.append("")
 
-        # Load key context memories
-        context_memories = recall_namespace("context")
+        # Key context memories (most recent first)
+        context_memories = memory.get("context", [])
         if context_memories:
             context_parts.append("### Remembered Context")
-            for mem in context_memories[:5]:  # Limit to 5 most relevant
-                context_parts.append(f"  - **{mem['key']}**: {str(mem['value'])[:200]}")
+            for mem in context_memories:
+                context_parts.append(f"  - **{mem['key']}**: {mem['preview'][:200]}")
             context_parts.append("")
 
-        # Load project memories
-        project_memories = recall_namespace("project")
+        # Project memories: those closest to the current context,
+        # topped up with the most used
+        project_memories = memory.get("related", [])[:5]
+        seen = {m["id"] for m in project_memories}
+        project_memories += [m for m in memory.get("project", [])
+                             if m["id"] not in seen][:5 - len(project_memories)]
         if project_memories:
             context_parts.append("### Project Knowledge")
-            for mem in project_memories[:5]:
-                context_parts.append(f"  - **{mem['key']}**: {str(mem['value'])[:200]}")
+            for mem in project_memories:
+                context_parts.append(f"  - **{mem['key']}**: {mem['preview']}")
             context_parts.append("")
     else:
-        context_parts.append("### Memory: Empty (first session)")
-        context_parts.append("Use `/nika-memory` to store persistent knowledge.")
-        context_parts.append("")
+        context_parts.extend(EMPTY_MEMORY_CONTEXT)
 
     if gc_count > 0:
         context_parts.append(f"*Garbage collected {gc_count} expired memory entries.*")
         context_parts.append("")
+    elif missed("gc"):
+        context_parts.append("*Expired-memory GC deferred to the end of this turn.*")
+        context_parts.append("")
 
     # ── Cron Jobs ──────────────────────────────────────────
-    due_jobs = check_due_jobs()
-    all_jobs = list_jobs()
-
-    if due_jobs:
-        context_parts.append(generate_due_context(due_jobs))
-    elif all_jobs:
-        enabled = [j for j in all_jobs if j.get("enabled", True)]
-        context_parts.append(f"### Cron: {len(enabled)} active jobs, none due now")
+    # Claiming due jobs writes their next run, so it happens here rather
+    # than on a thread that may be abandoned; with no budget left they
+    # wait for the cron check on the next prompt
+    due_jobs, jobs, report = [], result("cron", {}), {}
+    next_due = jobs.get("next_due")
+    if next_due is not None and time.time() >= next_due and time.monotonic() - started < budget:
+        from core.cron import check_due_jobs, generate_due_context
+        from core import tracing
+
+        claim_start = time.perf_counter()
+        with tracing.span("state_io", op="check_due_jobs"):
+            due_jobs = check_due_jobs(holder=session_id, report=report)
+        if phases is not None:
+            phases["claim"] = {"status": "ok", "ms": round((time.perf_counter() - claim_start) * 1000, 1)}
+
+    enabled = jobs.get("enabled_jobs", 0)
+    if missed("cron"):
+        context_parts.append(f"### Cron: not loaded ({results['cron']['status']})")
+        context_parts.append("Use `/nika-cron list` to inspect jobs.")
+        context_parts.append("")
+    elif due_jobs:
+        context_parts.append(generate_due_context(due_jobs, report.get("queued", 0)))
+    elif jobs.get("jobs"):
+        context_parts.append(f"### Cron: {enabled} active jobs, none due now")
         context_parts.append("")
 
+    if summary is not None:
+        summary.update(total_entries="?" if missed("memory") else total,
+                       enabled_jobs="?" if missed("cron") else enabled)
+
     # ── Available Commands ─────────────────────────────────
-    context_parts.append("### Nika Commands")
-    context_parts.append("  - `/nika <task>` — Multi-agent orchestration")
-    context_parts.append("  - `/nika-spawn <n> <task>` — Spawn N parallel agents")
-    context_parts.append("  - `/nika-memory <action>` — Persistent memory management")
-    context_parts.append("  - `/nika-cron <action>` — Cron job management")
-    context_parts.append("  - `/nika-status` — System dashboard")
-    context_parts.append("")
+    context_parts.extend(COMMANDS_CONTEXT)
 
     return "\n".join(context_parts)
 
 
+def _print_banner(banner, total_entries, enabled_jobs):
+    """The banner and status line, for the terminal (stderr)."""
+    from core.colors import ACCENT, MUTED, RESET, DOT
+
+    status_line = (
+        f"{ACCENT}{DOT}{RESET} Memory: {total_entries} entries  "
+        f"{ACCENT}{DOT}{RESET} Cron: {enabled_jobs} active jobs  "
+        f"{ACCENT}{DOT}{RESET} Agents: 6 available"
+    )
+    print(banner, file=sys.stderr)
+    print(status_line, file=sys.stderr)
+    print(f"{MUTED}{'─' * 58}{RESET}", file=sys.stderr)
+
+
+def _json_string(text):
+    """JSON string literal for the constant context, as json.dumps() would
+    write it, without importing json (and re) for it."""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return '"' + escaped.encode("ascii", "backslashreplace").decode("ascii") + '"'
+
+
+def _fresh_session():
+    """Answer for a project with no Nika state: nothing to load or claim."""
+    from core.colors import nika_banner
+
+    try:
+        sys.stdin.buffer.read()
+    except (OSError, ValueError):
+        pass
+    _print_banner(nika_banner(), 0, 0)
+    context = "\n".join(["## Nika OS — Session Started", ""] + EMPTY_MEMORY_CONTEXT + COMMANDS_CONTEXT)
+    sys.stdout.write(f'{{"hookSpecificOutput": {{"additionalContext": {_json_string(context)}}}}}\n')
+
+
 def main():
     """Hook entry point — reads stdin, outputs JSON response."""
+    memory_present = has_memory_store()
+    cron_present = has_cron_store()
+    if not memory_present and not cron_present:
+        _fresh_session()
+        return
+
+    import json
+    from core import tracing
+
     try:
+        tracing.configure(plugin="nika", event="SessionStart")
+
         # Read hook input (may be empty for SessionStart)
         input_data = {}
         try:
-            raw = sys.stdin.read()
-            if raw.strip():
-                input_data = json.loads(raw)
+            with tracing.span("stdin_decode"):
+                raw = sys.stdin.read()
+                if raw.strip():
+                    input_data = json.loads(raw)
         except (json.JSONDecodeError, EOFError):
             pass
+        tracing.configure(session=input_data.get("session_id"))
 
-        context = build_session_context()
+        summary, phases = {}, {}
+        start = time.perf_counter()
+        with tracing.span("evaluate"):
+            context = build_session_context(memory_present, cron_present, summary,
+                                            phases=phases, session_id=input_data.get("session_id"))
+        _save_timings(phases, (time.perf_counter() - start) * 1000, BOOTSTRAP_BUDGET)
 
-        # Build banner for stderr (visible in terminal)
-        banner = nika_banner()
-        stats = memory_stats()
-        jobs = list_jobs()
-        enabled_jobs = [j for j in jobs if j.get("enabled", True)]
-
-        status_line = (
-            f"{ACCENT}{DOT}{RESET} Memory: {stats.get('total_entries', 0)} entries  "
-            f"{ACCENT}{DOT}{RESET} Cron: {len(enabled_jobs)} active jobs  "
-            f"{ACCENT}{DOT}{RESET} Agents: 6 available"
-        )
-
-        print(banner, file=sys.stderr)
-        print(status_line, file=sys.stderr)
-        print(f"{MUTED}{'─' * 58}{RESET}", file=sys.stderr)
+        # Banner for stderr (visible in terminal)
+        _print_banner(phases["banner"].get("result") or "",
+                      summary["total_entries"], summary["enabled_jobs"])
 
         # Output JSON for Claude Code
-        response = {
-            "hookSpecificOutput": {
-                "additionalContext": context
+        with tracing.span("output_encode"):
+            response = {
+                "hookSpecificOutput": {
+                    "additionalContext": context
+                }
             }
-        }
-        print(json.dumps(response))
+            print(json.dumps(response))
 
     except Exception as e:
         # Don't block session on hook errors
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark next-fire computation for Nika cron expressions.
+
+Generates a mix of realistic schedules (weekday mornings, steps, lists,
+names, month-end days, @monthly, timezones), then times:
+
+  compile   parsing every expression into field bitsets (cache cleared)
+  next      next_after() for every job from one instant
+  chain     the next --chain fire times of every job, one after another
+  claim     check_due_jobs() in a throwaway project where every job is
+            due, i.e. claiming them all and computing their next_run
+
+With --naive, next is also computed for a sample of jobs by stepping
+minute by minute, the way a matcher without a next-fire function would,
+and extrapolated to all jobs.
+
+Usage:
+  bench-cron.py [--jobs 5000] [--chain 10] [--naive] [--no-claim] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLUGIN_ROOT))
+
+from core.cronexpr import CronExpr, compile_expr  # noqa: E402
+
+TIMEZONES = [None, "UTC", "Europe/Paris", "America/New_York", "Asia/Kolkata", "Australia/Sydney"]
+
+
+def _expression(rng: random.Random) -> str:
+    minute, hour = rng.randrange(60), rng.randrange(24)
+    return rng.choice([
+        f"{minute} {hour} * * *",
+        f"{minute} {hour} * * 1-5",
+        f"{minute} {hour} * * mon,wed,fri",
+        f"*/{rng.choice([5, 10, 15, 30])} * * * *",
+        f"{minute} */{rng.choice([2, 3, 6])} * * *",
+        f"{minute} {hour} {rng.randrange(1, 29)} * *",
+        f"{minute} {hour} 1,15 * *",
+        f"{minute} 9-17 * jan-mar,oct-dec sat,sun",
+        f"{minute} {hour} 31 * *",
+        "@monthly",
+    ])
+
+
+def _naive_next(expr: CronExpr, ts: float) -> float:
+    """Minute-by-minute reference (local time only)."""
+    t = (int(ts) // 60 + 1) * 60
+    while True:
+        wall = time.localtime(t)
+        weekday = (wall.tm_wday + 1) % 7
+        dom, dow = expr.days >> wall.tm_mday & 1, expr.weekdays >> weekday & 1
+        day = (dom and dow) if expr._dom_any or expr._dow_any else (dom or dow)
+        if (expr.months >> wall.tm_mon & 1 and day and expr.hours >> wall.tm_hour & 1
+                and expr.minutes >> wall.tm_min & 1):
+            return t
+        t += 60
+
+
+def _claim(schedules) -> float:
+    """ms for check_due_jobs() to claim every job in a scratch project."""
+    project = tempfile.mkdtemp(prefix="nika-bench-cron-")
+    cwd = os.getcwd()
+    try:
+        os.makedirs(os.path.join(project, ".claude"))
+        os.chdir(project)
+        from core import cron
+        from core.paths import clear_root_cache
+        clear_root_cache()
+
+        now = time.time()
+        jobs = [{"id": f"cron-{i:05d}", "name": f"job-{i}", "schedule": schedule,
+                 "interval_seconds": None, "instruction": "noop", "enabled": True,
+                 "created_at": now, "last_run": None, "next_run": now - 1,
+                 "created_by": "bench", "run_count": 0, "tags": []}
+                for i, schedule in enumerate(schedules)]
+        with cron._cron_lock():
+            cron._save_cron({"jobs": jobs})
+        compile_expr.cache_clear()
+
+        start = time.perf_counter()
+        due = cron.check_due_jobs(limit=0)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert len(due) == len(schedules), (len(due), len(schedules))
+        return elapsed
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(project, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--chain", type=int, default=10)
+    parser.add_argument("--naive", action="store_true", help="compare with minute stepping")
+    parser.add_argument("--no-claim", action="store_true", help="skip the check_due_jobs() run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pairs = [(_expression(rng), rng.choice(TIMEZONES)) for _ in range(args.jobs)]
+    now = time.time()
+    report = {"jobs": args.jobs}
+
+    compile_expr.cache_clear()
+    start = time.perf_counter()
+    exprs = [compile_expr(text, tz) for text, tz in pairs]
+    report["compile_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for expr in exprs:
+        expr.next_after(now)
+    report["next_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for expr in exprs:
+        at = now
+        for _ in range(args.chain):
+            at = expr.next_after(at)
+    report["chain_ms"] = (time.perf_counter() - start) * 1000
+    report["chain"] = args.chain
+
+    if args.naive:
+        sample = [compile_expr(text) for text, _ in pairs[:100]]
+        start = time.perf_counter()
+        for expr in sample:
+            assert _naive_next(expr, now) == expr.next_after(now)
+        report["naive_next_ms"] = (time.perf_counter() - start) * 1000 * args.jobs / len(sample)
+
+    if not args.no_claim:
+        schedules = [{"cron": text, "timezone": tz} if tz else text for text, tz in pairs]
+        report["claim_ms"] = _claim(schedules)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    jobs = args.jobs
+    print(f"{jobs} jobs")
+    print(f"  compile  {report['compile_ms']:9.1f} ms  ({report['compile_ms'] * 1000 / jobs:.1f} µs/job)")
+    print(f"  next     {report['next_ms']:9.1f} ms  ({report['next_ms'] * 1000 / jobs:.1f} µs/job)")
+    print(f"  chain    {report['chain_ms']:9.1f} ms  ({args.chain} fire times per job)")
+    if "naive_next_ms" in report:
+        print(f"  naive    {report['naive_next_ms']:9.1f} ms  (minute stepping, extrapolated from 100 jobs)")
+    if "claim_ms" in report:
+        print(f"  claim    {report['claim_ms']:9.1f} ms  (check_due_jobs with every job due)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Stress-test Nika's memory and cron stores under concurrent writers.
+
+Starts many processes against one throwaway project, releases them at
+the same instant and has each write its own set of memory keys and cron
+jobs. Afterwards every write that returned must be present (no lost
+updates) and every state file must parse (no torn writes). With --kill,
+some workers are SIGKILLed mid-run to check crash atomicity; their
+partial work is not counted, but the files they were writing must still
+be intact.
+
+Usage:
+  stress-store.py [--procs 8] [--ops 100] [--cron-jobs 10]
+                  [--backend json|sqlite|all] [--concurrency lock|optimistic|all]
+                  [--kill N] [--keep] [--json]
+
+Exit status is 1 if any configuration lost an update or left a
+corrupt file.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _worker(project, worker_id, ops, cron_jobs, start, done_queue):
+    os.chdir(project)
+    sys.path.insert(0, str(PLUGIN_ROOT))
+    from core.memory import remember, recall
+    from core.cron import add_job
+
+    start.wait()
+    written = []
+    jobs = []
+    for i in range(ops):
+        key = f"k{i}"
+        remember(f"w{worker_id}", key, {"worker": worker_id, "i": i},
+                 tags=[f"w{worker_id}", "stress"])
+        written.append(key)
+        if i % 10 == 0:
+            recall(f"w{worker_id}", key)
+        if i < cron_jobs:
+            jobs.append(add_job(f"w{worker_id}-job{i}", {"every_minutes": 5}, "noop")["id"])
+    done_queue.put((worker_id, written, jobs))
+
+
+def _check_files(claude_dir):
+    """Return a list of state files that do not parse."""
+    corrupt = []
+    for path in claude_dir.glob("nika-*.json"):
+        try:
+            json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            corrupt.append(f"{path.name}: {e}")
+    corrupt.extend(p.name for p in claude_dir.glob("*.corrupt-*"))
+    return corrupt
+
+
+def run_config(backend, concurrency, args):
+    project = Path(tempfile.mkdtemp(prefix="nika-stress-"))
+    claude_dir = project / ".claude"
+    claude_dir.mkdir()
+    os.environ["NIKA_MEMORY_BACKEND"] = backend
+    os.environ["NIKA_MEMORY_CONCURRENCY"] = concurrency
+
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    start = ctx.Event()
+    done = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(project, w, args.ops, args.cron_jobs, start, done))
+        for w in range(args.procs)
+    ]
+    for p in workers:
+        p.start()
+
+    t0 = time.perf_counter()
+    start.set()
+
+    killed = set()
+    if args.kill:
+        rng = random.Random(args.seed)
+        for w in rng.sample(range(args.procs), min(args.kill, args.procs)):
+            time.sleep(rng.uniform(0.01, 0.2))
+            if workers[w].is_alive():
+                os.kill(workers[w].pid, signal.SIGKILL)
+                killed.add(w)
+
+    results = {}
+    failed = []
+    for p in workers:
+        p.join()
+    elapsed = time.perf_counter() - t0
+    while not done.empty():
+        worker_id, written, jobs = done.get()
+        results[worker_id] = (written, jobs)
+    for w, p in enumerate(workers):
+        if w not in killed and w not in results:
+            failed.append(f"worker {w} exited with {p.exitcode}")
+
+    # Verify from a fresh process state
+    sys.path.insert(0, str(PLUGIN_ROOT))
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        corrupt = _check_files(claude_dir)
+        from core.memory import recall_namespace, memory_stats
+        from core.cron import list_jobs
+
+        lost_memory = 0
+        for w, (written, _) in results.items():
+            present = {e["key"] for e in recall_namespace(f"w{w}")}
+            lost_memory += len(set(written) - present)
+        job_ids = {j["id"] for j in list_jobs()}
+        lost_jobs = sum(len(set(jobs) - job_ids) for _, jobs in results.values())
+        stats = memory_stats()
+    finally:
+        os.chdir(cwd)
+
+    leftovers = [p.name for p in claude_dir.glob(".*.tmp")]
+    report = {
+        "backend": backend,
+        "concurrency": concurrency if backend == "json" else "-",
+        "procs": args.procs,
+        "killed": len(killed),
+        "writes": sum(len(w) + len(j) for w, j in results.values()),
+        "elapsed_s": round(elapsed, 3),
+        "writes_per_s": round(sum(len(w) + len(j) for w, j in results.values()) / elapsed, 1),
+        "lost_memory_writes": lost_memory,
+        "lost_cron_writes": lost_jobs,
+        "corrupt_files": corrupt,
+        "worker_failures": failed,
+        "temp_files_left": len(leftovers),
+        "total_entries": stats["total_entries"],
+    }
+    report["ok"] = not (lost_memory or lost_jobs or corrupt or failed)
+
+    if args.keep:
+        report["project"] = str(project)
+    else:
+        shutil.rmtree(project, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procs", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=100, help="memory writes per process")
+    parser.add_argument("--cron-jobs", type=int, default=10, help="cron jobs added per process")
+    parser.add_argument("--backend", choices=("json", "sqlite", "all"), default="all")
+    parser.add_argument("--concurrency", choices=("lock", "optimistic", "all"), default="all")
+    parser.add_argument("--kill", type=int, default=0, help="SIGKILL this many workers mid-run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the project directories")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    configs = []
+    for backend in (("json", "sqlite") if args.backend == "all" else (args.backend,)):
+        if backend == "sqlite":
+            configs.append((backend, "lock"))
+            continue
+        for mode in (("lock", "optimistic") if args.concurrency == "all" else (args.concurrency,)):
+            configs.append((backend, mode))
+
+    reports = [run_config(backend, mode, args) for backend, mode in configs]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for r in reports:
+            status = "ok" if r["ok"] else "FAIL"
+            print(f"{r['backend']:<7}{r['concurrency']:<11} {status:<5}"
+                  f"{r['writes']:>6} writes in {r['elapsed_s']:.2f}s "
+                  f"({r['writes_per_s']:.0f}/s)  lost={r['lost_memory_writes']}+{r['lost_cron_writes']}"
+                  f"  killed={r['killed']}  corrupt={len(r['corrupt_files'])}"
+                  f"  tmp_left={r['temp_files_left']}")
+            for problem in r["corrupt_files"] + r["worker_failures"]:
+                print(f"    {problem}")
+
+    sys.exit(0 if all(r["ok"] for r in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()
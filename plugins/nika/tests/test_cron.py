@@ -0,0 +1,246 @@
+"""Tests for cron scheduling, leases and change triggers (core/cron.py)."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import cron
+from core.paths import clear_root_cache
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / ".claude").mkdir()
+    monkeypatch.chdir(tmp_path)
+    clear_root_cache()
+    yield tmp_path
+    clear_root_cache()
+
+
+def _make_due(job_id, ago=1):
+    with cron._cron_lock():
+        data = cron._load_cron()
+        for job in data["jobs"]:
+            if job["id"] == job_id:
+                job["next_run"] = time.time() - ago
+        cron._save_cron(data)
+
+
+def _expire_lease(job_id):
+    with cron._cron_lock():
+        data = cron._load_cron()
+        for job in data["jobs"]:
+            if job["id"] == job_id:
+                job["lease"]["expires"] = time.time() - 1
+        cron._save_cron(data)
+
+
+def _job(job_id):
+    return next(job for job in cron.list_jobs() if job["id"] == job_id)
+
+
+def _outcomes(job_id):
+    [stats] = cron.run_stats(job_id)
+    return stats["outcomes"]
+
+
+def test_unchanged_check_advances_memory_position(project):
+    from core.memory import remember
+
+    job = cron.add_job("docs", "@hourly", "refresh the docs index", on_memory_change=[{"tag": "docs"}])
+    remember("project", "unrelated", "not about docs", tags=["misc"])
+    head = cron._memory_log().head()
+    assert cron._load_snapshots()["jobs"][job["id"]]["memory_seq"] < head
+
+    _make_due(job["id"])
+    report = {}
+    assert cron.check_due_jobs(holder="test", report=report) == []
+    assert report["unchanged"] == 1
+    # The next check reads the log from here, not from the job's last run
+    assert cron._load_snapshots()["jobs"][job["id"]]["memory_seq"] == head
+
+    remember("project", "guide", "how to build the docs", tags=["docs"])
+    _make_due(job["id"])
+    [claimed] = cron.check_due_jobs(holder="test")
+    assert claimed["changed"] == ["memory project/guide"]
+
+
+# ── Leases ──
+
+def test_live_lease_blocks_another_claim(project):
+    job = cron.add_job("report", "@hourly", "write the report")
+    _make_due(job["id"])
+    [claimed] = cron.check_due_jobs(holder="a")
+    assert claimed["lease"]["holder"] == "a"
+    assert claimed["lease"]["expires"] == pytest.approx(time.time() + cron.CRON_LEASE_SECONDS, abs=5)
+
+    # Due again, but the first run has not ended
+    _make_due(job["id"])
+    assert cron.check_due_jobs(holder="b") == []
+
+    assert cron.complete_job(job["id"], holder="b") is False
+    assert cron.complete_job(job["id"], holder="a") is True
+    assert "lease" not in _job(job["id"])
+    assert _outcomes(job["id"]) == {"ok": 1}
+    assert [j["id"] for j in cron.check_due_jobs(holder="b")] == [job["id"]]
+
+
+def test_expired_lease_is_claimed_over(project):
+    job = cron.add_job("report", "@hourly", "write the report")
+    _make_due(job["id"])
+    cron.check_due_jobs(holder="a", lease_seconds=60)
+    _expire_lease(job["id"])
+    _make_due(job["id"])
+
+    [claimed] = cron.check_due_jobs(holder="b")
+    assert claimed["lease"]["holder"] == "b"
+    assert _outcomes(job["id"]) == {"expired": 1}
+
+    # The crashed holder finishing late changes nothing
+    assert cron.complete_job(job["id"], holder="a") is False
+    assert _job(job["id"])["lease"]["holder"] == "b"
+    assert cron.complete_job(job["id"], holder="b") is True
+    assert _outcomes(job["id"]) == {"expired": 1, "ok": 1}
+
+
+def test_failed_completion_retries(project):
+    job = cron.add_job("report", "@hourly", "write the report")
+    _make_due(job["id"])
+    cron.check_due_jobs(holder="a")
+    assert _job(job["id"])["next_run"] > time.time() + 3000
+
+    assert cron.complete_job(job["id"], holder="a", ok=False, retry_after=30,
+                             run={"outcome": "timeout"}) is True
+    assert _job(job["id"])["next_run"] == pytest.approx(time.time() + 30, abs=5)
+    assert _outcomes(job["id"]) == {"timeout": 1}
+    assert cron.complete_job(job["id"]) is False  # Nothing left to complete
+
+
+def test_release_leases_ends_one_holders_runs(project):
+    jobs = [cron.add_job(f"job {i}", "@hourly", f"do thing {i}") for i in range(3)]
+    for job in jobs:
+        _make_due(job["id"])
+    held = [j["id"] for j in cron.check_due_jobs(holder="a", limit=2)]
+    [other] = cron.check_due_jobs(holder="b")
+
+    assert cron.release_leases("nobody") == 0
+    assert cron.release_leases("a") == 2
+    for job_id in held:
+        assert "lease" not in _job(job_id)
+        assert _outcomes(job_id) == {"ok": 1}
+    assert _job(other["id"])["lease"]["holder"] == "b"
+
+
+# ── Tag limits ──
+
+def test_tag_limit_holds_back_jobs(project):
+    assert cron.set_tag_limit("heavy", 1) == {"heavy": 1}
+    assert cron.tag_limits() == {"heavy": 1}
+    first = cron.add_job("first", "@hourly", "heavy work", tags=["heavy"])
+    second = cron.add_job("second", "@hourly", "more heavy work", tags=["heavy", "nightly"])
+    light = cron.add_job("light", "@hourly", "light work")
+    _make_due(first["id"], ago=30)
+    _make_due(second["id"], ago=20)
+    _make_due(light["id"], ago=10)
+
+    report = {}
+    claimed = cron.check_due_jobs(holder="a", limit=0, report=report)
+    assert [j["id"] for j in claimed] == [first["id"], light["id"]]
+    assert report["limited"] == 1
+
+    # Still held back while the first heavy job runs
+    assert cron.check_due_jobs(holder="a", report=report) == []
+    assert report["limited"] == 1
+
+    cron.complete_job(first["id"], holder="a")
+    assert [j["id"] for j in cron.check_due_jobs(holder="a")] == [second["id"]]
+
+    assert cron.set_tag_limit("heavy", None) == {}
+    with pytest.raises(ValueError):
+        cron.set_tag_limit("heavy", 0)
+
+
+# ── Misfires, jitter and the injection cap ──
+
+def _miss_four_runs(**options):
+    """A 10-minute job whose last four scheduled runs were all missed."""
+    job = cron.add_job("poll", {"every_minutes": 10}, "poll the queue", **options)
+    _make_due(job["id"], ago=35 * 60)
+    return job
+
+
+def test_misfire_fire_once_now_is_the_default(project):
+    job = _miss_four_runs()
+    assert job["misfire"] == "fire_once_now"
+    [claimed] = cron.check_due_jobs(holder="a")
+    assert claimed["missed"] == 4
+    assert claimed["runs"] == [pytest.approx(time.time() - 5 * 60, abs=5)]
+    assert _job(job["id"])["run_count"] == 1
+
+
+def test_misfire_skip_to_next(project):
+    job = _miss_four_runs(misfire="skip_to_next")
+    report = {}
+    assert cron.check_due_jobs(holder="a", report=report) == []
+    assert report["skipped"] == 1
+    assert _job(job["id"])["next_run"] == pytest.approx(time.time() + 10 * 60, abs=5)
+    assert "lease" not in _job(job["id"])
+
+    # A run that is due but not late still fires
+    _make_due(job["id"])
+    assert [j["id"] for j in cron.check_due_jobs(holder="a")] == [job["id"]]
+
+
+def test_misfire_fire_all_up_to_n(project):
+    job = _miss_four_runs(misfire="fire_all_up_to_3")
+    [claimed] = cron.check_due_jobs(holder="a")
+    assert claimed["missed"] == 4
+    assert claimed["runs"] == [pytest.approx(time.time() - minutes * 60, abs=5) for minutes in (25, 15, 5)]
+    assert _job(job["id"])["run_count"] == 3
+
+    for policy in ("fire_all_up_to_0", "fire_twice"):
+        with pytest.raises(ValueError, match="misfire"):
+            cron.add_job("poll", "@hourly", "poll the queue", misfire=policy)
+
+
+def test_jitter_is_a_fixed_offset_per_job(project):
+    jobs = [cron.add_job(f"sync {i}", "@hourly", "sync the mirror", jitter=600) for i in range(4)]
+    offsets = [cron._jitter_offset(job) for job in jobs]
+    assert all(0 <= offset < 600 for offset in offsets)
+    assert len(set(offsets)) == len(offsets)  # spread, not bunched
+    for job, offset in zip(jobs, offsets):
+        assert job["next_run"] == pytest.approx(job["created_at"] + 3600 + offset)
+
+    # Rescheduling after a claim keeps the same offset
+    _make_due(jobs[0]["id"])
+    [claimed] = cron.check_due_jobs(holder="a")
+    assert _job(claimed["id"])["next_run"] == pytest.approx(claimed["last_run"] + 3600 + offsets[0])
+
+    assert cron._jitter_offset(dict(jobs[0], jitter=0)) == 0
+    with pytest.raises(ValueError, match="jitter"):
+        cron.add_job("sync", "@hourly", "sync the mirror", jitter=-1)
+
+
+def test_max_inject_caps_claims_and_queues_the_rest(project, monkeypatch):
+    monkeypatch.setattr(cron, "CRON_MAX_INJECT", 2)
+    jobs = [cron.add_job(f"job {i}", "@hourly", f"do thing {i}") for i in range(5)]
+    for ago, job in enumerate(jobs, 1):
+        _make_due(job["id"], ago=ago * 10)
+
+    report = {}
+    claimed = cron.check_due_jobs(holder="a", report=report)
+    # Longest overdue first
+    assert [j["id"] for j in claimed] == [jobs[4]["id"], jobs[3]["id"]]
+    assert report["queued"] == 3
+
+    claimed = cron.check_due_jobs(holder="a", report=report)
+    assert [j["id"] for j in claimed] == [jobs[2]["id"], jobs[1]["id"]]
+    assert report["queued"] == 1
+
+    # limit=0 lifts the cap
+    assert [j["id"] for j in cron.check_due_jobs(holder="a", limit=0, report=report)] == [jobs[0]["id"]]
+    assert report["queued"] == 0
@@ -0,0 +1,74 @@
+"""Tests for the headless cron daemon (core/crondaemon.py)."""
+
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import cron, crondaemon
+from core.paths import clear_root_cache
+
+FAIL = f"{sys.executable} -c 'import sys; sys.exit(3)'"
+SUCCEED = f"{sys.executable} -c 'pass'"
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / ".claude").mkdir()
+    monkeypatch.chdir(tmp_path)
+    clear_root_cache()
+    handler = signal.getsignal(signal.SIGTERM)  # run_daemon() installs its own
+    yield tmp_path
+    signal.signal(signal.SIGTERM, handler)
+    clear_root_cache()
+
+
+def _make_due(job_id):
+    with cron._cron_lock():
+        data = cron._load_cron()
+        for job in data["jobs"]:
+            if job["id"] == job_id:
+                job["next_run"] = time.time() - 1
+        cron._save_cron(data)
+
+
+def _job(job_id):
+    return next(job for job in cron.list_jobs() if job["id"] == job_id)
+
+
+def test_failed_triggered_run_is_retried(project):
+    (project / "notes.txt").write_text("v1")
+    job = cron.add_job("notes", "@hourly", "summarize the notes", on_file_change=["notes.txt"])
+    (project / "notes.txt").write_text("v2, changed")
+    _make_due(job["id"])
+
+    assert crondaemon.run_daemon(FAIL, workers=1, once=True) == 1
+    [stats] = cron.run_stats(job["id"])
+    assert stats["outcomes"] == {"failed": 1}
+    assert "lease" not in _job(job["id"])
+    assert _job(job["id"])["next_run"] <= time.time() + crondaemon.DAEMON_RETRY_DELAY
+
+    # Nothing changed since, but the failed run's inputs were forgotten
+    _make_due(job["id"])
+    assert crondaemon.run_daemon(SUCCEED, workers=1, once=True) == 1
+    [stats] = cron.run_stats(job["id"])
+    assert stats["outcomes"] == {"failed": 1, "ok": 1}
+    assert _job(job["id"])["next_run"] > time.time() + 3000
+
+    # After a successful run, an unchanged input does not fire it
+    _make_due(job["id"])
+    assert crondaemon.run_daemon(SUCCEED, workers=1, once=True) == 0
+
+
+def test_retry_waits_for_the_delay(project):
+    job = cron.add_job("broken", "@hourly", "run the broken thing")
+    _make_due(job["id"])
+
+    start = time.time()
+    assert crondaemon.run_daemon(FAIL, workers=1, once=True) == 1
+    next_run = _job(job["id"])["next_run"]
+    assert start + crondaemon.DAEMON_RETRY_DELAY <= next_run <= time.time() + crondaemon.DAEMON_RETRY_DELAY
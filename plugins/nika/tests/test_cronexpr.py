@@ -0,0 +1,130 @@
+"""Tests for cron expressions (core/cronexpr.py)."""
+
+import bisect
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cronexpr import compile_expr
+
+zoneinfo = pytest.importorskip("zoneinfo")
+
+
+def _dow(d):
+    return (d.weekday() + 1) % 7  # cron counts from Sunday
+
+
+# Each expression with an independent predicate on the wall time
+EXPRESSIONS = [
+    ("* * * * *", lambda d: True),
+    ("*/15 * * * *", lambda d: d.minute % 15 == 0),
+    ("5/10 * * * *", lambda d: d.minute % 10 == 5),
+    ("@hourly", lambda d: d.minute == 0),
+    ("30 2 * * *", lambda d: (d.hour, d.minute) == (2, 30)),
+    ("10-50/20 1-3 * * *", lambda d: d.minute in (10, 30, 50) and 1 <= d.hour <= 3),
+    ("0,45 0-3 * * *", lambda d: d.minute in (0, 45) and d.hour <= 3),
+    ("0 9 * * mon-fri", lambda d: (d.hour, d.minute) == (9, 0) and _dow(d) in range(1, 6)),
+    ("0 12 13 * fri", lambda d: (d.hour, d.minute) == (12, 0) and (d.day == 13 or _dow(d) == 5)),
+    ("15 3 * * 7", lambda d: (d.hour, d.minute) == (3, 15) and _dow(d) == 0),
+    ("0 0 1,15 * *", lambda d: (d.hour, d.minute) == (0, 0) and d.day in (1, 15)),
+    ("45 23 * mar,apr,oct sun", lambda d: (d.hour, d.minute) == (23, 45) and d.month in (3, 4, 10)
+     and _dow(d) == 0),
+    ("0 */6 * * sat,sun", lambda d: d.minute == 0 and d.hour % 6 == 0 and _dow(d) in (0, 6)),
+]
+
+# Three local days around each DST change of 2026 (any days where there is none)
+WINDOWS = {
+    "UTC": [(2026, 3, 28)],
+    "Asia/Kolkata": [(2026, 2, 27)],
+    "Europe/Paris": [(2026, 3, 28), (2026, 10, 24)],
+    "America/New_York": [(2026, 3, 7), (2026, 10, 31)],
+    "Australia/Lord_Howe": [(2026, 4, 4), (2026, 10, 3)],  # half-hour shifts
+}
+
+
+def _wall_times(tz, start, end):
+    """(instant, [wall times firing then]) for every minute in [start, end).
+
+    A wall time fires at its first occurrence; one skipped by a DST gap
+    fires at the instant it names under the offset before the gap.
+    """
+    before = timedelta(seconds=datetime.fromtimestamp(start, tz).utcoffset().total_seconds())
+    minutes = []
+    for instant in range(int(start), int(end), 60):
+        local = datetime.fromtimestamp(instant, tz)
+        walls = [local.replace(tzinfo=None)] if local.fold == 0 else []
+        skipped = datetime.fromtimestamp(instant, timezone.utc).replace(tzinfo=None) + before
+        back = datetime.fromtimestamp(skipped.replace(tzinfo=tz).timestamp(), tz)
+        if back.replace(tzinfo=None) != skipped:  # does not exist on this day
+            walls.append(skipped)
+        minutes.append((instant, walls))
+    return minutes
+
+
+def _cases():
+    for tz_name, days in WINDOWS.items():
+        for day in days:
+            yield tz_name, day
+
+
+@pytest.mark.parametrize("tz_name, day", list(_cases()))
+def test_matches_minute_by_minute_reference(tz_name, day):
+    tz = zoneinfo.ZoneInfo(tz_name)
+    start = datetime(*day, tzinfo=tz).timestamp()
+    end = start + 3 * 86400
+    minutes = _wall_times(tz, start, end)
+
+    for expression, matches in EXPRESSIONS:
+        expr = compile_expr(expression, tz=tz_name)
+        fires = [instant for instant, walls in minutes if any(matches(w) for w in walls)]
+
+        # Stepping from fire to fire visits exactly the reference times
+        found, ts = [], start - 1
+        while True:
+            ts = expr.next_after(ts)
+            if ts >= end:
+                break
+            found.append(ts)
+        assert found == fires, expression
+
+        # So does asking from any time in between
+        for ts in range(int(start), int(end) - 60, 419):
+            i = bisect.bisect_right(fires, ts)
+            if i < len(fires):
+                assert expr.next_after(ts) == fires[i], (expression, ts)
+            else:
+                assert expr.next_after(ts) >= end, (expression, ts)
+
+
+def _utc(*fields):
+    return datetime(*fields, tzinfo=timezone.utc).timestamp()
+
+
+def test_paris_spring_gap_fires_after_it():
+    expr = compile_expr("CRON_TZ=Europe/Paris 30 2 * * *")
+    # 02:30 does not exist on 29 March: it fires at 03:30 CEST (01:30 UTC)
+    assert expr.next_after(_utc(2026, 3, 28, 23, 0)) == _utc(2026, 3, 29, 1, 30)
+    # ...even when asked from inside the shifted hour (03:10 CEST)
+    assert expr.next_after(_utc(2026, 3, 29, 1, 10)) == _utc(2026, 3, 29, 1, 30)
+    assert expr.next_after(_utc(2026, 3, 29, 1, 30)) == _utc(2026, 3, 30, 0, 30)
+
+    hourly = compile_expr("0 * * * *", tz="Europe/Paris")
+    # The skipped 02:00 and the real 03:00 are one instant: it fires once
+    assert hourly.next_after(_utc(2026, 3, 29, 0, 0)) == _utc(2026, 3, 29, 1, 0)
+    assert hourly.next_after(_utc(2026, 3, 29, 1, 0)) == _utc(2026, 3, 29, 2, 0)
+
+
+def test_paris_fall_overlap_fires_once():
+    expr = compile_expr("30 2 * * *", tz="Europe/Paris")
+    # 02:30 happens twice on 25 October: only the first (CEST, 00:30 UTC) fires
+    assert expr.next_after(_utc(2026, 10, 25, 0, 0)) == _utc(2026, 10, 25, 0, 30)
+    assert expr.next_after(_utc(2026, 10, 25, 0, 30)) == _utc(2026, 10, 26, 1, 30)
+    # Asked during the repeated hour (02:10 CET), the next one is tomorrow
+    assert expr.next_after(_utc(2026, 10, 25, 1, 10)) == _utc(2026, 10, 26, 1, 30)
+
+    hourly = compile_expr("0 * * * *", tz="Europe/Paris")
+    assert hourly.next_after(_utc(2026, 10, 25, 0, 0)) == _utc(2026, 10, 25, 2, 0)
@@ -0,0 +1,48 @@
+"""Tests for the state-file helpers (core/fsutil.py)."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.fsutil import LockTimeout, atomic_write_json, file_lock, read_json
+
+
+def test_corrupt_file_is_quarantined_not_overwritten(tmp_path, capsys):
+    path = tmp_path / "state.json"
+    path.write_text('{"jobs": [', encoding="utf-8")
+
+    assert read_json(path, {"jobs": []}) == {"jobs": []}
+    assert not path.exists()
+    [quarantine] = tmp_path.glob("state.json.corrupt-*")
+    assert quarantine.read_text(encoding="utf-8") == '{"jobs": ['
+    assert int(quarantine.name.rsplit("-", 1)[1]) <= time.time()
+    assert "moved to" in capsys.readouterr().err
+
+    # The next write starts a fresh file and leaves the quarantined copy alone
+    atomic_write_json(path, {"jobs": [1]})
+    assert read_json(path, None) == {"jobs": [1]}
+    assert quarantine.read_text(encoding="utf-8") == '{"jobs": ['
+
+
+def test_missing_file_returns_the_default(tmp_path):
+    assert read_json(tmp_path / "absent.json", {"a": 1}) == {"a": 1}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_lock_times_out(tmp_path):
+    path = tmp_path / "state.json"
+    with file_lock(path):
+        start = time.monotonic()
+        with pytest.raises(LockTimeout, match="Timed out after 0.05s"):
+            with file_lock(path, timeout=0.05):
+                pass
+        assert time.monotonic() - start >= 0.05
+        assert issubclass(LockTimeout, TimeoutError)
+
+    # Released on exit, so the next caller gets it at once
+    with file_lock(path, timeout=0):
+        pass
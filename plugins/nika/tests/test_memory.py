@@ -0,0 +1,59 @@
+"""Tests for the memory engine's write path (core/memory.py)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import memory
+from core.fsutil import atomic_write_json, read_json
+from core.paths import clear_root_cache
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / ".claude").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("NIKA_MEMORY_BACKEND", "json")
+    monkeypatch.setenv("NIKA_MEMORY_CONCURRENCY", "optimistic")
+    clear_root_cache()
+    yield tmp_path
+    clear_root_cache()
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """The concurrency argument of every store _mutate() opens."""
+    calls = []
+    open_backend = memory.open_backend
+
+    def recording(*args):
+        calls.append(args[3])
+        return open_backend(*args)
+
+    monkeypatch.setattr(memory, "open_backend", recording)
+    return calls
+
+
+def _racing_change(entry_id, value):
+    """A change that loses the race to another writer until it holds the lock."""
+    def change(store):
+        entry = store.get(entry_id)
+        if store.concurrency == "optimistic":
+            # Another process replaces the file mid-transaction
+            atomic_write_json(store.path, read_json(store.path, None))
+        store.put(dict(entry, value=value))
+        return value
+    return change
+
+
+def test_conflicts_are_retried_and_the_last_attempt_locks(project, opened):
+    entry = memory.remember("project", "stack", "v1")
+    opened.clear()
+
+    assert memory._mutate(_racing_change(entry["id"], "v2")) == "v2"
+    assert opened == [None] * (memory.WRITE_ATTEMPTS - 1) + ["lock"]
+    assert memory.recall("project", "stack")["value"] == "v2"
+
@@ -0,0 +1,159 @@
+"""Tests for the memory storage backends (core/storage.py)."""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.storage import (
+    SCHEMA_VERSION, JsonBackend, SqliteBackend, entry_size, migrate_json_to_sqlite,
+)
+from core.tagquery import parse
+
+# The entries/entry_tags/meta tables as the first SQLite release wrote them
+V1_SCHEMA = """
+CREATE TABLE entries (
+    id            TEXT PRIMARY KEY,
+    namespace     TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    value         TEXT NOT NULL,
+    tags          TEXT NOT NULL DEFAULT '[]',
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    expires_at    REAL,
+    access_count  INTEGER NOT NULL DEFAULT 0,
+    last_accessed REAL,
+    extra         TEXT
+);
+CREATE TABLE entry_tags (
+    tag TEXT NOT NULL,
+    id  TEXT NOT NULL,
+    PRIMARY KEY (tag, id)
+) WITHOUT ROWID;
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+PRAGMA user_version=1;
+"""
+
+
+def _entry(namespace, key, value, tags=(), **fields):
+    now = time.time()
+    entry = {
+        "id": f"{namespace}:{key}",
+        "namespace": namespace,
+        "key": key,
+        "value": value,
+        "tags": list(tags),
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": None,
+        "access_count": 0,
+    }
+    entry.update(fields)
+    return entry
+
+
+ENTRIES = [
+    _entry("project", "stack", "python and sqlite", ["python", "db"]),
+    _entry("project", "style", {"indent": 4}, ["python"], source="review"),
+    _entry("notes", "todo", ["write tests"], ["chore"], expires_at=time.time() + 3600),
+]
+
+
+def _open(kind, tmp_path):
+    if kind == "json":
+        return JsonBackend(tmp_path / "memory.json", tmp_path / "memory.index.json")
+    return SqliteBackend(tmp_path / "memory.db")
+
+
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_round_trip(kind, tmp_path):
+    backend = _open(kind, tmp_path)
+    with backend.transaction():
+        for entry in ENTRIES:
+            backend.put(entry)
+        backend.set_meta("last_session", "abc")
+    backend.close()
+
+    backend = _open(kind, tmp_path)
+    try:
+        assert {e["id"]: e for e in backend.entries()} == {e["id"]: e for e in ENTRIES}
+        assert backend.get("project:style")["source"] == "review"
+        assert {e["key"] for e in backend.tag_entries("python")} == {"stack", "style"}
+        assert [e["key"] for e in backend.query(parse("python -db"))] == ["style"]
+        assert backend.get_meta()["last_session"] == "abc"
+        assert backend.usage()["project"] == {
+            "entries": 2, "bytes": entry_size(ENTRIES[0]) + entry_size(ENTRIES[1])}
+        assert [e["key"] for e in backend.search(["sqlite"])] == ["stack"]
+
+        with backend.transaction():
+            assert backend.delete("project:stack")["key"] == "stack"
+        assert backend.get("project:stack") is None
+        assert backend.namespace_counts() == {"project": 1, "notes": 1}
+    finally:
+        backend.close()
+
+
+def test_v1_database_is_upgraded_on_open(tmp_path):
+    db_path = tmp_path / "memory.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(V1_SCHEMA)
+    for entry in ENTRIES:
+        conn.execute(
+            "INSERT INTO entries (id, namespace, key, value, tags, created_at, updated_at, "
+            "expires_at, access_count, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry["id"], entry["namespace"], entry["key"], json.dumps(entry["value"]),
+             json.dumps(entry["tags"]), entry["created_at"], entry["updated_at"],
+             entry["expires_at"], 0,
+             json.dumps({"source": entry["source"]}) if "source" in entry else None))
+        conn.executemany("INSERT INTO entry_tags (tag, id) VALUES (?, ?)",
+                         [(tag, entry["id"]) for tag in entry["tags"]])
+    conn.commit()
+    conn.close()
+
+    backend = SqliteBackend(db_path)
+    try:
+        assert backend.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION == 4
+        assert {e["id"]: e for e in backend.entries()} == {e["id"]: e for e in ENTRIES}
+        # v3: existing text is searchable; v4: sizes and usage are filled in
+        assert [e["key"] for e in backend.search(["sqlite"])] == ["stack"]
+        assert backend.usage() == {
+            "project": {"entries": 2, "bytes": entry_size(ENTRIES[0]) + entry_size(ENTRIES[1])},
+            "notes": {"entries": 1, "bytes": entry_size(ENTRIES[2])},
+        }
+    finally:
+        backend.close()
+
+
+def test_migration_retires_the_json_files(tmp_path):
+    store_path = tmp_path / "memory.json"
+    index_path = tmp_path / "memory.index.json"
+    source = JsonBackend(store_path, index_path)
+    with source.transaction():
+        for entry in ENTRIES:
+            source.put(entry)
+        source.set_meta("last_session", "abc")
+    assert source.search_path.exists()
+
+    assert migrate_json_to_sqlite(store_path, index_path, tmp_path / "memory.db") == {
+        "migrated": 3, "database": str(tmp_path / "memory.db")}
+    assert sorted(p.name for p in tmp_path.iterdir() if p.suffix == ".migrated") == [
+        "memory.index.json.migrated", "memory.json.migrated", "memory.search.json.migrated"]
+    assert not store_path.exists() and not index_path.exists()
+
+    target = SqliteBackend(tmp_path / "memory.db")
+    try:
+        assert {e["id"]: e for e in target.entries()} == {e["id"]: e for e in ENTRIES}
+        assert target.get_meta()["last_session"] == "abc"
+    finally:
+        target.close()
+
+    # Nothing left to migrate
+    assert migrate_json_to_sqlite(store_path, index_path, tmp_path / "memory.db")["migrated"] == 0
@@ -0,0 +1,40 @@
+"""Tests for the tag query language (core/tagquery.py)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tagquery import QuerySyntaxError, evaluate, parse
+
+
+def test_keywords_and_shorthand():
+    assert parse("python AND (api OR cli) AND NOT deprecated") == parse("python (api | cli) -deprecated")
+    assert parse("a or B") == ("or", [("tag", "a"), ("tag", "B")])
+
+
+def test_quoted_keywords_are_tags():
+    assert parse('"and"') == ("tag", "and")
+    assert parse("'not' AND x") == ("and", [("tag", "not"), ("tag", "x")])
+    assert parse('-"or"') == ("not", ("tag", "or"))
+    assert parse('"OR" or "and"') == ("or", [("tag", "OR"), ("tag", "and")])
+
+
+def test_quoted_tags_keep_spaces_and_escapes():
+    assert parse("'c++ (old)'") == ("tag", "c++ (old)")
+    assert parse(r'"say \"hi\""') == ("tag", 'say "hi"')
+    assert parse(r"'it\'s'") == ("tag", "it's")
+
+
+def test_unterminated_quote():
+    with pytest.raises(QuerySyntaxError, match="Unterminated quote"):
+        parse('x AND "and')
+
+
+def test_evaluate_quoted():
+    postings = {"and": {1, 2}, "or": {2, 3}}
+    everything = {1, 2, 3, 4}
+    result = evaluate(parse('"and" -"or"'), lambda tag: postings.get(tag, set()), lambda: everything)
+    assert result == {1}
@@ -0,0 +1,746 @@
+#!/usr/bin/env python3
+"""Hook benchmark harness.
+
+Replays hook event streams against the command hooks declared in one or
+more plugins' hooks/hooks.json, speaking the same stdin/stdout JSON
+protocol Claude Code uses and enforcing each hook's configured timeout.
+
+Reports per hook:
+  - cold latency (fresh bytecode cache, first-run cost)
+  - warm latency distribution (p50/p90/p99/max)
+  - peak RSS of the hook process
+  - timeouts and protocol violations
+and overall throughput when many sessions run concurrently.
+
+With --startup it instead measures the zero-work fast path: each hook
+runs in an empty project under `python -X importtime`, and the report
+gives wall time and import cost over a bare interpreter start.
+
+Results can be saved as a baseline and compared on later runs; the
+script exits 1 when a hook regresses past the allowed tolerance.
+
+Replay baselines hold absolute latencies, so they only mean something on
+the machine that recorded them and are not committed. Startup baselines
+are relative: each run times a bare interpreter first and gates on each
+hook's overhead over it, scaled by how fast that interpreter started
+compared with the baseline's. startup-baseline.json, next to this
+script, is the committed one for the bundled Python hooks.
+
+Usage:
+  benchmark-hooks.py [options] <plugin-dir> [<plugin-dir> ...]
+
+Examples:
+  benchmark-hooks.py plugins/hookify plugins/nika plugins/security-guidance
+  benchmark-hooks.py --sessions 16 --concurrency 8 plugins/*
+  benchmark-hooks.py --stream recorded.jsonl plugins/hookify
+  benchmark-hooks.py --save-baseline hooks-baseline.json plugins/*
+  benchmark-hooks.py --baseline hooks-baseline.json plugins/*
+  benchmark-hooks.py --startup --baseline startup-baseline.json \
+      plugins/hookify plugins/nika plugins/security-guidance
+"""
+
+import argparse
+import compileall
+import json
+import os
+import random
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Claude Code's timeout when a hook does not declare one (seconds)
+DEFAULT_TIMEOUT = 60
+
+# Events that carry a tool_name and therefore honour "matcher"
+TOOL_EVENTS = {"PreToolUse", "PostToolUse"}
+
+# macOS reports ru_maxrss in bytes, Linux in kilobytes
+RSS_DIVISOR = 1024 if sys.platform == "darwin" else 1
+
+
+@dataclass
+class HookSpec:
+    """A single command hook declared in a plugin's hooks.json."""
+    plugin: str
+    plugin_root: str
+    event: str
+    matcher: Optional[str]
+    argv: List[str]
+    timeout: float
+
+    @property
+    def hook_id(self) -> str:
+        script = next((Path(a).name for a in self.argv if a.endswith(".py")), self.argv[-1])
+        return f"{self.plugin}:{self.event}:{script}"
+
+    def matches(self, tool_name: str) -> bool:
+        """Apply the hooks.json matcher the way Claude Code does."""
+        if self.event not in TOOL_EVENTS or not self.matcher or self.matcher == "*":
+            return True
+        try:
+            return re.fullmatch(self.matcher, tool_name) is not None
+        except re.error:
+            return self.matcher == tool_name
+
+
+@dataclass
+class RunResult:
+    """Outcome of one hook invocation."""
+    hook_id: str
+    latency_ms: float
+    rss_kb: int
+    exit_code: int
+    timed_out: bool = False
+    protocol_error: Optional[str] = None
+
+
+@dataclass
+class HookStats:
+    """Aggregated measurements for one hook."""
+    cold: List[float] = field(default_factory=list)
+    warm: List[float] = field(default_factory=list)
+    rss_kb: List[int] = field(default_factory=list)
+    exit_codes: Dict[int, int] = field(default_factory=dict)
+    timeouts: int = 0
+    protocol_errors: List[str] = field(default_factory=list)
+
+
+# ── Discovery ─────────────────────────────────────────────────
+
+def plugin_name(plugin_root: Path) -> str:
+    manifest = plugin_root / ".claude-plugin" / "plugin.json"
+    try:
+        return json.loads(manifest.read_text(encoding="utf-8")).get("name") or plugin_root.name
+    except (OSError, json.JSONDecodeError):
+        return plugin_root.name
+
+
+def discover_hooks(plugin_dirs: Iterable[str], python_only: bool = True) -> List[HookSpec]:
+    """Collect command hooks from each plugin's hooks/hooks.json."""
+    specs = []
+    for plugin_dir in plugin_dirs:
+        root = Path(plugin_dir).resolve()
+        hooks_json = root / "hooks" / "hooks.json"
+        if not hooks_json.is_file():
+            continue
+
+        config = json.loads(hooks_json.read_text(encoding="utf-8"))
+        name = plugin_name(root)
+
+        for event, groups in config.get("hooks", {}).items():
+            for group in groups:
+                for hook in group.get("hooks", []):
+                    if hook.get("type") != "command":
+                        continue
+                    command = hook["command"].replace("${CLAUDE_PLUGIN_ROOT}", str(root))
+                    argv = shlex.split(command)
+                    if python_only and not any(arg.endswith(".py") for arg in argv):
+                        continue
+                    specs.append(HookSpec(
+                        plugin=name,
+                        plugin_root=str(root),
+                        event=event,
+                        matcher=group.get("matcher"),
+                        argv=argv,
+                        timeout=float(hook.get("timeout", DEFAULT_TIMEOUT)),
+                    ))
+    return specs
+
+
+# ── Event streams ─────────────────────────────────────────────
+
+BASH_COMMANDS = [
+    "ls -la", "git status", "npm test", "rm -rf build/", "python -m pytest -q",
+    "cat package.json", "grep -rn TODO src/",
+]
+
+FILE_EDITS = [
+    ("src/app.ts", "export function greet(name: string) {\n  return `hi ${name}`;\n}\n"),
+    ("src/debug.js", "console.log('state', state);\n"),
+    ("src/render.tsx", "el.innerHTML = userInput;\n"),
+    (".github/workflows/ci.yml", "on: push\njobs:\n  test:\n    runs-on: ubuntu-latest\n"),
+    ("scripts/run.py", "import os\nos.system('make')\n"),
+    ("README.md", "# Project\n\nSome docs.\n"),
+]
+
+PROMPTS = [
+    "Fix the failing test in the parser",
+    "Refactor the auth module and add logging",
+    "Why is the build slow?",
+]
+
+
+def synthetic_session(session_id: str, project_dir: str, tool_calls: int, rng: random.Random) -> List[dict]:
+    """Build a plausible session: start, prompts, tool use pairs, stop."""
+    base = {
+        "session_id": session_id,
+        "transcript_path": os.path.join(project_dir, ".claude", f"{session_id}.jsonl"),
+        "cwd": project_dir,
+        "permission_mode": "default",
+    }
+    events = [dict(base, hook_event_name="SessionStart", source="startup")]
+
+    for i in range(tool_calls):
+        if i % 4 == 0:
+            events.append(dict(base, hook_event_name="UserPromptSubmit",
+                               prompt=rng.choice(PROMPTS), user_prompt=rng.choice(PROMPTS)))
+
+        kind = rng.random()
+        if kind < 0.4:
+            tool_name, tool_input = "Bash", {"command": rng.choice(BASH_COMMANDS)}
+        elif kind < 0.7:
+            path, content = rng.choice(FILE_EDITS)
+            tool_name = "Write"
+            tool_input = {"file_path": os.path.join(project_dir, path), "content": content}
+        elif kind < 0.9:
+            path, content = rng.choice(FILE_EDITS)
+            tool_name = "Edit"
+            tool_input = {"file_path": os.path.join(project_dir, path),
+                          "old_string": "", "new_string": content}
+        else:
+            tool_name, tool_input = "Read", {"file_path": os.path.join(project_dir, "README.md")}
+
+        events.append(dict(base, hook_event_name="PreToolUse", tool_name=tool_name, tool_input=tool_input))
+        events.append(dict(base, hook_event_name="PostToolUse", tool_name=tool_name, tool_input=tool_input,
+                           tool_response={"success": True}))
+
+    events.append(dict(base, hook_event_name="Stop", stop_hook_active=False, reason="Task appears complete"))
+    return events
+
+
+def load_stream(path: str) -> List[List[dict]]:
+    """Load a recorded JSONL stream and split it into sessions."""
+    sessions: Dict[str, List[dict]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise SystemExit(f"Error: {path}:{line_no}: invalid JSON: {e}")
+            if "hook_event_name" not in event:
+                raise SystemExit(f"Error: {path}:{line_no}: missing hook_event_name")
+            sessions.setdefault(event.get("session_id", "recorded"), []).append(event)
+    return list(sessions.values())
+
+
+# ── Execution ─────────────────────────────────────────────────
+
+def make_fixture(with_rules: bool, rules_dirs: Iterable[str]) -> Path:
+    """Create a throwaway project (and HOME) for hooks to operate in."""
+    fixture = Path(tempfile.mkdtemp(prefix="hook-bench-"))
+    (fixture / "project" / ".claude").mkdir(parents=True)
+    (fixture / "home" / ".claude").mkdir(parents=True)
+    (fixture / "pycache-warm").mkdir()
+
+    if with_rules:
+        for rules_dir in rules_dirs:
+            for rule in Path(rules_dir).glob("*.local.md"):
+                shutil.copy(rule, fixture / "project" / ".claude" / f"hookify.{rule.name}")
+    return fixture
+
+
+def child_environ() -> dict:
+    """The caller's environment, minus what would skew measurements:
+    PYTHONDONTWRITEBYTECODE would keep the pycache prefix empty, so every
+    "warm" run would recompile the stdlib."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def hook_env(spec: HookSpec, fixture: Path, pycache: Path) -> dict:
+    env = child_environ()
+    env.update({
+        "CLAUDE_PLUGIN_ROOT": spec.plugin_root,
+        "CLAUDE_PROJECT_DIR": str(fixture / "project"),
+        "HOME": str(fixture / "home"),
+        "PYTHONPYCACHEPREFIX": str(pycache),
+    })
+    return env
+
+
+def check_protocol(exit_code: int, stdout: bytes) -> Optional[str]:
+    """Validate hook output against the command-hook protocol."""
+    if exit_code not in (0, 2):
+        return f"unexpected exit code {exit_code}"
+    if exit_code == 0 and stdout.strip():
+        try:
+            payload = json.loads(stdout)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return "stdout is not valid JSON"
+        if not isinstance(payload, dict):
+            return "stdout JSON is not an object"
+    return None
+
+
+def run_hook(spec: HookSpec, event: dict, fixture: Path, pycache: Path) -> RunResult:
+    """Invoke a hook once with the event on stdin, enforcing its timeout."""
+    payload = json.dumps(event).encode()
+    env = hook_env(spec, fixture, pycache)
+    output = {}
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(spec.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, env=env, cwd=str(fixture / "project"))
+
+    def pump(name, stream):
+        output[name] = stream.read()
+        stream.close()
+
+    readers = [threading.Thread(target=pump, args=("stdout", proc.stdout)),
+               threading.Thread(target=pump, args=("stderr", proc.stderr))]
+    for reader in readers:
+        reader.start()
+    try:
+        proc.stdin.write(payload)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+
+    expired = threading.Event()
+
+    def kill():
+        expired.set()
+        proc.kill()
+
+    timer = threading.Timer(spec.timeout, kill)
+    timer.start()
+    # wait4 rather than wait() so we get this child's own rusage
+    _, status, usage = os.wait4(proc.pid, 0)
+    latency_ms = (time.perf_counter() - start) * 1000
+    timer.cancel()
+    timed_out = expired.is_set()
+
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    for reader in readers:
+        reader.join()
+
+    error = None if timed_out else check_protocol(proc.returncode, output.get("stdout", b""))
+    return RunResult(
+        hook_id=spec.hook_id,
+        latency_ms=latency_ms,
+        rss_kb=usage.ru_maxrss // RSS_DIVISOR,
+        exit_code=proc.returncode,
+        timed_out=timed_out,
+        protocol_error=error,
+    )
+
+
+def hooks_for_event(specs: List[HookSpec], event: dict) -> List[HookSpec]:
+    name = event.get("hook_event_name")
+    tool_name = event.get("tool_name", "")
+    return [s for s in specs if s.event == name and s.matches(tool_name)]
+
+
+def representative_event(spec: HookSpec, project_dir: str) -> dict:
+    """A single event that reaches the given hook, for cold-start runs."""
+    rng = random.Random(0)
+    for event in synthetic_session("cold-start", project_dir, 32, rng):
+        if spec in hooks_for_event([spec], event):
+            return event
+    return {"session_id": "cold-start", "hook_event_name": spec.event, "cwd": project_dir}
+
+
+def measure_cold(specs: List[HookSpec], fixture: Path, runs: int, stats: Dict[str, HookStats]) -> None:
+    """Run each hook with an empty bytecode cache so imports compile from source."""
+    for spec in specs:
+        event = representative_event(spec, str(fixture / "project"))
+        for _ in range(runs):
+            pycache = Path(tempfile.mkdtemp(dir=fixture, prefix="pycache-cold-"))
+            record(stats, run_hook(spec, event, fixture, pycache), cold=True)
+            shutil.rmtree(pycache, ignore_errors=True)
+
+
+def measure_warm(specs: List[HookSpec], sessions: List[List[dict]], fixture: Path,
+                 concurrency: int, stats: Dict[str, HookStats]) -> dict:
+    """Replay sessions concurrently against a pre-warmed bytecode cache."""
+    pycache = fixture / "pycache-warm"
+    for spec in specs:
+        run_hook(spec, representative_event(spec, str(fixture / "project")), fixture, pycache)
+
+    lock = threading.Lock()
+
+    def replay(events):
+        results = []
+        for event in events:
+            for spec in hooks_for_event(specs, event):
+                results.append(run_hook(spec, event, fixture, pycache))
+        with lock:
+            for result in results:
+                record(stats, result, cold=False)
+        return len(results)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        invocations = sum(pool.map(replay, sessions))
+    wall = time.perf_counter() - start
+
+    return {
+        "sessions": len(sessions),
+        "concurrency": concurrency,
+        "invocations": invocations,
+        "wall_seconds": round(wall, 3),
+        "invocations_per_second": round(invocations / wall, 2) if wall else 0.0,
+    }
+
+
+def record(stats: Dict[str, HookStats], result: RunResult, cold: bool) -> None:
+    entry = stats.setdefault(result.hook_id, HookStats())
+    (entry.cold if cold else entry.warm).append(result.latency_ms)
+    entry.rss_kb.append(result.rss_kb)
+    entry.exit_codes[result.exit_code] = entry.exit_codes.get(result.exit_code, 0) + 1
+    if result.timed_out:
+        entry.timeouts += 1
+    if result.protocol_error:
+        entry.protocol_errors.append(result.protocol_error)
+
+
+def parse_importtime(stderr: str) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """Total self import time (us), module count and top-level imports by cost."""
+    total_us = 0
+    modules = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # column header
+        modules += 1
+        total_us += self_us
+        name = parts[2][1:]
+        if not name.startswith(" "):
+            top_level.append((cumulative_us, name.strip()))
+    top_level.sort(reverse=True)
+    return total_us, modules, top_level
+
+
+def measure_startup(specs: List[HookSpec], fixture: Path, runs: int) -> dict:
+    """Time the no-rules/no-state fast path of each hook against a bare
+    interpreter; overheads are medians of per-round differences."""
+    pycache = fixture / "pycache-warm"
+    project_dir = str(fixture / "project")
+
+    def sample(argv, payload, env, timeout):
+        argv = [argv[0], "-X", "importtime"] + argv[1:]
+        start = time.perf_counter()
+        proc = subprocess.run(argv, input=payload, capture_output=True, env=env,
+                              cwd=project_dir, timeout=timeout)
+        wall_ms = (time.perf_counter() - start) * 1000
+        import_us, modules, top = parse_importtime(proc.stderr.decode(errors="replace"))
+        return wall_ms, import_us, modules, top
+
+    def summary(samples):
+        return {
+            "wall_ms": round(percentile([s[0] for s in samples], 50), 2),
+            "import_ms": round(percentile([s[1] / 1000 for s in samples], 50), 2),
+            "modules": samples[-1][2],
+            "top_imports": [f"{name} ({us / 1000:.1f} ms)" for us, name in samples[-1][3][:5]],
+        }
+
+    bare_env = dict(child_environ(), PYTHONPYCACHEPREFIX=str(pycache))
+    targets = [(None, [sys.executable, "-c", "pass"], b"", bare_env, DEFAULT_TIMEOUT)]
+    for spec in specs:
+        if Path(spec.argv[0]).name.startswith("python"):
+            payload = json.dumps(representative_event(spec, project_dir)).encode()
+            targets.append((spec.hook_id, spec.argv, payload, hook_env(spec, fixture, pycache), spec.timeout))
+
+    for _, argv, payload, env, timeout in targets:
+        sample(argv, payload, env, timeout)  # populate the bytecode cache
+    # Round-robin, so each hook run is paired with a bare run made under
+    # the same load, and drift over the benchmark cancels out
+    samples = {hook_id: [] for hook_id, *_ in targets}
+    for _ in range(runs):
+        for hook_id, argv, payload, env, timeout in targets:
+            samples[hook_id].append(sample(argv, payload, env, timeout))
+
+    bare_samples = samples.pop(None)
+    bare = summary(bare_samples)
+    hooks = {}
+    for hook_id, hook_samples in samples.items():
+        result = summary(hook_samples)
+        result["overhead_ms"] = round(percentile(
+            [h[0] - b[0] for h, b in zip(hook_samples, bare_samples)], 50), 2)
+        result["import_overhead_ms"] = round(percentile(
+            [(h[1] - b[1]) / 1000 for h, b in zip(hook_samples, bare_samples)], 50), 2)
+        hooks[hook_id] = result
+
+    return {
+        "mode": "startup",
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "runs": runs,
+        "bare_interpreter": bare,
+        "hooks": hooks,
+    }
+
+
+def precompile(plugin_dirs: Iterable[str]) -> None:
+    """Byte-compile plugin sources in place so first runs skip compilation."""
+    for plugin_dir in plugin_dirs:
+        compileall.compile_dir(plugin_dir, quiet=1)
+
+
+# ── Reporting ─────────────────────────────────────────────────
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(stats: Dict[str, HookStats], specs: List[HookSpec], throughput: dict) -> dict:
+    timeouts = {s.hook_id: s.timeout for s in specs}
+    hooks = {}
+    for hook_id, entry in sorted(stats.items()):
+        hooks[hook_id] = {
+            "timeout_s": timeouts.get(hook_id),
+            "cold_ms": {
+                "n": len(entry.cold),
+                "p50": round(percentile(entry.cold, 50), 2),
+                "max": round(max(entry.cold, default=0.0), 2),
+            },
+            "warm_ms": {
+                "n": len(entry.warm),
+                "p50": round(percentile(entry.warm, 50), 2),
+                "p90": round(percentile(entry.warm, 90), 2),
+                "p99": round(percentile(entry.warm, 99), 2),
+                "max": round(max(entry.warm, default=0.0), 2),
+            },
+            "peak_rss_kb": max(entry.rss_kb, default=0),
+            "exit_codes": {str(k): v for k, v in sorted(entry.exit_codes.items())},
+            "timeouts": entry.timeouts,
+            "protocol_errors": len(entry.protocol_errors),
+            "protocol_error_samples": sorted(set(entry.protocol_errors))[:3],
+        }
+    return {
+        "mode": "replay",
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "throughput": throughput,
+        "hooks": hooks,
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = []
+    header = (f"{'hook':<48} {'cold p50':>9} {'warm p50':>9} {'p90':>8} {'p99':>8} "
+              f"{'max':>8} {'rss MB':>7} {'t/o':>4} {'err':>4}")
+    lines.append(header)
+    lines.append("─" * len(header))
+    for hook_id, h in report["hooks"].items():
+        lines.append(
+            f"{hook_id:<48} {h['cold_ms']['p50']:>9.1f} {h['warm_ms']['p50']:>9.1f} "
+            f"{h['warm_ms']['p90']:>8.1f} {h['warm_ms']['p99']:>8.1f} {h['warm_ms']['max']:>8.1f} "
+            f"{h['peak_rss_kb'] / 1024:>7.1f} {h['timeouts']:>4} {h['protocol_errors']:>4}"
+        )
+        for sample in h["protocol_error_samples"]:
+            lines.append(f"    ⚠️  {sample}")
+
+    t = report["throughput"]
+    lines.append("")
+    lines.append(
+        f"Throughput: {t['invocations']} invocations across {t['sessions']} sessions "
+        f"(concurrency {t['concurrency']}) in {t['wall_seconds']}s "
+        f"→ {t['invocations_per_second']} hooks/s"
+    )
+    lines.append("Latencies in ms; cold = empty bytecode cache, warm = replayed sessions.")
+    return "\n".join(lines)
+
+
+def format_startup_report(report: dict) -> str:
+    bare = report["bare_interpreter"]
+    lines = [
+        f"Bare interpreter: {bare['wall_ms']:.1f} ms wall, {bare['import_ms']:.1f} ms imports "
+        f"({bare['modules']} modules)",
+        "",
+    ]
+    header = f"{'hook':<56} {'wall':>7} {'+wall':>7} {'imports':>8} {'+imports':>9} {'modules':>8}"
+    lines.append(header)
+    lines.append("─" * len(header))
+    for hook_id, h in report["hooks"].items():
+        lines.append(
+            f"{hook_id:<56} {h['wall_ms']:>7.1f} {h['overhead_ms']:>7.1f} {h['import_ms']:>8.1f} "
+            f"{h['import_overhead_ms']:>9.1f} {h['modules']:>8}"
+        )
+        if h["top_imports"]:
+            lines.append(f"    top: {', '.join(h['top_imports'][:3])}")
+    lines.append("")
+    lines.append(f"Medians of {report['runs']} runs in ms; + columns are over the bare interpreter.")
+    return "\n".join(lines)
+
+
+def compare_baseline(report: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Return human-readable regressions of report against baseline."""
+    if report.get("mode") != baseline.get("mode", "replay"):
+        raise SystemExit("Error: baseline was recorded in a different mode (use --startup consistently)")
+    if report.get("mode") == "startup":
+        return compare_startup_baseline(report, baseline, tolerance, min_delta_ms)
+
+    regressions = []
+    for hook_id, current in report["hooks"].items():
+        previous = baseline.get("hooks", {}).get(hook_id)
+        if not previous:
+            continue
+        for phase, metric in (("warm_ms", "p50"), ("warm_ms", "p90"), ("cold_ms", "p50")):
+            old, new = previous[phase][metric], current[phase][metric]
+            if old and new > old * (1 + tolerance) and new - old > min_delta_ms:
+                regressions.append(f"{hook_id}: {phase} {metric} {old:.1f} → {new:.1f} ms")
+        old_rss, new_rss = previous["peak_rss_kb"], current["peak_rss_kb"]
+        if old_rss and new_rss > old_rss * (1 + tolerance):
+            regressions.append(f"{hook_id}: peak RSS {old_rss} → {new_rss} KB")
+        if current["timeouts"] > previous["timeouts"]:
+            regressions.append(f"{hook_id}: timeouts {previous['timeouts']} → {current['timeouts']}")
+        if current["protocol_errors"] > previous["protocol_errors"]:
+            regressions.append(
+                f"{hook_id}: protocol errors {previous['protocol_errors']} → {current['protocol_errors']}")
+    return regressions
+
+
+def compare_startup_baseline(report: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Regressions in fast-path overhead over the bare interpreter.
+
+    Baseline overheads are scaled by this run's bare-interpreter time
+    over the baseline's, so a baseline recorded on a faster or slower
+    machine still applies; negative ones (noise) count as zero. Module
+    counts depend on the Python version and are only compared when it
+    matches the baseline's.
+    """
+    regressions = []
+    bare, old_bare = report["bare_interpreter"], baseline.get("bare_interpreter", {})
+    scale = {
+        "overhead_ms": bare["wall_ms"] / old_bare["wall_ms"] if old_bare.get("wall_ms") else 1.0,
+        "import_overhead_ms": bare["import_ms"] / old_bare["import_ms"] if old_bare.get("import_ms") else 1.0,
+    }
+    same_python = report.get("python", "").split(".")[:2] == baseline.get("python", "").split(".")[:2]
+    for hook_id, current in report["hooks"].items():
+        previous = baseline.get("hooks", {}).get(hook_id)
+        if not previous:
+            continue
+        for metric in ("overhead_ms", "import_overhead_ms"):
+            old, new = max(previous[metric], 0.0) * scale[metric], current[metric]
+            if new - old > min_delta_ms and new > old * (1 + tolerance):
+                regressions.append(f"{hook_id}: {metric} {old:.1f} → {new:.1f} ms")
+        if same_python and current["modules"] > previous["modules"]:
+            regressions.append(f"{hook_id}: modules imported {previous['modules']} → {current['modules']}")
+    return regressions
+
+
+# ── CLI ───────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark plugin hooks over the real stdin/stdout JSON protocol.")
+    parser.add_argument("plugin_dirs", nargs="+", help="Plugin directories containing hooks/hooks.json")
+    parser.add_argument("--stream", help="Recorded hook inputs (JSONL) to replay instead of synthetic sessions")
+    parser.add_argument("--sessions", type=int, default=4, help="Synthetic sessions to replay (default: 4)")
+    parser.add_argument("--tool-calls", type=int, default=12, help="Tool calls per synthetic session (default: 12)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions replayed in parallel (default: 4)")
+    parser.add_argument("--cold-runs", type=int, default=3, help="Cold-start runs per hook (default: 3)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for synthetic sessions")
+    parser.add_argument("--no-rules", action="store_true", help="Do not install hookify example rules in the fixture")
+    parser.add_argument("--all-commands", action="store_true", help="Include non-Python command hooks")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the report to FILE as the new baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against a saved baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown vs baseline (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="Ignore latency regressions smaller than this (default: 2.0)")
+    parser.add_argument("--startup", action="store_true",
+                        help="Measure the no-rules/no-state fast path under -X importtime instead")
+    parser.add_argument("--startup-runs", type=int, default=10, help="Runs per hook in --startup mode (default: 10)")
+    parser.add_argument("--precompile", action="store_true",
+                        help="Byte-compile the plugin directories in place before measuring")
+    parser.add_argument("--keep-fixture", action="store_true", help="Leave the temporary project on disk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    specs = discover_hooks(args.plugin_dirs, python_only=not args.all_commands)
+    if not specs:
+        print("Error: no command hooks found in the given plugin directories", file=sys.stderr)
+        return 1
+
+    if args.precompile:
+        precompile(args.plugin_dirs)
+
+    rules_dirs = [str(Path(d) / "examples") for d in args.plugin_dirs]
+    with_rules = not args.no_rules and not args.startup
+    fixture = make_fixture(with_rules=with_rules, rules_dirs=rules_dirs)
+    project_dir = str(fixture / "project")
+
+    try:
+        if args.startup:
+            report = measure_startup(specs, fixture, max(1, args.startup_runs))
+        elif args.stream:
+            sessions = load_stream(args.stream)
+        else:
+            rng = random.Random(args.seed)
+            sessions = [synthetic_session(f"bench-{i}", project_dir, args.tool_calls, rng)
+                        for i in range(args.sessions)]
+
+        if not args.startup:
+            print(f"Benchmarking {len(specs)} hooks from {len(args.plugin_dirs)} plugins...", file=sys.stderr)
+            stats: Dict[str, HookStats] = {}
+            measure_cold(specs, fixture, args.cold_runs, stats)
+            throughput = measure_warm(specs, sessions, fixture, max(1, args.concurrency), stats)
+            report = summarize(stats, specs, throughput)
+    finally:
+        if args.keep_fixture:
+            print(f"Fixture kept at {fixture}", file=sys.stderr)
+        else:
+            shutil.rmtree(fixture, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_startup_report(report) if args.startup else format_report(report))
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.save_baseline}", file=sys.stderr)
+
+    status = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_baseline(report, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\n❌ Regressions vs baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            status = 1
+        else:
+            print("\n✅ No regressions vs baseline", file=sys.stderr)
+
+    if any(h.get("timeouts") for h in report["hooks"].values()):
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,17 +6,26 @@ This hook checks for security patterns in file edits and warns about potential v
 
 import json
 import os
-import random
 import sys
-from datetime import datetime
+import time
+
+import tracing
 
 # Debug log file
 DEBUG_LOG_FILE = "/tmp/security-warnings-log.txt"
 
 
 def debug_log(message):
-    """Append debug message to log file with timestamp."""
+    """Append debug message to log file with timestamp.
+
+    Routed to the buffered trace sink instead when tracing is enabled.
+    """
+    if tracing.ENABLED:
+        tracing.log(message)
+        return
     try:
+        from datetime import datetime
+
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         with open(DEBUG_LOG_FILE, "a") as f:
             f.write(f"[{timestamp}] {message}\n")
@@ -138,7 +147,7 @@ def cleanup_old_state_files():
         if not os.path.exists(state_dir):
             return
 
-        current_time = datetime.now().timestamp()
+        current_time = time.time()
         thirty_days_ago = current_time - (30 * 24 * 60 * 60)
 
         for filename in os.listdir(state_dir):
@@ -216,6 +225,8 @@ def extract_content_from_input(tool_name, tool_input):
 
 def main():
     """Main hook function."""
+    tracing.configure(plugin="security-guidance", event="PreToolUse")
+
     # Check if security reminders are enabled
     security_reminder_enabled = os.environ.get("ENABLE_SECURITY_REMINDER", "1")
 
@@ -223,14 +234,16 @@ def main():
     if security_reminder_enabled == "0":
         sys.exit(0)
 
-    # Periodically clean up old state files (10% chance per run)
-    if random.random() < 0.1:
+    # Periodically clean up old state files (~10% chance per run; os.urandom
+    # avoids importing random on the hot path)
+    if os.urandom(1)[0] < 26:
         cleanup_old_state_files()
 
     # Read input from stdin
     try:
-        raw_input = sys.stdin.read()
-        input_data = json.loads(raw_input)
+        with tracing.span("stdin_decode"):
+            raw_input = sys.stdin.read()
+            input_data = json.loads(raw_input)
     except json.JSONDecodeError as e:
         debug_log(f"JSON decode error: {e}")
         sys.exit(0)  # Allow tool to proceed if we can't parse input
@@ -239,6 +252,7 @@ def main():
     session_id = input_data.get("session_id", "default")
     tool_name = input_data.get("tool_name", "")
     tool_input = input_data.get("tool_input", {})
+    tracing.configure(tool=tool_name, session=session_id)
 
     # Check if this is a relevant tool
     if tool_name not in ["Edit", "Write", "MultiEdit"]:
@@ -249,27 +263,30 @@ def main():
     if not file_path:
         sys.exit(0)  # Allow if no file path
 
-    # Extract content to check
-    content = extract_content_from_input(tool_name, tool_input)
-
-    # Check for security patterns
-    rule_name, reminder = check_patterns(file_path, content)
+    # Extract content to check and match security patterns
+    with tracing.span("evaluate") as span:
+        content = extract_content_from_input(tool_name, tool_input)
+        rule_name, reminder = check_patterns(file_path, content)
+        span.tag(rule=rule_name)
 
     if rule_name and reminder:
         # Create unique warning key
         warning_key = f"{file_path}-{rule_name}"
 
         # Load existing warnings for this session
-        shown_warnings = load_state(session_id)
+        with tracing.span("state_io", op="load"):
+            shown_warnings = load_state(session_id)
 
         # Check if we've already shown this warning in this session
         if warning_key not in shown_warnings:
             # Add to shown warnings and save
             shown_warnings.add(warning_key)
-            save_state(session_id, shown_warnings)
+            with tracing.span("state_io", op="save"):
+                save_state(session_id, shown_warnings)
 
             # Output the warning to stderr and block execution
-            print(reminder, file=sys.stderr)
+            with tracing.span("output_encode"):
+                print(reminder, file=sys.stderr)
             sys.exit(2)  # Block tool execution (exit code 2 for PreToolUse hooks)
 
     # Allow tool to proceed